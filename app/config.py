@@ -1,28 +1,173 @@
+import copy
 import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
 
 CONFIG_PATH = Path(__file__).resolve().parent / "config.json"
 DEFAULT_CONFIG = {"default_locale": "en-US"}
 
+# Keys a tenant or campaign may override. ``locale`` overrides ``default_locale``.
+SETTING_KEYS = ("locale", "tts_provider", "stt_provider", "voice_id", "tts_model", "llm_model")
+
+
+class ConfigStore:
+    """Cached view of ``config.json``; re-read on mtime change, written under a file lock with an atomic rename."""
+
+    def __init__(self, path: Path = CONFIG_PATH, check_interval: float | None = None) -> None:
+        self.path = Path(path)
+        self.check_interval = (
+            check_interval if check_interval is not None else float(os.getenv("CONFIG_CHECK_INTERVAL", "1"))
+        )
+        self._lock = threading.RLock()
+        self._config: Dict[str, Any] = {}
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._checked = 0.0
+        self._settings: Dict[Tuple[int, Optional[str], Optional[str]], Dict[str, Any]] = {}
+        self._loaded = False
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return copy.deepcopy(DEFAULT_CONFIG)
+
+    def _refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and self._loaded and now - self._checked < self.check_interval:
+            return
+        with self._lock:
+            self._checked = now
+            stamp = self._file_stamp()
+            if force or not self._loaded or stamp != self._stamp:
+                self._config = self._read()
+                self._stamp = stamp
+                self._settings.clear()
+                self._loaded = True
+
+    def reload(self) -> None:
+        """Re-read the file now instead of waiting for the next check."""
+        self._refresh(force=True)
+
+    @property
+    def version(self) -> int:
+        self._refresh()
+        return int(self._config.get("version", 0))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        self._refresh()
+        return self._config.get(key, default)
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._refresh()
+        return copy.deepcopy(self._config)
+
+    @contextmanager
+    def _file_lock(self):
+        lock_path = self.path.with_suffix(self.path.suffix + ".lock")
+        with open(lock_path, "a") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def update(self, mutate: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        """Apply ``mutate`` to the latest config and persist it atomically."""
+        with self._lock, self._file_lock():
+            config = self._read()
+            mutate(config)
+            config["version"] = int(config.get("version", 0)) + 1
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".config-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(config, f, indent=2, sort_keys=True)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+            self._config = config
+            self._stamp = self._file_stamp()
+            self._checked = time.monotonic()
+            self._settings.clear()
+            self._loaded = True
+            return copy.deepcopy(config)
+
+    def settings(self, tenant: Optional[str] = None, campaign: Optional[str] = None) -> Dict[str, Any]:
+        """Return effective settings: defaults, then tenant, then campaign overrides."""
+        self._refresh()
+        key = (self.version, tenant, campaign)
+        cached = self._settings.get(key)
+        if cached is not None:
+            return dict(cached)
+        merged: Dict[str, Any] = {"locale": self._config.get("default_locale", DEFAULT_CONFIG["default_locale"])}
+        merged.update(self._config.get("defaults", {}))
+        if tenant:
+            merged.update(self._config.get("tenants", {}).get(tenant, {}))
+        if campaign:
+            merged.update(self._config.get("campaigns", {}).get(campaign, {}))
+        self._settings[key] = merged
+        return dict(merged)
+
+
+config_store = ConfigStore()
+
 
 def load_config() -> dict:
-    if CONFIG_PATH.exists():
-        with open(CONFIG_PATH) as f:
-            return json.load(f)
-    return DEFAULT_CONFIG.copy()
+    return config_store.snapshot()
 
 
 def save_config(config: dict) -> None:
-    with open(CONFIG_PATH, "w") as f:
-        json.dump(config, f)
+    def replace(current: dict) -> None:
+        current.clear()
+        current.update(config)
+
+    config_store.update(replace)
 
 
 def get_default_locale() -> str:
-    config = load_config()
-    return config.get("default_locale", DEFAULT_CONFIG["default_locale"])
+    return config_store.get("default_locale", DEFAULT_CONFIG["default_locale"])
 
 
 def set_default_locale(locale: str) -> None:
-    config = load_config()
-    config["default_locale"] = locale
-    save_config(config)
+    config_store.update(lambda config: config.update(default_locale=locale))
+
+
+def get_settings(tenant: Optional[str] = None, campaign: Optional[str] = None) -> Dict[str, Any]:
+    return config_store.settings(tenant, campaign)
+
+
+def set_scoped_settings(scope: str, name: str, values: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace the overrides for one tenant or campaign (``scope`` is ``tenants`` or ``campaigns``)."""
+    clean = {k: v for k, v in values.items() if k in SETTING_KEYS and v is not None}
+
+    def apply(config: dict) -> None:
+        scoped = config.setdefault(scope, {})
+        if clean:
+            scoped[name] = clean
+        else:
+            scoped.pop(name, None)
+
+    config_store.update(apply)
+    return clean
@@ -1,38 +1,104 @@
+import os
+from contextlib import asynccontextmanager
+
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from prometheus_fastapi_instrumentator import Instrumentator
-from opentelemetry import trace
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import SimpleSpanProcessor, ConsoleSpanExporter
 from app.routes.calls import router as calls_router
+from app.routes.campaigns import router as campaigns_router
 from app.routes.config import router as config_router
+from app.routes.intent import router as intent_router
+from app.routes.jobs import router as jobs_router
+from app.routes.search import router as search_router
+from app.routes.stats import router as stats_router
+from app.routes.stream import router as stream_router
+from app.routes.tts import router as tts_router
 from app.logging_config import logger
-from app.models.db import init_db
+from app.models.db import dispose_engines, init_db
+from app.services.campaign import CampaignManager
+from app.services.executor import shutdown_executors
+from app.services.idempotency import IdempotencyStore, backend_from_env
+from app.services.inbound import inbound_pipeline
+from app.services.jobs import JobWorker
+from app.services.registry import ProviderRegistry
+from app.services.stats import StatsRollupWorker
+from app.services.unit_of_work import drain_write_buffer
+from app.services.warmup import Warmup, migrate_on_startup
+from app.telemetry import configure_tracing, flush_tracing
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if migrate_on_startup():
+        init_db()
+    providers = getattr(app.state, "providers", None) or ProviderRegistry()
+    await providers.start()
+    app.state.providers = providers
+    app.state.warmup = Warmup(providers)
+    await app.state.warmup.start()
+    app.state.idempotency = IdempotencyStore(backend=backend_from_env())
+    app.state.job_worker = JobWorker(providers=providers)
+    await app.state.job_worker.start()
+    app.state.campaigns = CampaignManager(providers=providers)
+    app.state.stats_rollup = StatsRollupWorker()
+    await app.state.stats_rollup.start()
+    yield
+    await app.state.stats_rollup.stop()
+    await app.state.warmup.stop()
+    await app.state.campaigns.aclose()
+    await app.state.job_worker.stop()
+    await inbound_pipeline.aclose()
+    await drain_write_buffer()
+    await providers.aclose()
+    shutdown_executors()
+    await dispose_engines()
+    flush_tracing()
 
-def create_app() -> FastAPI:
-    app = FastAPI(title="Voice Agent API")
 
-    provider = TracerProvider(resource=Resource.create({"service.name": "voice-agent"}))
-    trace.set_tracer_provider(provider)
-    provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter()))
+def create_app(providers: ProviderRegistry | None = None) -> FastAPI:
+    app = FastAPI(title="Voice Agent API", lifespan=lifespan)
+    if providers is not None:
+        app.state.providers = providers
 
-    app.add_event_handler("startup", init_db)
+    configure_tracing()
 
     @app.get("/health")
-    def health_check():
-        return {"status": "ok"}
+    def health_check(request: Request):
+        """Liveness plus circuit-breaker state for every external provider."""
+        providers = getattr(request.app.state, "providers", None)
+        if providers is None:
+            return {"status": "ok"}
+        health = providers.health()
+        degraded = any(p["state"] != "closed" for service in health.values() for p in service.values())
+        return {"status": "degraded" if degraded else "ok", "providers": health}
+
+    @app.get("/ready")
+    def readiness_check(request: Request):
+        """503 until the schema is current and connection pools and providers are warm."""
+        warmup = getattr(request.app.state, "warmup", None)
+        if warmup is None:
+            return JSONResponse({"status": "starting", "checks": {}}, status_code=503)
+        return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
 
     app.include_router(calls_router)
+    app.include_router(campaigns_router)
     app.include_router(config_router)
+    app.include_router(intent_router)
+    app.include_router(jobs_router)
+    app.include_router(search_router)
+    app.include_router(stats_router)
+    app.include_router(stream_router)
+    app.include_router(tts_router)
 
     Instrumentator().instrument(app).expose(app)
-    FastAPIInstrumentor.instrument_app(app)
+    if os.getenv("OTEL_TRACES_EXPORTER", "file").lower() != "none":
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+        FastAPIInstrumentor.instrument_app(app)
 
     @app.middleware("http")
     async def log_requests(request, call_next):
@@ -1,8 +1,32 @@
 import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
 from sqlalchemy import (
-    create_engine, Column, Integer, String, Enum, DateTime, ForeignKey, Text, JSON
+    create_engine, event, Column, Integer, Float, String, Enum, DateTime, ForeignKey, Index, Text, JSON,
+    UniqueConstraint, text,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, declarative_base, relationship, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app.logging_config import logger
+
+DB_POOL_SIZE = Gauge("voice_agent_db_pool_size", "Configured database pool size", ["engine"])
+DB_POOL_CHECKED_OUT = Gauge(
+    "voice_agent_db_pool_checked_out", "Database connections currently checked out", ["engine"]
+)
+DB_POOL_CHECKOUTS = Counter(
+    "voice_agent_db_pool_checkouts_total", "Database connection checkouts", ["engine"]
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "voice_agent_db_pool_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
 )
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 
 Base = declarative_base()
 
@@ -10,6 +34,12 @@ class Conversation(Base):
     """Database model for a phone conversation."""
 
     __tablename__ = "conversations"
+    __table_args__ = (
+        Index("ix_conversations_start_ts", "start_ts", "id"),
+        Index("ix_conversations_phone_start_ts", "phone", "start_ts"),
+        Index("ix_conversations_status_start_ts", "status", "start_ts"),
+        Index("ix_conversations_end_ts", "end_ts", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     phone = Column(String(20))
@@ -28,6 +58,12 @@ class Ticket(Base):
     """Support ticket generated from a conversation."""
 
     __tablename__ = "tickets"
+    __table_args__ = (
+        Index("ix_tickets_conversation_id", "conversation_id"),
+        Index("ix_tickets_status_created_ts", "status", "created_ts"),
+        Index("ix_tickets_created_ts", "created_ts", "id"),
+        Index("ix_tickets_resolved_ts", "resolved_ts", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     conversation_id = Column(Integer, ForeignKey("conversations.id"))
@@ -44,15 +80,158 @@ class Ticket(Base):
     conversation = relationship("Conversation", back_populates="tickets")
 
 
-def get_engine() -> 'Engine':
-    """Create a SQLAlchemy engine.
+class Job(Base):
+    """Background job stored in the database so any worker process can claim it."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (Index("ix_jobs_conversation_id", "conversation_id"),)
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)
+    conversation_id = Column(Integer, ForeignKey("conversations.id"))
+    payload = Column(JSON)
+    status = Column(Enum(
+        "QUEUED",
+        "RUNNING",
+        "SUCCEEDED",
+        "FAILED",
+        name="job_status"
+    ), default="QUEUED", nullable=False)
+    stage = Column(String(50))
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    run_at = Column(DateTime)
+    result = Column(JSON)
+    error = Column(Text)
+    created_ts = Column(DateTime)
+    updated_ts = Column(DateTime)
+
+
+class WebhookEvent(Base):
+    """Provider event already processed; the unique key makes claiming atomic."""
+
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        UniqueConstraint("namespace", "event_key", name="uq_webhook_events_namespace_key"),
+        Index("ix_webhook_events_created_ts", "created_ts"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    namespace = Column(String(32), nullable=False)
+    event_key = Column(String(128), nullable=False)
+    created_ts = Column(DateTime, nullable=False)
+
+
+class StatsHourly(Base):
+    """Call and ticket totals per UTC hour, locale and direction."""
+
+    __tablename__ = "stats_hourly"
+
+    bucket_ts = Column(DateTime, primary_key=True)
+    locale = Column(String(10), primary_key=True)
+    direction = Column(String(10), primary_key=True)
+    calls = Column(Integer, default=0, nullable=False)
+    handled_calls = Column(Integer, default=0, nullable=False)
+    handle_seconds = Column(Float, default=0.0, nullable=False)
+    tickets_opened = Column(Integer, default=0, nullable=False)
+    tickets_resolved = Column(Integer, default=0, nullable=False)
+    resolve_seconds = Column(Float, default=0.0, nullable=False)
+
+
+class StatsIntentHourly(Base):
+    """Calls per detected intent per UTC hour, locale and direction."""
+
+    __tablename__ = "stats_intent_hourly"
+
+    bucket_ts = Column(DateTime, primary_key=True)
+    locale = Column(String(10), primary_key=True)
+    direction = Column(String(10), primary_key=True)
+    intent = Column(String(50), primary_key=True)
+    calls = Column(Integer, default=0, nullable=False)
+
+
+class StatsWatermark(Base):
+    """Position up to which a source table has been folded into the rollups."""
+
+    __tablename__ = "stats_watermarks"
+
+    name = Column(String(32), primary_key=True)
+    ts = Column(DateTime, nullable=False)
+    last_id = Column(Integer, default=0, nullable=False)
+    checked_ts = Column(DateTime)
+
+
+class DbPoolSettings:
+    """Database pool sizing, read from the environment."""
+
+    def __init__(self) -> None:
+        self.pool_size = int(os.getenv("DB_POOL_SIZE", "10"))
+        self.max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+        self.pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+        self.pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+        self.pool_pre_ping = os.getenv("DB_POOL_PRE_PING", "1").lower() not in ("0", "false", "no")
+
+    def engine_kwargs(self, db_url: str) -> Dict[str, Any]:
+        if _is_memory_sqlite(db_url):
+            # Every connection to ":memory:" is a separate database; keep the default pool.
+            return {}
+        return {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pool_pre_ping,
+        }
+
 
-    Uses the DATABASE_URL environment variable if set. Falls back to
-    SQLite file database for local development.
-    """
-    db_url = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+def _is_memory_sqlite(db_url: str) -> bool:
+    return db_url.startswith("sqlite") and (db_url.endswith(":memory:") or db_url.rstrip("/") in ("sqlite:", "sqlite+pysqlite:"))
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection."""
+
+    metrics_label = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT_SECONDS.labels(self.metrics_label).observe(time.perf_counter() - start)
+
+
+def instrument_pool(engine: Engine, label: str) -> None:
+    """Export checkout counts and in-use connections for ``engine``'s pool."""
+    size = getattr(engine.pool, "size", None)
+    if callable(size):
+        DB_POOL_SIZE.labels(label).set(size())
+    checked_out = DB_POOL_CHECKED_OUT.labels(label)
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_conn, record, proxy):
+        DB_POOL_CHECKOUTS.labels(label).inc()
+        checked_out.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_conn, record):
+        checked_out.dec()
+
+
+def get_database_url() -> str:
+    return os.getenv("DATABASE_URL", "sqlite:///./app.db")
+
+
+def get_engine(settings: DbPoolSettings | None = None) -> Engine:
+    """Create the pooled engine for ``DATABASE_URL`` (SQLite by default), sized by :class:`DbPoolSettings`."""
+    db_url = get_database_url()
     connect_args = {"check_same_thread": False} if db_url.startswith("sqlite") else {}
-    return create_engine(db_url, connect_args=connect_args)
+    kwargs = (settings or DbPoolSettings()).engine_kwargs(db_url)
+    if kwargs:
+        kwargs["poolclass"] = TimedQueuePool
+    engine = create_engine(db_url, connect_args=connect_args, **kwargs)
+    instrument_pool(engine, "sync")
+    return engine
 
 engine = get_engine()
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
@@ -63,7 +242,138 @@ def get_sessionmaker() -> sessionmaker:
     return SessionLocal
 
 
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """Yield a session that is rolled back on error and always closed."""
+    session = SessionLocal()
+    try:
+        yield session
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def get_db() -> Iterator[Session]:
+    """FastAPI dependency yielding a request-scoped session that is always closed."""
+    with session_scope() as session:
+        yield session
+
+
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+_async_sessionmaker: Any = None
+_async_engine: Any = None
+
+
+def get_async_database_url() -> Optional[str]:
+    """Return the async driver URL (``DATABASE_ASYNC_URL`` or derived with ``DB_ASYNC=1``), or ``None``."""
+    explicit = os.getenv("DATABASE_ASYNC_URL")
+    if explicit:
+        return explicit
+    if os.getenv("DB_ASYNC", "0").lower() in ("0", "false", "no", ""):
+        return None
+    db_url = get_database_url()
+    scheme, sep, rest = db_url.partition("://")
+    driver = _ASYNC_DRIVERS.get(scheme.split("+")[0])
+    return f"{driver}{sep}{rest}" if driver else None
+
+
+def get_async_sessionmaker():
+    """Return the async sessionmaker, or ``None`` when async access is off or its driver is missing."""
+    global _async_engine, _async_sessionmaker
+    if _async_sessionmaker is not None:
+        return _async_sessionmaker or None
+    url = get_async_database_url()
+    if url is None:
+        _async_sessionmaker = False
+        return None
+    try:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+        class TimedAsyncQueuePool(AsyncAdaptedQueuePool, TimedQueuePool):
+            metrics_label = "async"
+
+        kwargs = DbPoolSettings().engine_kwargs(url)
+        if kwargs:
+            kwargs["poolclass"] = TimedAsyncQueuePool
+        _async_engine = create_async_engine(url, **kwargs)
+    except ImportError as e:
+        logger.warning(f"Async database driver unavailable ({e}); using the sync engine")
+        _async_sessionmaker = False
+        return None
+    instrument_pool(_async_engine.sync_engine, "async")
+    _async_sessionmaker = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _async_sessionmaker
+
+
+@asynccontextmanager
+async def async_session_scope() -> AsyncIterator[Any]:
+    """Async counterpart of :func:`session_scope`; requires the async engine."""
+    factory = get_async_sessionmaker()
+    if factory is None:
+        raise RuntimeError("Async database access is not configured")
+    async with factory() as session:
+        try:
+            yield session
+        except BaseException:
+            await session.rollback()
+            raise
+
+
+async def get_async_db() -> AsyncIterator[Any]:
+    """FastAPI dependency yielding an ``AsyncSession``, or ``None`` if disabled."""
+    if get_async_sessionmaker() is None:
+        yield None
+        return
+    async with async_session_scope() as session:
+        yield session
+
+
+def warm_pool(connections: int) -> int:
+    """Open ``connections`` pooled connections at once and return them to the pool."""
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = engine.connect()
+            opened.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+
+async def warm_async_pool(connections: int) -> int:
+    """Async counterpart of :func:`warm_pool`; a no-op when async access is off."""
+    if get_async_sessionmaker() is None:
+        return 0
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = await _async_engine.connect()
+            opened.append(conn)
+            await conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            await conn.close()
+    return len(opened)
+
+
+async def dispose_engines() -> None:
+    """Close every pooled connection; called on application shutdown."""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    engine.dispose()
+
+
 def init_db() -> None:
-    """Create database tables if they do not exist."""
-    Base.metadata.create_all(bind=engine)
+    """Bring the schema up to date by applying pending migrations."""
+    from app.models.migrations import run_migrations
 
+    run_migrations(engine)
@@ -0,0 +1,58 @@
+"""Schema migration runner: ``mNNNN_<description>.py`` modules applied in order, recorded in ``schema_migrations``.
+
+Migrations must not import the ORM models.
+"""
+import importlib
+import pkgutil
+import re
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, select
+from sqlalchemy.engine import Engine
+
+from app.logging_config import logger
+
+_VERSION_RE = re.compile(r"^m(\d{4})_\w+$")
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", String(64), primary_key=True),
+    Column("applied_ts", DateTime, nullable=False),
+)
+
+
+def available_migrations() -> List[Tuple[str, object]]:
+    """Return ``(version, module)`` pairs in the order they must be applied."""
+    names = sorted(
+        info.name for info in pkgutil.iter_modules(__path__) if _VERSION_RE.match(info.name)
+    )
+    return [(name, importlib.import_module(f"{__name__}.{name}")) for name in names]
+
+
+def applied_versions(engine: Engine) -> List[str]:
+    _metadata.create_all(engine)
+    with engine.connect() as conn:
+        return [row[0] for row in conn.execute(select(schema_migrations.c.version))]
+
+
+def pending_migrations(engine: Engine) -> List[str]:
+    applied = set(applied_versions(engine))
+    return [version for version, _ in available_migrations() if version not in applied]
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """Apply every pending migration and return the versions applied."""
+    applied = set(applied_versions(engine))
+    done = []
+    for version, module in available_migrations():
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            module.upgrade(conn)
+            conn.execute(schema_migrations.insert().values(version=version, applied_ts=datetime.utcnow()))
+        logger.info(f"Applied migration {version}")
+        done.append(version)
+    return done
@@ -0,0 +1,55 @@
+"""Initial schema: conversations, tickets and jobs. Existing tables are adopted as-is."""
+from sqlalchemy import JSON, Column, DateTime, Enum, ForeignKey, Integer, MetaData, String, Table, Text
+
+metadata = MetaData()
+
+Table(
+    "conversations",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("phone", String(20)),
+    Column("direction", Enum("INBOUND", "OUTBOUND", name="direction_enum")),
+    Column("locale", String(10)),
+    Column("start_ts", DateTime),
+    Column("end_ts", DateTime),
+    Column("transcript", Text),
+    Column("intents", JSON),
+    Column("status", Enum("OPEN", "CLOSED", name="conversation_status")),
+)
+
+Table(
+    "tickets",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("conversation_id", Integer, ForeignKey("conversations.id")),
+    Column("category", String(100)),
+    Column("status", Enum("OPEN", "RESOLVED", "ESCALATED", name="ticket_status")),
+    Column("created_ts", DateTime),
+    Column("resolved_ts", DateTime),
+)
+
+Table(
+    "jobs",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("kind", String(50), nullable=False),
+    Column("conversation_id", Integer, ForeignKey("conversations.id")),
+    Column("payload", JSON),
+    Column(
+        "status",
+        Enum("QUEUED", "RUNNING", "SUCCEEDED", "FAILED", name="job_status"),
+        nullable=False,
+    ),
+    Column("stage", String(50)),
+    Column("attempts", Integer, nullable=False),
+    Column("max_attempts", Integer, nullable=False),
+    Column("run_at", DateTime),
+    Column("result", JSON),
+    Column("error", Text),
+    Column("created_ts", DateTime),
+    Column("updated_ts", DateTime),
+)
+
+
+def upgrade(conn) -> None:
+    metadata.create_all(conn, checkfirst=True)
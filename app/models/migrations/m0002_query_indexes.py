@@ -0,0 +1,34 @@
+"""Indexes backing the conversation and ticket list endpoints."""
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table
+
+metadata = MetaData()
+
+conversations = Table(
+    "conversations",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("phone", String(20)),
+    Column("status", String),
+    Column("start_ts", DateTime),
+)
+tickets = Table(
+    "tickets",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("conversation_id", Integer),
+    Column("status", String),
+    Column("created_ts", DateTime),
+)
+
+INDEXES = [
+    Index("ix_conversations_start_ts", conversations.c.start_ts, conversations.c.id),
+    Index("ix_conversations_phone_start_ts", conversations.c.phone, conversations.c.start_ts),
+    Index("ix_conversations_status_start_ts", conversations.c.status, conversations.c.start_ts),
+    Index("ix_tickets_conversation_id", tickets.c.conversation_id),
+    Index("ix_tickets_status_created_ts", tickets.c.status, tickets.c.created_ts),
+]
+
+
+def upgrade(conn) -> None:
+    for index in INDEXES:
+        index.create(conn, checkfirst=True)
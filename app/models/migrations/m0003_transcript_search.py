@@ -0,0 +1,59 @@
+"""Full-text index over transcripts: FTS5 with triggers on SQLite, a ``tsvector`` column on PostgreSQL."""
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.logging_config import logger
+
+SQLITE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(
+        transcript, content='conversations', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS conversations_fts_ai AFTER INSERT ON conversations BEGIN
+        INSERT INTO conversations_fts(rowid, transcript) VALUES (new.id, new.transcript);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS conversations_fts_ad AFTER DELETE ON conversations BEGIN
+        INSERT INTO conversations_fts(conversations_fts, rowid, transcript)
+        VALUES ('delete', old.id, old.transcript);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS conversations_fts_au AFTER UPDATE OF transcript ON conversations BEGIN
+        INSERT INTO conversations_fts(conversations_fts, rowid, transcript)
+        VALUES ('delete', old.id, old.transcript);
+        INSERT INTO conversations_fts(rowid, transcript) VALUES (new.id, new.transcript);
+    END
+    """,
+    "INSERT INTO conversations_fts(conversations_fts) VALUES ('rebuild')",
+]
+
+POSTGRES = [
+    """
+    ALTER TABLE conversations ADD COLUMN IF NOT EXISTS transcript_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', coalesce(transcript, ''))) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_conversations_transcript_tsv ON conversations USING GIN (transcript_tsv)",
+]
+
+
+def upgrade(conn) -> None:
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        statements = SQLITE
+    elif dialect == "postgresql":
+        statements = POSTGRES
+    else:
+        logger.warning(f"No full-text index for {dialect}; transcript search will scan")
+        return
+    try:
+        for statement in statements:
+            conn.execute(text(statement))
+    except OperationalError as e:
+        # SQLite builds without FTS5 keep working with the LIKE fallback.
+        if dialect != "sqlite":
+            raise
+        logger.warning(f"FTS5 unavailable ({e}); transcript search will scan")
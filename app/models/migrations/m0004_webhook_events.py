@@ -0,0 +1,19 @@
+"""Durable tier of the webhook idempotency store."""
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, UniqueConstraint
+
+metadata = MetaData()
+
+Table(
+    "webhook_events",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("namespace", String(32), nullable=False),
+    Column("event_key", String(128), nullable=False),
+    Column("created_ts", DateTime, nullable=False),
+    UniqueConstraint("namespace", "event_key", name="uq_webhook_events_namespace_key"),
+    Index("ix_webhook_events_created_ts", "created_ts"),
+)
+
+
+def upgrade(conn) -> None:
+    metadata.create_all(conn, checkfirst=True)
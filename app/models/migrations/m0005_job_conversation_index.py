@@ -0,0 +1,18 @@
+"""Index jobs by conversation so retention can delete them in batches."""
+from sqlalchemy import Column, Index, Integer, MetaData, Table
+
+metadata = MetaData()
+
+jobs = Table(
+    "jobs",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("conversation_id", Integer),
+)
+
+INDEXES = [Index("ix_jobs_conversation_id", jobs.c.conversation_id)]
+
+
+def upgrade(conn) -> None:
+    for index in INDEXES:
+        index.create(conn, checkfirst=True)
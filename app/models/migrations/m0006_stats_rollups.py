@@ -0,0 +1,61 @@
+"""Hourly analytics rollups and the indexes used to feed them incrementally."""
+from sqlalchemy import Column, DateTime, Float, Index, Integer, MetaData, String, Table
+
+metadata = MetaData()
+
+conversations = Table(
+    "conversations",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("end_ts", DateTime),
+)
+tickets = Table(
+    "tickets",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("created_ts", DateTime),
+    Column("resolved_ts", DateTime),
+)
+
+Table(
+    "stats_hourly",
+    metadata,
+    Column("bucket_ts", DateTime, primary_key=True),
+    Column("locale", String(10), primary_key=True),
+    Column("direction", String(10), primary_key=True),
+    Column("calls", Integer, nullable=False),
+    Column("handled_calls", Integer, nullable=False),
+    Column("handle_seconds", Float, nullable=False),
+    Column("tickets_opened", Integer, nullable=False),
+    Column("tickets_resolved", Integer, nullable=False),
+    Column("resolve_seconds", Float, nullable=False),
+)
+Table(
+    "stats_intent_hourly",
+    metadata,
+    Column("bucket_ts", DateTime, primary_key=True),
+    Column("locale", String(10), primary_key=True),
+    Column("direction", String(10), primary_key=True),
+    Column("intent", String(50), primary_key=True),
+    Column("calls", Integer, nullable=False),
+)
+Table(
+    "stats_watermarks",
+    metadata,
+    Column("name", String(32), primary_key=True),
+    Column("ts", DateTime, nullable=False),
+    Column("last_id", Integer, nullable=False),
+    Column("checked_ts", DateTime),
+)
+
+INDEXES = [
+    Index("ix_conversations_end_ts", conversations.c.end_ts, conversations.c.id),
+    Index("ix_tickets_created_ts", tickets.c.created_ts, tickets.c.id),
+    Index("ix_tickets_resolved_ts", tickets.c.resolved_ts, tickets.c.id),
+]
+
+
+def upgrade(conn) -> None:
+    metadata.create_all(conn, checkfirst=True)
+    for index in INDEXES:
+        index.create(conn, checkfirst=True)
@@ -1,3 +1,3 @@
-from . import calls, config
+from . import calls, campaigns, config, intent, jobs, search, stats, stream, tts
 
-__all__ = ["calls", "config"]
+__all__ = ["calls", "campaigns", "config", "intent", "jobs", "search", "stats", "stream", "tts"]
@@ -1,21 +1,26 @@
-from typing import Optional, Dict, Any, List
-import tempfile
-import requests
-from fastapi import APIRouter, HTTPException, Request, Response
+import asyncio
+from typing import Optional, Dict, Any, List, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 
-from app.services.telephony import TelephonyService
-from app.services.tts import TTSClient
-from app.services.stt import STTClient
-from app.services.intent import IntentClassifier
-from app.services.ticket import TicketService
-from app.services.live_agent import LiveAgentSimulator
-from app.config import get_default_locale
-from app.models.db import SessionLocal, Conversation
+from app.services.executor import run_blocking
+from app.services.idempotency import IdempotencyStore, get_idempotency
+from app.services.conversation import (
+    ConversationDeleted, create_open_conversation, discard_open_conversation, list_conversations,
+    record_call_outcome,
+)
+from app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor
+from app.services.inbound import INBOUND_RECORDING_JOB
+from app.services.jobs import JobQueue
+from app.services.registry import ProviderRegistry, get_providers
+from app.services.ticket import list_tickets, resolve_ticket
+from app.services.unit_of_work import commit_unit
+from app.config import get_settings
+from app.models.db import Conversation, get_async_db, get_db
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
 from datetime import datetime
 
-PROCESSED_WEBHOOKS: set[str] = set()
-
 router = APIRouter()
 
 
@@ -24,54 +29,74 @@ class OutboundCallRequest(BaseModel):
     prompt: str
     metadata: Optional[Dict[str, Any]] = None
     locale: Optional[str] = None
+    tenant: Optional[str] = None
+    campaign: Optional[str] = None
 
 
 @router.post("/call/outbound")
-async def call_outbound(payload: OutboundCallRequest):
-    locale = payload.locale or get_default_locale()
-    telephony = TelephonyService()
-    await telephony.start_outbound_call(payload.phone, payload.prompt, payload.metadata)
-    session = SessionLocal()
-    conv = Conversation(
+async def call_outbound(
+    payload: OutboundCallRequest, providers: ProviderRegistry = Depends(get_providers)
+):
+    settings = get_settings(payload.tenant, payload.campaign)
+    locale = settings["locale"] = payload.locale or settings["locale"]
+    telephony = providers.telephony()
+    # Opened before dialing so the call's media stream updates this row
+    # instead of inserting one of its own.
+    conv_id = await commit_unit(
+        create_open_conversation,
         phone=payload.phone,
         direction="OUTBOUND",
         locale=locale,
-        start_ts=datetime.utcnow()
+        start_ts=datetime.utcnow(),
     )
-    session.add(conv)
-    session.commit()
-
-    tts = TTSClient(locale=locale)
-    audio_bytes = tts.synthesize(payload.prompt)
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-        tmp.write(audio_bytes)
-        audio_path = tmp.name
-
-    stt = STTClient(locale=locale)
-    transcript = stt.transcribe(audio_path)
-    intent = IntentClassifier().classify(transcript)
-
-    conv.transcript = transcript
-    conv.intents = [intent]
-    conv.end_ts = datetime.utcnow()
-    conv.status = "CLOSED"
-    session.add(conv)
-    session.commit()
+    try:
+        await providers.router("telephony").call(
+            lambda _: telephony.start_outbound_call(
+                payload.phone, payload.prompt, payload.metadata, stream_params={"conversation_id": conv_id}
+            )
+        )
+    except BaseException:
+        await asyncio.shield(commit_unit(discard_open_conversation, conv_id))
+        raise
 
-    return {"conversation_id": conv.id, "intent": intent}
+    # The cache sits in front of the router, so concurrent calls for one prompt
+    # share a single routed synthesis and a hedge is a real second request.
+    # Audio is cached under the provider that rendered it, which after a
+    # failover or a won hedge is not the one the lookup was keyed on.
+    tts_router = providers.router("tts")
+    prefer = settings.get("tts_provider")
+
+    async def synthesize(name: str):
+        tts = providers.tts_for(settings, name)
+        audio = await run_blocking("tts", tts.synthesize, payload.prompt)
+        return providers.tts_cache.key_for(tts, payload.prompt), audio
+
+    audio_bytes = await providers.tts_cache.get_or_render_as(
+        providers.tts_cache.key_for(providers.tts_for(settings, tts_router.preferred(prefer)), payload.prompt),
+        lambda: tts_router.call(synthesize, prefer=prefer),
+    )
+    transcript = await providers.router("stt").call(
+        lambda name: run_blocking("stt", providers.stt(locale, name).transcribe, audio_bytes),
+        prefer=settings.get("stt_provider"),
+    )
+    intent = await run_blocking("intent", providers.intent(settings.get("llm_model")).classify, transcript)
+
+    try:
+        await commit_unit(record_call_outcome, conv_id, transcript, intent, False)
+    except ConversationDeleted:
+        raise HTTPException(status_code=409, detail="Conversation was deleted during the call")
+    return {"conversation_id": conv_id, "intent": intent}
 
 
 class InboundCallRequest(BaseModel):
     phone: str
     recording_url: str
     locale: Optional[str] = None
+    tenant: Optional[str] = None
+    campaign: Optional[str] = None
 
 
-@router.post("/call/inbound")
-async def inbound_call(payload: InboundCallRequest):
-    """Process a completed inbound call recording."""
-    locale = payload.locale or get_default_locale()
-    session = SessionLocal()
+def _enqueue_recording(session: Session, payload: InboundCallRequest, locale: str) -> Dict[str, Any]:
     conv = Conversation(
         phone=payload.phone,
         direction="INBOUND",
@@ -79,59 +104,70 @@ async def inbound_call(payload: InboundCallRequest):
         start_ts=datetime.utcnow(),
     )
     session.add(conv)
-    session.commit()
-
-    audio_resp = requests.get(payload.recording_url)
-    audio_resp.raise_for_status()
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-        tmp.write(audio_resp.content)
-        audio_path = tmp.name
-
-    stt = STTClient(locale=locale)
-    transcript = stt.transcribe(audio_path)
-    intent = IntentClassifier().classify(transcript)
-
-    conv.transcript = transcript
-    conv.intents = [intent]
-    conv.end_ts = datetime.utcnow()
-    conv.status = "CLOSED"
-    session.add(conv)
-    session.commit()
+    session.flush()
+    job = JobQueue().enqueue(
+        session,
+        INBOUND_RECORDING_JOB,
+        {
+            "conversation_id": conv.id,
+            "recording_url": payload.recording_url,
+            "locale": locale,
+            "tenant": payload.tenant,
+            "campaign": payload.campaign,
+        },
+        conversation_id=conv.id,
+    )
+    return {"job_id": job.id, "conversation_id": conv.id, "status": "QUEUED"}
 
-    ticket_id: int | None = None
-    if intent != "LIVE_AGENT":
-        ticket = TicketService(session).create_ticket(conv.id, intent)
-        ticket_id = ticket.id
-    else:
-        LiveAgentSimulator().handoff(conv.id)
 
-    return {"conversation_id": conv.id, "intent": intent, "ticket_id": ticket_id}
+@router.post("/call/inbound", status_code=202)
+async def inbound_call(payload: InboundCallRequest, session: Session = Depends(get_db)):
+    """Queue a completed inbound call recording for background processing.
+
+    Poll ``GET /jobs/{job_id}`` for the transcript intent and ticket.
+    """
+    locale = payload.locale or get_settings(payload.tenant, payload.campaign)["locale"]
+    return await run_blocking("db", _enqueue_recording, session, payload, locale)
+
+async def _handle_webhook(
+    namespace: str,
+    request_id: Optional[str],
+    event: Dict[str, Any],
+    providers: ProviderRegistry,
+    idempotency: IdempotencyStore,
+) -> Response:
+    if request_id and not await idempotency.claim(namespace, request_id):
+        return Response(content="", media_type="application/xml")
+    try:
+        telephony = providers.telephony()
+        twiml = await telephony.handle_inbound_call(event)
+    except Exception:
+        # Let the provider's retry through instead of dropping the call.
+        if request_id:
+            await idempotency.release(namespace, request_id)
+        raise
+    return Response(content=twiml, media_type="application/xml")
 
 @router.post("/webhook/twilio")
-async def inbound_twilio(request: Request) -> Response:
+async def inbound_twilio(
+    request: Request,
+    providers: ProviderRegistry = Depends(get_providers),
+    idempotency: IdempotencyStore = Depends(get_idempotency),
+) -> Response:
     form = await request.form()
     event = dict(form)
-    request_id = event.get("CallSid")
-    if request_id and request_id in PROCESSED_WEBHOOKS:
-        return Response(content="", media_type="application/xml")
-    if request_id:
-        PROCESSED_WEBHOOKS.add(request_id)
-    telephony = TelephonyService()
-    twiml = await telephony.handle_inbound_call(event)
-    return Response(content=twiml, media_type="application/xml")
+    return await _handle_webhook("twilio", event.get("CallSid"), event, providers, idempotency)
 
 @router.post("/webhook/vapi")
-async def inbound_vapi(request: Request) -> Response:
+async def inbound_vapi(
+    request: Request,
+    providers: ProviderRegistry = Depends(get_providers),
+    idempotency: IdempotencyStore = Depends(get_idempotency),
+) -> Response:
     form = await request.form()
     event = dict(form)
     request_id = event.get("id") or event.get("call_id")
-    if request_id and request_id in PROCESSED_WEBHOOKS:
-        return Response(content="", media_type="application/xml")
-    if request_id:
-        PROCESSED_WEBHOOKS.add(request_id)
-    telephony = TelephonyService()
-    twiml = await telephony.handle_inbound_call(event)
-    return Response(content=twiml, media_type="application/xml")
+    return await _handle_webhook("vapi", request_id, event, providers, idempotency)
 
 class TicketResponse(BaseModel):
     id: int
@@ -146,13 +182,13 @@ class TicketResponse(BaseModel):
 
 class ConversationResponse(BaseModel):
     id: int
-    phone: str
+    phone: Optional[str]
     direction: str
     locale: Optional[str]
     start_ts: datetime
-    end_ts: datetime
-    transcript: str
-    intents: List[str]
+    end_ts: Optional[datetime]
+    transcript: Optional[str]
+    intents: Optional[List[str]]
     status: str
     tickets: List[TicketResponse] = []
 
@@ -160,9 +196,103 @@ class ConversationResponse(BaseModel):
         orm_mode = True
 
 @router.get("/conversation/{conversation_id}", response_model=ConversationResponse)
-async def get_conversation(conversation_id: int):
-    session = SessionLocal()
-    conv = session.query(Conversation).filter(Conversation.id == conversation_id).first()
+async def get_conversation(
+    conversation_id: int,
+    session: Session = Depends(get_db),
+    async_session=Depends(get_async_db),
+):
+    stmt = (
+        select(Conversation)
+        .options(selectinload(Conversation.tickets))
+        .where(Conversation.id == conversation_id)
+    )
+    if async_session is not None:
+        conv = (await async_session.execute(stmt)).scalar_one_or_none()
+    else:
+        conv = await run_blocking("db", lambda: session.execute(stmt).scalar_one_or_none())
     if not conv:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return conv
+
+
+class ConversationPage(BaseModel):
+    items: List[ConversationResponse]
+    next_cursor: Optional[str] = None
+
+
+class TicketPage(BaseModel):
+    items: List[TicketResponse]
+    next_cursor: Optional[str] = None
+
+
+@router.get("/conversations", response_model=ConversationPage)
+async def get_conversations(
+    phone: Optional[str] = None,
+    direction: Optional[Literal["INBOUND", "OUTBOUND"]] = None,
+    status: Optional[Literal["OPEN", "CLOSED"]] = None,
+    intent: Optional[str] = Query(None, pattern="^[A-Z_]+$"),
+    locale: Optional[str] = None,
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: Session = Depends(get_db),
+):
+    """List conversations newest first. Pass ``next_cursor`` back as ``cursor`` for the next page."""
+    try:
+        items, next_cursor = await run_blocking(
+            "db",
+            list_conversations,
+            session,
+            phone=phone,
+            direction=direction,
+            status=status,
+            intent=intent,
+            locale=locale,
+            start_from=start_from,
+            start_to=start_to,
+            cursor=cursor,
+            limit=limit,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/tickets", response_model=TicketPage)
+async def get_tickets(
+    status: Optional[Literal["OPEN", "RESOLVED", "ESCALATED"]] = None,
+    category: Optional[str] = None,
+    conversation_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: Session = Depends(get_db),
+):
+    """List tickets newest first, paginated like ``/conversations``."""
+    try:
+        items, next_cursor = await run_blocking(
+            "db",
+            list_tickets,
+            session,
+            status=status,
+            category=category,
+            conversation_id=conversation_id,
+            created_from=created_from,
+            created_to=created_to,
+            cursor=cursor,
+            limit=limit,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.post("/tickets/{ticket_id}/resolve", response_model=TicketResponse)
+async def post_resolve_ticket(ticket_id: int, session: Session = Depends(get_db)):
+    """Mark a ticket resolved; the stats rollup counts it by ``resolved_ts``."""
+    ticket = await run_blocking("db", resolve_ticket, session, ticket_id)
+    if ticket is None:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return ticket
@@ -0,0 +1,102 @@
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from app.config import get_settings
+from app.services.campaign import Campaign, CampaignManager, count_contacts
+from app.services.executor import run_blocking
+
+MAX_UPLOAD_BYTES = 100 * 1024 * 1024
+
+router = APIRouter()
+
+
+def get_campaigns(request: Request) -> CampaignManager:
+    return request.app.state.campaigns
+
+
+def _campaign_or_404(manager: CampaignManager, campaign_id: str) -> Campaign:
+    campaign = manager.get(campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return campaign
+
+
+@router.post("/campaigns", status_code=202)
+async def create_campaign(
+    request: Request,
+    name: str = Query(..., min_length=1, max_length=100),
+    format: Literal["csv", "jsonl"] = "csv",
+    prompt: Optional[str] = Query(None, max_length=2000),
+    caller_ids: List[str] = Query([]),
+    cps: Optional[float] = Query(None, gt=0, le=1000),
+    max_concurrency: Optional[int] = Query(None, ge=1, le=10000),
+    per_caller_concurrency: Optional[int] = Query(None, ge=1, le=1000),
+    max_attempts: Optional[int] = Query(None, ge=1, le=10),
+    locale: Optional[str] = None,
+    tenant: Optional[str] = None,
+    manager: CampaignManager = Depends(get_campaigns),
+):
+    """Start dialing a contact list sent as the raw CSV or JSONL request body."""
+    path = manager.spool_path()
+    size = 0
+    try:
+        fh = await run_blocking("db", open, path, "wb")
+        try:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail="Contact list too large")
+                await run_blocking("db", fh.write, chunk)
+        finally:
+            await run_blocking("db", fh.close)
+        total = await run_blocking("db", count_contacts, path, format)
+    except (HTTPException, UnicodeDecodeError, ValueError) as e:
+        path.unlink(missing_ok=True)
+        if isinstance(e, HTTPException):
+            raise
+        raise HTTPException(status_code=400, detail=f"Unreadable contact list: {e}")
+    if not total:
+        path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail="Contact list is empty")
+
+    campaign = Campaign(
+        name,
+        path,
+        format,
+        total,
+        prompt=prompt,
+        caller_ids=caller_ids,
+        cps=cps,
+        max_concurrency=max_concurrency,
+        per_caller_concurrency=per_caller_concurrency,
+        max_attempts=max_attempts,
+        locale=locale or get_settings(tenant, name)["locale"],
+    )
+    manager.start(campaign)
+    return campaign.progress()
+
+
+@router.get("/campaigns")
+async def list_campaigns(manager: CampaignManager = Depends(get_campaigns)):
+    return {"items": [c.progress() for c in manager.list()]}
+
+
+@router.get("/campaigns/{campaign_id}")
+async def get_campaign(campaign_id: str, manager: CampaignManager = Depends(get_campaigns)):
+    return _campaign_or_404(manager, campaign_id).progress()
+
+
+@router.post("/campaigns/{campaign_id}/{action}")
+async def control_campaign(
+    campaign_id: str,
+    action: Literal["pause", "resume", "cancel"],
+    manager: CampaignManager = Depends(get_campaigns),
+):
+    campaign = _campaign_or_404(manager, campaign_id)
+    if campaign.finished:
+        raise HTTPException(status_code=409, detail=f"Campaign is {campaign.status.lower()}")
+    getattr(campaign, action)()
+    if action == "cancel":
+        await campaign.wait()
+    return campaign.progress()
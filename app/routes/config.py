@@ -1,7 +1,16 @@
+from typing import Literal, Optional
+
 from fastapi import APIRouter
 from pydantic import BaseModel
 
-from app.config import get_default_locale, set_default_locale
+from app.config import (
+    config_store,
+    get_default_locale,
+    get_settings,
+    set_default_locale,
+    set_scoped_settings,
+)
+from app.services.executor import run_blocking
 
 router = APIRouter()
 
@@ -10,6 +19,15 @@ class LocaleUpdateRequest(BaseModel):
     locale: str
 
 
+class ScopedSettings(BaseModel):
+    locale: Optional[str] = None
+    tts_provider: Optional[str] = None
+    stt_provider: Optional[str] = None
+    voice_id: Optional[str] = None
+    tts_model: Optional[str] = None
+    llm_model: Optional[str] = None
+
+
 @router.get("/config/locale")
 async def read_locale():
     return {"default_locale": get_default_locale()}
@@ -17,5 +35,20 @@ async def read_locale():
 
 @router.post("/config/locale")
 async def update_locale(payload: LocaleUpdateRequest):
-    set_default_locale(payload.locale)
-    return {"default_locale": payload.locale}
+    await run_blocking("config", set_default_locale, payload.locale)
+    return {"default_locale": payload.locale, "version": config_store.version}
+
+
+@router.get("/config/settings")
+async def read_settings(tenant: Optional[str] = None, campaign: Optional[str] = None):
+    """Effective settings after tenant and campaign overrides."""
+    return {"version": config_store.version, "settings": get_settings(tenant, campaign)}
+
+
+@router.put("/config/{scope}/{name}")
+async def update_scoped_settings(
+    scope: Literal["tenants", "campaigns"], name: str, payload: ScopedSettings
+):
+    """Replace the overrides for one tenant or campaign. An empty body removes them."""
+    values = await run_blocking("config", set_scoped_settings, scope, name, payload.dict())
+    return {"scope": scope, "name": name, "overrides": values, "version": config_store.version}
@@ -0,0 +1,42 @@
+import time
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+
+from app.services.executor import run_blocking
+from app.services.intent import invalidate_intent_cache
+from app.services.registry import ProviderRegistry, get_providers
+
+MAX_BATCH = 1000
+
+router = APIRouter()
+
+
+class IntentBatchRequest(BaseModel):
+    texts: List[str]
+    allow_llm: bool = True
+
+
+@router.post("/intent/batch")
+async def classify_batch(payload: IntentBatchRequest, providers: ProviderRegistry = Depends(get_providers)):
+    """Classify up to ``MAX_BATCH`` transcripts in one call."""
+    if len(payload.texts) > MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH} texts per batch")
+    classifier = providers.intent()
+    start = time.perf_counter()
+    predictions = await run_blocking("intent", classifier.classify_many, payload.texts, payload.allow_llm)
+    elapsed = time.perf_counter() - start
+    return {
+        "results": [p._asdict() for p in predictions],
+        "count": len(predictions),
+        "seconds": round(elapsed, 4),
+        "per_second": round(len(predictions) / elapsed, 1) if elapsed else None,
+    }
+
+
+@router.post("/intent/cache/invalidate")
+async def invalidate_cache():
+    """Drop cached LLM intent results in every worker process."""
+    generation = await run_blocking("config", invalidate_intent_cache)
+    return {"generation": generation}
@@ -0,0 +1,44 @@
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.models.db import Job, get_async_db, get_db
+from app.services.executor import run_blocking
+
+router = APIRouter()
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    conversation_id: Optional[int] = None
+    status: str
+    stage: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    run_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_ts: Optional[datetime] = None
+    updated_ts: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    session: Session = Depends(get_db),
+    async_session=Depends(get_async_db),
+):
+    if async_session is not None:
+        job = await async_session.get(Job, job_id)
+    else:
+        job = await run_blocking("db", session.get, Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
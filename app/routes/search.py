@@ -0,0 +1,62 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.models.db import get_db
+from app.services.executor import run_blocking
+from app.services.search import transcript_search
+
+MAX_OFFSET = 1000
+
+router = APIRouter()
+
+
+class SearchHitResponse(BaseModel):
+    conversation_id: int
+    phone: Optional[str] = None
+    start_ts: Optional[datetime] = None
+    intents: Optional[List[str]] = None
+    rank: float
+    snippet: str
+
+
+class SearchResponse(BaseModel):
+    query: str
+    items: List[SearchHitResponse]
+    next_offset: Optional[int] = None
+    truncated: bool = False
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search_transcripts(
+    q: str = Query(..., min_length=1, max_length=200),
+    intent: Optional[str] = Query(None, pattern="^[A-Z_]+$"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=MAX_OFFSET),
+    session: Session = Depends(get_db),
+):
+    """Search transcripts. Matches are bracketed in each snippet."""
+    results = await run_blocking(
+        "db",
+        transcript_search.search,
+        session,
+        q,
+        intent=intent,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit + 1,
+        offset=offset,
+    )
+    hits = results.hits
+    next_offset = offset + limit if len(hits) > limit and offset + limit <= MAX_OFFSET else None
+    return {
+        "query": q,
+        "items": [h._asdict() for h in hits[:limit]],
+        "next_offset": next_offset,
+        "truncated": results.truncated,
+    }
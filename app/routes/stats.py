@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.models.db import get_db
+from app.services.executor import run_blocking
+from app.services.stats import BUCKETS, query_stats
+
+MAX_BUCKETS = 2000
+
+router = APIRouter()
+
+
+class StatsSummary(BaseModel):
+    calls: int
+    avg_handle_seconds: Optional[float] = None
+    tickets_opened: int
+    tickets_resolved: int
+    ticket_rate: Optional[float] = None
+    resolution_rate: Optional[float] = None
+    avg_resolve_seconds: Optional[float] = None
+    intents: Dict[str, int]
+
+
+class StatsBucket(StatsSummary):
+    bucket_start: datetime
+
+
+class StatsResponse(BaseModel):
+    bucket: str
+    as_of: Optional[datetime] = None
+    totals: StatsSummary
+    items: List[StatsBucket]
+
+
+@router.get("/stats", response_model=StatsResponse)
+async def get_stats(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    bucket: Literal["hour", "day", "week"] = "hour",
+    locale: Optional[str] = None,
+    direction: Optional[Literal["INBOUND", "OUTBOUND"]] = None,
+    session: Session = Depends(get_db),
+):
+    """Call volume, handling time, ticket rates and intents per UTC bucket, from the hourly rollups."""
+    date_to = date_to or datetime.utcnow()
+    date_from = date_from or date_to - timedelta(days=1)
+    if date_from >= date_to:
+        raise HTTPException(status_code=422, detail="date_from must be before date_to")
+    if (date_to - date_from) / BUCKETS[bucket] > MAX_BUCKETS:
+        raise HTTPException(status_code=422, detail=f"Range spans more than {MAX_BUCKETS} {bucket} buckets")
+    return await run_blocking(
+        "db", query_stats, session, date_from, date_to, bucket=bucket, locale=locale, direction=direction
+    )
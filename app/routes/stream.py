@@ -0,0 +1,101 @@
+import base64
+import json
+import time
+from datetime import datetime
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from prometheus_client import Counter, Histogram
+
+from app.logging_config import logger
+from app.models.db import session_scope
+from app.services.conversation import attach_stream_transcript, insert_conversation
+from app.services.executor import run_blocking
+from app.services.stt import STTStreamListener
+from app.services.stt_stream import TranscriptEvent
+from app.services.unit_of_work import commit_unit
+
+STT_CHUNK_SECONDS = Histogram(
+    "voice_agent_stt_chunk_seconds",
+    "Time to decode and forward one media stream chunk to the STT backend",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.5, 1.0),
+)
+STT_STREAM_EVENTS = Counter(
+    "voice_agent_stt_stream_events_total", "Streaming transcript events", ["kind"]
+)
+
+router = APIRouter()
+
+
+def _log_event(call_sid: str):
+    def handler(event: TranscriptEvent) -> None:
+        kind = "final" if event.is_final else "partial"
+        STT_STREAM_EVENTS.labels(kind).inc()
+        logger.bind(call_sid=call_sid, kind=kind, start=event.start, end=event.end).info(event.text)
+
+    return handler
+
+
+@router.websocket("/stream/twilio")
+async def twilio_media_stream(websocket: WebSocket):
+    """Transcribe a Twilio Media Stream as it arrives and store the final transcript."""
+    await websocket.accept()
+    listener: STTStreamListener | None = None
+    params: dict = {}
+    call_sid = ""
+    started = datetime.utcnow()
+    try:
+        while True:
+            event = json.loads(await websocket.receive_text())
+            kind = event.get("event")
+            if kind == "start":
+                start = event.get("start", {})
+                call_sid = start.get("callSid", "")
+                params = start.get("customParameters") or {}
+                started = datetime.utcnow()
+                listener = STTStreamListener(locale=params.get("locale"), on_event=_log_event(call_sid))
+                await listener.start()
+            elif kind == "media" and listener is not None:
+                media = event.get("media", {})
+                if media.get("track", "inbound") != "inbound":
+                    continue
+                t0 = time.perf_counter()
+                await listener.feed_ulaw(base64.b64decode(media["payload"]))
+                STT_CHUNK_SECONDS.observe(time.perf_counter() - t0)
+            elif kind == "stop":
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if listener is not None:
+            transcript = await listener.finish()
+            await _store_transcript(params, started, transcript)
+
+
+async def _store_transcript(params: dict, started: datetime, transcript: str) -> None:
+    # Outbound calls name the conversation they opened; anything else is a
+    # new inbound call.
+    conversation_id = params.get("conversation_id")
+    if conversation_id:
+        if not str(conversation_id).isdigit():
+            logger.warning(f"Ignoring media stream with invalid conversation_id {conversation_id!r}")
+            return
+        if not await commit_unit(attach_stream_transcript, int(conversation_id), transcript):
+            logger.info(f"Conversation {conversation_id} was deleted during the call; transcript dropped")
+        return
+
+    fields = dict(
+        phone=params.get("From"),
+        direction="INBOUND",
+        start_ts=started,
+        end_ts=datetime.utcnow(),
+        transcript=transcript,
+        status="CLOSED",
+    )
+    if params.get("locale"):
+        fields["locale"] = params["locale"]
+
+    def store() -> None:
+        with session_scope() as session:
+            insert_conversation(session, **fields)
+
+    await run_blocking("db", store)
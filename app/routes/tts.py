@@ -0,0 +1,63 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from app.config import get_settings
+from app.services.registry import ProviderRegistry, get_providers
+
+router = APIRouter()
+
+
+class WarmupRequest(BaseModel):
+    prompts: List[str]
+    locale: Optional[str] = None
+    tenant: Optional[str] = None
+    campaign: Optional[str] = None
+    concurrency: int = 4
+
+
+class StreamRequest(BaseModel):
+    text: str = Field(..., min_length=1, max_length=10000)
+    locale: Optional[str] = None
+    tenant: Optional[str] = None
+    campaign: Optional[str] = None
+    output_format: Optional[str] = Field(None, pattern="^(mp3|pcm|ulaw)_[0-9_]+$")
+
+
+def _media_type(provider: str, output_format: Optional[str]) -> str:
+    if provider == "twilio":
+        return "application/xml"
+    if output_format and output_format.startswith("ulaw"):
+        return "audio/basic"
+    if output_format and output_format.startswith("pcm"):
+        return "audio/L16"
+    return "audio/mpeg"
+
+
+@router.get("/tts/cache")
+async def tts_cache_stats(providers: ProviderRegistry = Depends(get_providers)):
+    return providers.tts_cache.stats()
+
+
+@router.post("/tts/warmup")
+async def tts_warmup(payload: WarmupRequest, providers: ProviderRegistry = Depends(get_providers)):
+    """Pre-render a campaign's prompts into the TTS cache before dialing."""
+    settings = get_settings(payload.tenant, payload.campaign)
+    locale = settings["locale"] = payload.locale or settings["locale"]
+    tts = providers.tts_for(settings, providers.router("tts").preferred(settings.get("tts_provider")))
+    result = await providers.tts_cache.warm(tts, payload.prompts, max(1, payload.concurrency))
+    return {**result, "locale": locale}
+
+
+@router.post("/tts/stream")
+async def tts_stream(payload: StreamRequest, providers: ProviderRegistry = Depends(get_providers)):
+    """Stream speech for ``text``, synthesizing sentences ahead of playback."""
+    settings = get_settings(payload.tenant, payload.campaign)
+    settings["locale"] = payload.locale or settings["locale"]
+    tts = providers.tts_for(settings)
+    return StreamingResponse(
+        tts.stream_sentences(payload.text, output_format=payload.output_format),
+        media_type=_media_type(tts.provider, payload.output_format),
+    )
@@ -1,15 +1,20 @@
-from .telephony import TelephonyService
-from .tts import TTSClient
-from .stt import STTClient
-from .intent import IntentClassifier
-from .ticket import TicketService
-from .live_agent import LiveAgentSimulator
-
-__all__ = [
-    "TelephonyService",
-    "TTSClient",
-    "STTClient",
-    "IntentClassifier",
-    "TicketService",
-    "LiveAgentSimulator",
-]
+"""Provider clients and domain services, imported lazily on first attribute access."""
+import importlib
+
+_EXPORTS = {
+    "TelephonyService": "telephony",
+    "TTSClient": "tts",
+    "STTClient": "stt",
+    "IntentClassifier": "intent",
+    "TicketService": "ticket",
+    "LiveAgentSimulator": "live_agent",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f"{__name__}.{module}"), name)
@@ -0,0 +1,74 @@
+import math
+import os
+from array import array
+from typing import List, Optional
+
+# Twilio Media Streams carry 8 kHz, 8-bit G.711 mu-law audio.
+TWILIO_SAMPLE_RATE = 8000
+
+
+def _ulaw_sample(byte: int) -> int:
+    u = ~byte & 0xFF
+    sign = u & 0x80
+    exponent = (u >> 4) & 0x07
+    mantissa = u & 0x0F
+    sample = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return -sample if sign else sample
+
+
+# Pre-decoded little-endian 16-bit sample for every mu-law byte.
+_ULAW_TABLE: List[bytes] = [
+    _ulaw_sample(b).to_bytes(2, "little", signed=True) for b in range(256)
+]
+
+
+def ulaw_to_pcm16(data: bytes) -> bytes:
+    """Decode G.711 mu-law bytes to 16-bit little-endian PCM."""
+    return b"".join(map(_ULAW_TABLE.__getitem__, data))
+
+
+def pcm16_rms(pcm: bytes) -> float:
+    """Return the RMS energy of 16-bit little-endian PCM audio."""
+    samples = array("h")
+    samples.frombytes(pcm[: len(pcm) - len(pcm) % 2])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+# Magic bytes of the containers providers accept, mapped to their MIME type.
+_SIGNATURES = (
+    (0, b"RIFF", "audio/wav"),
+    (0, b"fLaC", "audio/flac"),
+    (0, b"OggS", "audio/ogg"),
+    (0, b"ID3", "audio/mpeg"),
+    (0, b"\x1a\x45\xdf\xa3", "audio/webm"),
+    (4, b"ftyp", "audio/mp4"),
+)
+
+def detect_mimetype(data: bytes) -> Optional[str]:
+    """Guess the MIME type of an audio file from its first bytes, or ``None``."""
+    for offset, magic, mimetype in _SIGNATURES:
+        if data[offset:offset + len(magic)] == magic:
+            if magic == b"RIFF" and data[8:12] != b"WAVE":
+                return None
+            return mimetype
+    if len(data) >= 2 and data[0] == 0xFF and data[1] & 0xE0 == 0xE0:
+        return "audio/mpeg"  # MPEG frame sync without an ID3 tag
+    return None
+
+
+class AudioSettings:
+    """Preprocessing options, read from the environment."""
+
+    def __init__(self) -> None:
+        self.enabled = os.getenv("AUDIO_PREPROCESS", "1").lower() not in ("0", "false", "no")
+        self.sample_rate = int(os.getenv("AUDIO_SAMPLE_RATE", "16000"))
+        self.silence_dbfs = float(os.getenv("AUDIO_SILENCE_DBFS", "-45"))
+        self.trim_padding = float(os.getenv("AUDIO_TRIM_PADDING", "0.3"))
+        self.encoding = os.getenv("AUDIO_ENCODING", "pcm16").lower()
+        self.chunk_seconds = float(os.getenv("AUDIO_CHUNK_SECONDS", "600"))
+        self.chunk_overlap = float(os.getenv("AUDIO_CHUNK_OVERLAP", "2"))
+        self.max_bytes = int(os.getenv("AUDIO_PREPROCESS_MAX_BYTES", str(8 * 2**20)))
+        if self.encoding not in ("pcm16", "mulaw"):
+            raise ValueError(f"Unsupported AUDIO_ENCODING: {self.encoding}")
@@ -0,0 +1,235 @@
+"""Decode, resample, trim and chunk recordings before STT upload. Imports numpy."""
+import struct
+import time
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from prometheus_client import Counter, Histogram
+
+from app.services.audio import AudioSettings, _ulaw_sample
+
+AUDIO_BYTES = Counter(
+    "voice_agent_audio_preprocess_bytes_total", "Recording bytes before and after preprocessing", ["stage"]
+)
+AUDIO_PREPROCESS_SECONDS = Histogram(
+    "voice_agent_audio_preprocess_seconds",
+    "Time spent decoding, resampling, trimming and encoding a recording",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+AUDIO_TRIMMED_SECONDS = Counter(
+    "voice_agent_audio_trimmed_seconds_total", "Leading and trailing silence removed before upload"
+)
+
+_FORMAT_PCM = 1
+_FORMAT_FLOAT = 3
+_FORMAT_ALAW = 6
+_FORMAT_MULAW = 7
+_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class PreparedAudio(NamedTuple):
+    """A recording ready for upload: one or more overlapping WAV chunks."""
+
+    chunks: List[bytes]
+    mimetype: str
+    sample_rate: int
+    duration: float
+    trimmed: float
+    original_bytes: int
+
+    @property
+    def prepared_bytes(self) -> int:
+        return sum(len(c) for c in self.chunks)
+
+
+def decode_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """Decode a PCM, float, A-law or mu-law WAV to float32 ``(frames, channels)``; ``ValueError`` otherwise."""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("not a WAV file")
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id, size = data[pos:pos + 4], struct.unpack_from("<I", data, pos + 4)[0]
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack_from("<HHIIHH", data, body)
+            if fmt[0] == _FORMAT_EXTENSIBLE and size >= 26:
+                fmt = (struct.unpack_from("<H", data, body + 24)[0],) + fmt[1:]
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data before fmt chunk")
+            # Streaming writers leave the size at 0 or 0xFFFFFFFF; read to the end.
+            end = len(data) if size in (0, 0xFFFFFFFF) else min(len(data), body + size)
+            return _decode_samples(data[body:end], fmt), fmt[2]
+        pos = body + size + (size & 1)
+    raise ValueError("WAV file has no data chunk")
+
+
+def _decode_samples(raw: bytes, fmt: Tuple[int, ...]) -> np.ndarray:
+    tag, channels, _, _, _, bits = fmt
+    width = max(1, bits // 8)
+    raw = raw[: len(raw) - len(raw) % (width * channels)]
+    if tag == _FORMAT_PCM and bits == 8:
+        samples = (np.frombuffer(raw, np.uint8).astype(np.float32) - 128) / 128
+    elif tag == _FORMAT_PCM and bits == 16:
+        samples = np.frombuffer(raw, "<i2").astype(np.float32) / 32768
+    elif tag == _FORMAT_PCM and bits == 24:
+        b = np.frombuffer(raw, np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = ((b[:, 0] | b[:, 1] << 8 | b[:, 2] << 16) << 8 >> 8).astype(np.float32) / 2**23
+    elif tag == _FORMAT_PCM and bits == 32:
+        samples = (np.frombuffer(raw, "<i4") / 2**31).astype(np.float32)
+    elif tag == _FORMAT_FLOAT and bits in (32, 64):
+        samples = np.frombuffer(raw, "<f4" if bits == 32 else "<f8").astype(np.float32)
+    elif tag == _FORMAT_MULAW and bits == 8:
+        samples = _MULAW_DECODE[np.frombuffer(raw, np.uint8)]
+    elif tag == _FORMAT_ALAW and bits == 8:
+        samples = _ALAW_DECODE[np.frombuffer(raw, np.uint8)]
+    else:
+        raise ValueError(f"unsupported WAV encoding (format {tag}, {bits} bits)")
+    return samples.reshape(-1, channels)
+
+
+def _alaw_sample(byte: int) -> int:
+    a = byte ^ 0x55
+    exponent = (a >> 4) & 0x07
+    mantissa = a & 0x0F
+    sample = (mantissa << 4) + 8 if exponent == 0 else ((mantissa << 4) + 0x108) << (exponent - 1)
+    return sample if a & 0x80 else -sample
+
+
+_MULAW_DECODE = np.array([_ulaw_sample(b) for b in range(256)], dtype=np.float32) / 32768
+_ALAW_DECODE = np.array([_alaw_sample(b) for b in range(256)], dtype=np.float32) / 32768
+
+
+def resample(samples: np.ndarray, rate: int, target: int) -> np.ndarray:
+    """Resample mono ``samples`` from ``rate`` to ``target`` Hz, low-pass filtering before downsampling."""
+    if rate == target or not len(samples):
+        return samples
+    if target < rate:
+        taps = 63
+        cutoff = 0.5 * target / rate
+        n = np.arange(taps) - (taps - 1) / 2
+        kernel = (2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)).astype(np.float32)
+        samples = _fft_filter(samples, kernel / kernel.sum())
+    frames = int(round(len(samples) * target / rate))
+    positions = np.arange(frames, dtype=np.float64) * (rate / target)
+    index = positions.astype(np.int64)
+    frac = (positions - index).astype(np.float32)
+    following = samples[np.minimum(index + 1, len(samples) - 1)]
+    return samples[index] + (following - samples[index]) * frac
+
+
+def _fft_filter(samples: np.ndarray, kernel: np.ndarray, block: int = 1 << 15, batch: int = 64) -> np.ndarray:
+    # Overlap-save FFT convolution, aligned like np.convolve(mode="same") but
+    # several times faster for long recordings.
+    n = len(kernel)
+    step = block - n + 1
+    spectrum = np.fft.rfft(kernel, block)
+    padded = np.concatenate([np.zeros(n - 1, np.float32), samples, np.zeros(block, np.float32)])
+    frames = sliding_window_view(padded, block)[::step]
+    out = np.empty(len(frames) * step, np.float32)
+    for i in range(0, len(frames), batch):
+        part = frames[i:i + batch]
+        filtered = np.fft.irfft(np.fft.rfft(part, axis=1) * spectrum, block, axis=1)[:, n - 1:]
+        out[i * step:(i + len(part)) * step] = filtered.ravel()
+    shift = (n - 1) // 2
+    return out[shift:shift + len(samples)]
+
+
+def frame_dbfs(samples: np.ndarray, rate: int, frame_seconds: float = 0.02) -> np.ndarray:
+    """Return the energy of consecutive ``frame_seconds`` frames in dBFS."""
+    size = max(1, int(rate * frame_seconds))
+    frames = samples[: len(samples) - len(samples) % size].reshape(-1, size)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def trim_silence(samples: np.ndarray, rate: int, threshold_dbfs: float, padding: float) -> np.ndarray:
+    """Cut leading and trailing frames quieter than ``threshold_dbfs``, keeping ``padding`` seconds."""
+    frame_seconds = 0.02
+    voiced = np.flatnonzero(frame_dbfs(samples, rate, frame_seconds) > threshold_dbfs)
+    if not len(voiced):
+        return samples[:0]
+    size = int(rate * frame_seconds)
+    pad = int(rate * padding)
+    start = max(0, voiced[0] * size - pad)
+    end = min(len(samples), (voiced[-1] + 1) * size + pad)
+    return samples[start:end]
+
+
+def normalize(samples: np.ndarray, peak: float = 0.9) -> np.ndarray:
+    """Scale ``samples`` so the loudest one reaches ``peak``."""
+    loudest = float(np.max(np.abs(samples))) if len(samples) else 0.0
+    return samples * (peak / loudest) if loudest > 0 else samples
+
+
+def mulaw_encode(samples: np.ndarray) -> bytes:
+    """Encode float samples in ``[-1, 1]`` as G.711 mu-law bytes."""
+    pcm = np.clip(samples * 32768, -32768, 32767).astype(np.int32)
+    sign = np.where(pcm < 0, 0x80, 0)
+    magnitude = np.minimum(np.abs(pcm), 32635) + 0x84
+    exponent = np.clip(np.floor(np.log2(magnitude)).astype(np.int32) - 7, 0, 7)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | exponent << 4 | mantissa) & 0xFF).astype(np.uint8).tobytes()
+
+
+def encode_wav(samples: np.ndarray, rate: int, encoding: str = "pcm16") -> bytes:
+    """Encode mono float samples as a 16-bit PCM or 8-bit mu-law WAV file."""
+    if encoding == "mulaw":
+        data, tag, bits = mulaw_encode(samples), _FORMAT_MULAW, 8
+    else:
+        data = np.clip(samples * 32768, -32768, 32767).astype("<i2").tobytes()
+        tag, bits = _FORMAT_PCM, 16
+    width = bits // 8
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(data), b"WAVE",
+        b"fmt ", 16, tag, 1, rate, rate * width, width, bits,
+        b"data", len(data),
+    )
+    return header + data
+
+
+def split_chunks(samples: np.ndarray, rate: int, chunk_seconds: float, overlap: float) -> List[np.ndarray]:
+    """Split audio into overlapping chunks of about ``chunk_seconds``, cutting at quiet frames."""
+    size = int(rate * chunk_seconds)
+    if len(samples) <= size:
+        return [samples]
+    frame = int(rate * 0.02)
+    window = min(size // 4, int(rate * 5))
+    # Keep each chunk at least half new audio, whatever the overlap setting.
+    step_back = min(int(rate * overlap), (size - window) // 2)
+    chunks = []
+    start = 0
+    while len(samples) - start > size:
+        search = samples[start + size - window:start + size]
+        quiet = int(np.argmin(frame_dbfs(search, rate))) if len(search) >= frame else 0
+        cut = start + size - window + quiet * frame
+        chunks.append(samples[start:cut + step_back])
+        start = cut - step_back
+    chunks.append(samples[start:])
+    return chunks
+
+
+def prepare_for_stt(data: bytes, settings: AudioSettings | None = None) -> PreparedAudio:
+    """Downmix, resample, trim, normalize and chunk a WAV recording; ``ValueError`` if undecodable."""
+    s = settings or AudioSettings()
+    start = time.perf_counter()
+    samples, rate = decode_wav(data)
+    channels = samples.shape[1]
+    mono = samples @ np.full(channels, 1 / channels, np.float32) if channels > 1 else samples[:, 0]
+    target = min(rate, s.sample_rate)
+    mono = resample(mono, rate, target)
+    voiced = normalize(trim_silence(mono, target, s.silence_dbfs, s.trim_padding))
+    trimmed = (len(mono) - len(voiced)) / target
+    chunks = [
+        encode_wav(chunk, target, s.encoding)
+        for chunk in (split_chunks(voiced, target, s.chunk_seconds, s.chunk_overlap) if len(voiced) else [])
+    ]
+    prepared = PreparedAudio(chunks, "audio/wav", target, len(voiced) / target, trimmed, len(data))
+    AUDIO_PREPROCESS_SECONDS.observe(time.perf_counter() - start)
+    AUDIO_BYTES.labels("original").inc(len(data))
+    AUDIO_BYTES.labels("prepared").inc(prepared.prepared_bytes)
+    AUDIO_TRIMMED_SECONDS.inc(trimmed)
+    return prepared
@@ -0,0 +1,406 @@
+import asyncio
+import csv
+import itertools
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, NamedTuple, Optional, Set
+
+from prometheus_client import Counter, Gauge
+
+from app.logging_config import logger
+from app.services.conversation import (
+    close_dialed_conversation, create_open_conversation, discard_open_conversation,
+)
+from app.services.instrumentation import record_retry
+from app.services.ratelimit import TokenBucket
+from app.services.resilience import ProviderRouter, ProviderUnavailable
+from app.services.telephony import backoff_delay, is_retryable
+from app.services.unit_of_work import commit_unit
+
+CAMPAIGN_CALLS = Counter(
+    "voice_agent_campaign_calls_total", "Campaign dial attempts by outcome", ["outcome"]
+)
+CAMPAIGN_IN_FLIGHT = Gauge(
+    "voice_agent_campaign_calls_in_flight", "Campaign calls currently being placed"
+)
+
+CAMPAIGN_FORMATS = ("csv", "jsonl")
+CAMPAIGN_STATUSES = ("PENDING", "RUNNING", "PAUSED", "COMPLETED", "CANCELLED", "FAILED")
+
+
+class Contact(NamedTuple):
+    line: int
+    phone: Optional[str]
+    prompt: Optional[str]
+    metadata: Dict[str, Any]
+    error: Optional[str] = None
+
+
+_PLACEHOLDER = re.compile(r"\{\{|\}\}|\{(\w+)\}")
+
+
+def render_prompt(template: str, contact: Contact) -> str:
+    """Fill plain ``{name}`` placeholders from the contact's metadata and phone; unknown ones are kept."""
+    values = {**contact.metadata, "phone": contact.phone}
+
+    def fill(match: re.Match) -> str:
+        name = match.group(1)
+        if name is None:
+            return match.group(0)[0]
+        value = values.get(name)
+        return match.group(0) if value is None else str(value)
+
+    return _PLACEHOLDER.sub(fill, template)
+
+
+def _retryable(error: Exception) -> bool:
+    # The router wraps the last provider error; open circuits have no cause
+    # and are worth waiting out.
+    if isinstance(error, ProviderUnavailable):
+        return error.__cause__ is None or is_retryable(error.__cause__)
+    return is_retryable(error)
+
+
+def iter_contacts(path: Path, fmt: str) -> Iterator[Contact]:
+    """Yield contacts from a CSV or JSONL file; unreadable rows come back with ``error`` set."""
+    with open(path, newline="", encoding="utf-8") as fh:
+        if fmt == "csv":
+            reader = csv.DictReader(fh)
+            for row in reader:
+                row = {k.strip(): (v or "").strip() for k, v in row.items() if k}
+                if not any(row.values()):
+                    continue
+                phone = row.pop("phone", "") or None
+                prompt = row.pop("prompt", "") or None
+                yield Contact(reader.line_num, phone, prompt, row, None if phone else "missing phone")
+            return
+        for number, raw in enumerate(fh, start=1):
+            if not raw.strip():
+                continue
+            try:
+                row = json.loads(raw)
+                if not isinstance(row, dict):
+                    raise ValueError("row is not an object")
+            except ValueError as e:
+                yield Contact(number, None, None, {}, f"invalid JSON: {e}")
+                continue
+            phone = str(row["phone"]) if row.get("phone") else None
+            metadata = row.get("metadata") if isinstance(row.get("metadata"), dict) else {}
+            yield Contact(number, phone, row.get("prompt"), metadata, None if phone else "missing phone")
+
+
+def count_contacts(path: Path, fmt: str) -> int:
+    return sum(1 for _ in iter_contacts(path, fmt))
+
+
+class Campaign:
+    """One uploaded contact list, dialed through the telephony router under rate limits."""
+
+    def __init__(
+        self,
+        name: str,
+        path: Path,
+        fmt: str,
+        total: int,
+        prompt: Optional[str] = None,
+        caller_ids: Optional[List[str]] = None,
+        cps: float | None = None,
+        max_concurrency: int | None = None,
+        per_caller_concurrency: int | None = None,
+        max_attempts: int | None = None,
+        backoff: float | None = None,
+        locale: Optional[str] = None,
+        record: bool = True,
+    ) -> None:
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.path = Path(path)
+        self.format = fmt
+        self.total = total
+        self.prompt = prompt
+        self.caller_ids = caller_ids or []
+        self.cps = cps or float(os.getenv("CAMPAIGN_CPS", "1"))
+        self.max_concurrency = max_concurrency or int(os.getenv("CAMPAIGN_MAX_CONCURRENCY", "20"))
+        self.per_caller_concurrency = per_caller_concurrency or int(
+            os.getenv("CAMPAIGN_PER_CALLER_CONCURRENCY", "5")
+        )
+        self.max_attempts = max_attempts or int(os.getenv("CAMPAIGN_MAX_ATTEMPTS", "3"))
+        self.backoff = backoff if backoff is not None else float(os.getenv("CAMPAIGN_RETRY_BACKOFF", "2"))
+        self.locale = locale
+        self.record = record
+
+        self.status = "PENDING"
+        self.created_ts = datetime.utcnow()
+        self.finished_ts: Optional[datetime] = None
+        self.counts = {"dialed": 0, "succeeded": 0, "failed": 0, "retried": 0, "in_flight": 0}
+        self.errors: Deque[Dict[str, Any]] = deque(maxlen=20)
+
+        # No burst allowance: attempts are spaced evenly at ``cps``.
+        self._bucket = TokenBucket(self.cps, capacity=1.0)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._caller_slots: Dict[Optional[str], asyncio.Semaphore] = {}
+        self._callers = itertools.cycle(self.caller_ids or [None])
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+        self._active = 0.0
+        self._active_since: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # -- control ---------------------------------------------------------
+
+    def start(self, telephony: Any, router: ProviderRouter) -> None:
+        self._task = asyncio.create_task(self.run(telephony, router), name=f"campaign-{self.id}")
+
+    def pause(self) -> None:
+        if self.status == "RUNNING":
+            self.status = "PAUSED"
+            self._resumed.clear()
+            self._stop_clock()
+
+    def resume(self) -> None:
+        if self.status == "PAUSED":
+            self.status = "RUNNING"
+            self._start_clock()
+            self._resumed.set()
+
+    def cancel(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def wait(self) -> None:
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("COMPLETED", "CANCELLED", "FAILED")
+
+    # -- scheduling ------------------------------------------------------
+
+    async def run(self, telephony: Any, router: ProviderRouter) -> None:
+        self.status = "RUNNING"
+        self._start_clock()
+        pending = asyncio.Semaphore(self.max_concurrency * 4)
+        tasks: Set[asyncio.Task] = set()
+
+        def done(task: asyncio.Task) -> None:
+            tasks.discard(task)
+            pending.release()
+
+        try:
+            async for contact in self._contacts():
+                await pending.acquire()
+                task = asyncio.create_task(self._dial(telephony, router, contact))
+                tasks.add(task)
+                task.add_done_callback(done)
+            if tasks:
+                await asyncio.gather(*tasks)
+            self.status = "COMPLETED"
+        except asyncio.CancelledError:
+            self.status = "CANCELLED"
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        except Exception as e:
+            self.status = "FAILED"
+            self.errors.append({"line": None, "phone": None, "error": f"{type(e).__name__}: {e}"})
+            logger.exception(f"Campaign {self.id} stopped: {e}")
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._stop_clock()
+            self._resumed.set()
+            self.finished_ts = datetime.utcnow()
+            self.path.unlink(missing_ok=True)
+            logger.info(f"Campaign {self.id} {self.status.lower()}: {self.counts}")
+
+    async def _contacts(self) -> AsyncIterator[Contact]:
+        # Reading is buffered; yield to the loop now and then so huge files
+        # never hold it for long.
+        for n, contact in enumerate(iter_contacts(self.path, self.format)):
+            if n % 256 == 0:
+                await asyncio.sleep(0)
+            yield contact
+
+    def _caller_for(self, contact: Contact) -> Optional[str]:
+        caller_id = contact.metadata.get("caller_id")
+        return str(caller_id) if caller_id else next(self._callers)
+
+    def _caller_slot(self, caller_id: Optional[str]) -> asyncio.Semaphore:
+        slot = self._caller_slots.get(caller_id)
+        if slot is None:
+            slot = self._caller_slots[caller_id] = asyncio.Semaphore(self.per_caller_concurrency)
+        return slot
+
+    async def _dial(self, telephony: Any, router: ProviderRouter, contact: Contact) -> None:
+        if contact.error:
+            self._fail(contact, contact.error)
+            return
+        prompt = render_prompt(contact.prompt or self.prompt or "", contact)
+        if not prompt:
+            self._fail(contact, "missing prompt")
+            return
+
+        caller_id = self._caller_for(contact)
+        conversation_id: Optional[int] = None
+        settled = False
+        attempt = 0
+        try:
+            while True:
+                await self._resumed.wait()
+                attempt += 1
+                async with self._caller_slot(caller_id), self._slots:
+                    await self._bucket.aacquire()
+                    await self._resumed.wait()
+                    started = datetime.utcnow()
+                    if self.record and conversation_id is None:
+                        # Opened before dialing so the call's media stream can name it.
+                        conversation_id = await self._open(contact, started)
+                    self.counts["dialed"] += 1
+                    self.counts["in_flight"] += 1
+                    CAMPAIGN_IN_FLIGHT.inc()
+                    stream_params = {"conversation_id": conversation_id} if conversation_id else None
+                    try:
+                        await router.call(
+                            lambda _: telephony.start_outbound_call(
+                                contact.phone,
+                                prompt,
+                                contact.metadata,
+                                caller_id=caller_id,
+                                retries=0,
+                                stream_params=stream_params,
+                            )
+                        )
+                        error = None
+                    except Exception as e:
+                        error = e
+                    finally:
+                        self.counts["in_flight"] -= 1
+                        CAMPAIGN_IN_FLIGHT.dec()
+
+                if error is None:
+                    self.counts["succeeded"] += 1
+                    CAMPAIGN_CALLS.labels("succeeded").inc()
+                    if conversation_id is not None:
+                        settled = True
+                        await self._settle(close_dialed_conversation, conversation_id, started)
+                    return
+                if attempt >= self.max_attempts or not _retryable(error):
+                    self._fail(contact, f"{type(error).__name__}: {error}")
+                    return
+                self.counts["retried"] += 1
+                CAMPAIGN_CALLS.labels("retried").inc()
+                record_retry("telephony", "twilio", type(error).__name__)
+                await asyncio.sleep(backoff_delay(attempt, self.backoff))
+        finally:
+            if conversation_id is not None and not settled:
+                # A dial that never connected leaves no conversation behind.
+                await asyncio.shield(self._settle(discard_open_conversation, conversation_id))
+
+    async def _open(self, contact: Contact, started: datetime) -> Optional[int]:
+        fields = {"phone": contact.phone, "direction": "OUTBOUND", "start_ts": started}
+        if self.locale:
+            fields["locale"] = self.locale
+        try:
+            return await commit_unit(create_open_conversation, **fields)
+        except Exception as e:
+            logger.warning(f"Campaign {self.id} could not record call to {contact.phone}: {e}")
+            return None
+
+    async def _settle(self, work: Any, conversation_id: int, *args: Any) -> None:
+        try:
+            await commit_unit(work, conversation_id, *args)
+        except Exception as e:
+            logger.warning(f"Campaign {self.id} could not update conversation {conversation_id}: {e}")
+
+    def _fail(self, contact: Contact, error: str) -> None:
+        self.counts["failed"] += 1
+        CAMPAIGN_CALLS.labels("failed").inc()
+        self.errors.append({"line": contact.line, "phone": contact.phone, "error": error})
+
+    # -- progress --------------------------------------------------------
+
+    def _start_clock(self) -> None:
+        if self._active_since is None:
+            self._active_since = time.monotonic()
+
+    def _stop_clock(self) -> None:
+        if self._active_since is not None:
+            self._active += time.monotonic() - self._active_since
+            self._active_since = None
+
+    def active_seconds(self) -> float:
+        running = time.monotonic() - self._active_since if self._active_since is not None else 0.0
+        return self._active + running
+
+    def progress(self) -> Dict[str, Any]:
+        """Counters plus completion ratio and an ETA from throughput while running."""
+        done = self.counts["succeeded"] + self.counts["failed"]
+        elapsed = self.active_seconds()
+        rate = done / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total - done, 0)
+        eta = None
+        if not self.finished and rate > 0:
+            eta = round(remaining / rate, 1)
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "total": self.total,
+            **self.counts,
+            "remaining": remaining,
+            "percent": round(100.0 * done / self.total, 1) if self.total else 100.0,
+            "calls_per_second": round(rate, 3),
+            "elapsed_seconds": round(elapsed, 1),
+            "eta_seconds": eta,
+            "created_ts": self.created_ts,
+            "finished_ts": self.finished_ts,
+            "limits": {
+                "cps": self.cps,
+                "max_concurrency": self.max_concurrency,
+                "per_caller_concurrency": self.per_caller_concurrency,
+                "max_attempts": self.max_attempts,
+            },
+            "recent_errors": list(self.errors),
+        }
+
+
+class CampaignManager:
+    """Process-local registry of campaigns, kept on ``app.state``."""
+
+    def __init__(self, providers: Any = None, directory: str | None = None) -> None:
+        self.providers = providers
+        self.directory = Path(
+            directory or os.getenv("CAMPAIGN_DIR") or Path(tempfile.gettempdir()) / "voice-agent-campaigns"
+        )
+        self._campaigns: Dict[str, Campaign] = {}
+
+    def spool_path(self) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=self.directory, prefix="campaign-", suffix=".upload")
+        os.close(fd)
+        return Path(path)
+
+    def start(self, campaign: Campaign) -> Campaign:
+        self._campaigns[campaign.id] = campaign
+        campaign.start(self.providers.telephony(), self.providers.router("telephony"))
+        return campaign
+
+    def get(self, campaign_id: str) -> Optional[Campaign]:
+        return self._campaigns.get(campaign_id)
+
+    def list(self) -> List[Campaign]:
+        return sorted(self._campaigns.values(), key=lambda c: c.created_ts, reverse=True)
+
+    async def aclose(self) -> None:
+        for campaign in self._campaigns.values():
+            campaign.cancel()
+        await asyncio.gather(*(c.wait() for c in self._campaigns.values()))
@@ -0,0 +1,133 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import String, cast, delete, func, select, update
+from sqlalchemy.orm import Session, selectinload
+
+from app.models.db import Conversation, Ticket
+from app.services.pagination import keyset_page
+from app.services.ticket import TicketService
+
+
+class ConversationDeleted(LookupError):
+    """The conversation was deleted (e.g. erased) while its call was being processed."""
+
+
+def insert_conversation(session: Session, **fields) -> Conversation:
+    """Insert a conversation and load its primary key."""
+    conv = Conversation(**fields)
+    session.add(conv)
+    session.commit()
+    session.refresh(conv)
+    return conv
+
+
+def close_conversation(session: Session, conv: Conversation, transcript: str, intent: str) -> None:
+    """Store the transcript and intent and mark the conversation closed."""
+    conv.transcript = transcript
+    conv.intents = [intent]
+    conv.end_ts = datetime.utcnow()
+    conv.status = "CLOSED"
+    session.add(conv)
+    session.commit()
+    session.refresh(conv)
+
+
+def create_open_conversation(session: Session, **fields) -> int:
+    """Add a conversation for a call that is still in progress. Does not commit."""
+    conv = Conversation(status="OPEN", **fields)
+    session.add(conv)
+    session.flush()
+    return conv.id
+
+
+def close_dialed_conversation(session: Session, conversation_id: int, started: datetime) -> None:
+    """Close an outbound conversation once its dial succeeded. Does not commit."""
+    session.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id, Conversation.status == "OPEN")
+        .values(start_ts=started, end_ts=func.coalesce(Conversation.end_ts, datetime.utcnow()), status="CLOSED")
+    )
+
+
+def discard_open_conversation(session: Session, conversation_id: int) -> None:
+    """Delete a conversation that is still ``OPEN``, e.g. a dial that never connected. Does not commit."""
+    session.execute(delete(Conversation).where(Conversation.id == conversation_id, Conversation.status == "OPEN"))
+
+
+def attach_stream_transcript(session: Session, conversation_id: int, transcript: str) -> bool:
+    """Store a media stream's transcript on its conversation; ``False`` if it was deleted. Does not commit."""
+    updated = session.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(
+            transcript=transcript, end_ts=func.coalesce(Conversation.end_ts, datetime.utcnow()), status="CLOSED"
+        )
+    )
+    return updated.rowcount == 1
+
+
+def record_call_outcome(
+    session: Session, conversation_id: int, transcript: str, intent: str, open_ticket: bool = True
+) -> Optional[int]:
+    """Close a conversation and open its ticket once; the caller commits. Raises :class:`ConversationDeleted`."""
+    updated = session.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(
+            transcript=transcript,
+            intents=[intent],
+            # An end time already folded into the stats rollups is kept.
+            end_ts=func.coalesce(Conversation.end_ts, datetime.utcnow()),
+            status="CLOSED",
+        )
+    )
+    if updated.rowcount == 0:
+        raise ConversationDeleted(f"conversation {conversation_id} no longer exists")
+    if not open_ticket:
+        return None
+    # The UPDATE holds the conversation's row lock, so a reclaimed job attempt
+    # sees the ticket an earlier attempt committed instead of adding another.
+    existing = session.execute(
+        select(Ticket.id).where(Ticket.conversation_id == conversation_id).order_by(Ticket.id).limit(1)
+    ).scalar()
+    if existing is not None:
+        return existing
+    return TicketService(session).create_ticket(conversation_id, intent, commit=False).id
+
+
+def intent_clause(intent: str):
+    """Filter matching conversations whose ``intents`` list contains ``intent``."""
+    # intents is a JSON list; match the quoted label in its serialized form.
+    return cast(Conversation.intents, String).like(f'%"{intent}"%')
+
+
+def list_conversations(
+    session: Session,
+    phone: Optional[str] = None,
+    direction: Optional[str] = None,
+    status: Optional[str] = None,
+    intent: Optional[str] = None,
+    locale: Optional[str] = None,
+    start_from: Optional[datetime] = None,
+    start_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> Tuple[List[Conversation], Optional[str]]:
+    """Return a page of conversations, newest first, with tickets preloaded."""
+    query = session.query(Conversation).options(selectinload(Conversation.tickets))
+    if phone:
+        query = query.filter(Conversation.phone == phone)
+    if direction:
+        query = query.filter(Conversation.direction == direction)
+    if status:
+        query = query.filter(Conversation.status == status)
+    if locale:
+        query = query.filter(Conversation.locale == locale)
+    if intent:
+        query = query.filter(intent_clause(intent))
+    if start_from:
+        query = query.filter(Conversation.start_ts >= start_from)
+    if start_to:
+        query = query.filter(Conversation.start_ts < start_to)
+    return keyset_page(query, Conversation.start_ts, Conversation.id, cursor, limit)
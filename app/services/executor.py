@@ -0,0 +1,79 @@
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, TypeVar
+
+from prometheus_client import Gauge
+
+T = TypeVar("T")
+
+EXECUTOR_WORKERS = Gauge(
+    "voice_agent_executor_workers", "Configured worker threads per provider pool", ["provider"]
+)
+EXECUTOR_IN_FLIGHT = Gauge(
+    "voice_agent_executor_in_flight",
+    "Calls submitted to a provider pool that have not finished (running or queued)",
+    ["provider"],
+)
+
+# Default worker counts per provider. Override with ``<PROVIDER>_MAX_WORKERS``,
+# e.g. ``STT_MAX_WORKERS=16``.
+DEFAULT_POOL_SIZES: Dict[str, int] = {
+    "telephony": 8,
+    "tts": 8,
+    "stt": 8,
+    "intent": 8,
+    "http": 16,
+    "db": 8,
+    "audio": 4,
+    "config": 2,
+}
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def pool_size(provider: str) -> int:
+    """Return the configured worker count for ``provider``."""
+    default = DEFAULT_POOL_SIZES.get(provider, 4)
+    return int(os.getenv(f"{provider.upper()}_MAX_WORKERS", default))
+
+
+def get_executor(provider: str) -> ThreadPoolExecutor:
+    """Return the bounded thread pool dedicated to ``provider``."""
+    executor = _executors.get(provider)
+    if executor is None:
+        with _lock:
+            executor = _executors.get(provider)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=pool_size(provider),
+                    thread_name_prefix=f"{provider}-io",
+                )
+                _executors[provider] = executor
+                EXECUTOR_WORKERS.labels(provider).set(pool_size(provider))
+    return executor
+
+
+async def run_blocking(provider: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking ``func`` on the provider's pool with the caller's context variables."""
+    loop = asyncio.get_running_loop()
+    in_flight = EXECUTOR_IN_FLIGHT.labels(provider)
+    in_flight.inc()
+    ctx = contextvars.copy_context()
+    try:
+        return await loop.run_in_executor(get_executor(provider), partial(ctx.run, func, *args, **kwargs))
+    finally:
+        in_flight.dec()
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Shut down every provider pool. Called on application shutdown."""
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
@@ -0,0 +1,206 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Optional, Protocol, Tuple
+
+from fastapi import Request
+from prometheus_client import Counter
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+
+from app.logging_config import logger
+from app.models.db import WebhookEvent, session_scope
+from app.services.executor import run_blocking
+
+IDEMPOTENCY_REQUESTS = Counter(
+    "voice_agent_idempotency_requests_total",
+    "Webhook idempotency checks by namespace and outcome",
+    ["namespace", "result"],
+)
+
+
+class ExpiringSet:
+    """Bounded set whose members expire ``ttl`` seconds after insertion."""
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._items: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        while self._items:
+            key, expires = next(iter(self._items.items()))
+            if expires > now and len(self._items) <= self.max_entries:
+                break
+            self._items.popitem(last=False)
+
+    def add(self, key: Tuple[str, str]) -> bool:
+        """Add ``key``; return ``False`` if it was already present."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            if key in self._items:
+                return False
+            self._items[key] = now + self.ttl
+            if len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+            return True
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            return key in self._items
+
+    def discard(self, key: Tuple[str, str]) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class DurableBackend(Protocol):
+    """Shared tier visible to every worker and replica."""
+
+    def claim(self, namespace: str, key: str, ttl: float) -> bool: ...
+
+    def release(self, namespace: str, key: str) -> None: ...
+
+    def purge(self, ttl: float) -> int: ...
+
+
+class DatabaseBackend:
+    """Claims events with a unique insert into ``webhook_events``."""
+
+    def __init__(self, purge_every: int = 1000) -> None:
+        self.purge_every = purge_every
+        self._claims = 0
+
+    def claim(self, namespace: str, key: str, ttl: float) -> bool:
+        self._claims += 1
+        if self._claims % self.purge_every == 0:
+            self.purge(ttl)
+        with session_scope() as session:
+            session.add(WebhookEvent(namespace=namespace, event_key=key, created_ts=datetime.utcnow()))
+            try:
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+                return self._reclaim_expired(session, namespace, key, ttl)
+        return True
+
+    @staticmethod
+    def _reclaim_expired(session, namespace: str, key: str, ttl: float) -> bool:
+        """Take over a row older than ``ttl`` so expiry does not depend on purging."""
+        cutoff = datetime.utcnow() - timedelta(seconds=ttl)
+        taken = session.execute(
+            WebhookEvent.__table__.update()
+            .where(
+                WebhookEvent.namespace == namespace,
+                WebhookEvent.event_key == key,
+                WebhookEvent.created_ts < cutoff,
+            )
+            .values(created_ts=datetime.utcnow())
+        )
+        session.commit()
+        return taken.rowcount == 1
+
+    def release(self, namespace: str, key: str) -> None:
+        with session_scope() as session:
+            session.execute(
+                delete(WebhookEvent).where(WebhookEvent.namespace == namespace, WebhookEvent.event_key == key)
+            )
+            session.commit()
+
+    def purge(self, ttl: float) -> int:
+        cutoff = datetime.utcnow() - timedelta(seconds=ttl)
+        with session_scope() as session:
+            deleted = session.execute(delete(WebhookEvent).where(WebhookEvent.created_ts < cutoff)).rowcount
+            session.commit()
+        return deleted
+
+
+class RedisBackend:
+    """Claims events with ``SET key 1 NX EX ttl`` on any Redis-compatible server."""
+
+    def __init__(self, url: str = "redis://localhost:6379/0", client: Any = None) -> None:
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self._client = client
+
+    @staticmethod
+    def _key(namespace: str, key: str) -> str:
+        return f"idempotency:{namespace}:{key}"
+
+    def claim(self, namespace: str, key: str, ttl: float) -> bool:
+        return bool(self._client.set(self._key(namespace, key), 1, nx=True, ex=max(1, int(ttl))))
+
+    def release(self, namespace: str, key: str) -> None:
+        self._client.delete(self._key(namespace, key))
+
+    def purge(self, ttl: float) -> int:
+        return 0  # keys expire on their own
+
+
+def backend_from_env() -> Optional[DurableBackend]:
+    """Build the durable tier named by ``IDEMPOTENCY_BACKEND`` (db, redis or memory)."""
+    kind = os.getenv("IDEMPOTENCY_BACKEND", "db").lower()
+    if kind == "memory":
+        return None
+    if kind == "redis":
+        url = os.getenv("IDEMPOTENCY_REDIS_URL", "redis://localhost:6379/0")
+        try:
+            return RedisBackend(url)
+        except ImportError:
+            logger.warning("redis package not installed; using the database idempotency backend")
+    return DatabaseBackend()
+
+
+class IdempotencyStore:
+    """Two-tier record of processed webhook events: in-process set, then a durable backend."""
+
+    def __init__(
+        self,
+        backend: Optional[DurableBackend] = None,
+        ttl: float | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        self.ttl = ttl or float(os.getenv("IDEMPOTENCY_TTL", str(24 * 3600)))
+        self.memory = ExpiringSet(self.ttl, max_entries or int(os.getenv("IDEMPOTENCY_MEMORY_SIZE", "100000")))
+        self.backend = backend
+
+    async def claim(self, namespace: str, key: str) -> bool:
+        """Return ``True`` if this is the first delivery of ``key`` in ``namespace``."""
+        if (namespace, key) in self.memory:
+            IDEMPOTENCY_REQUESTS.labels(namespace, "duplicate_memory").inc()
+            return False
+        if self.backend is not None:
+            first = await run_blocking("db", self.backend.claim, namespace, key, self.ttl)
+            if not first:
+                IDEMPOTENCY_REQUESTS.labels(namespace, "duplicate_durable").inc()
+                return False
+            # Only keys this process claimed are cached, so a release() here
+            # is never shadowed by a stale entry in another worker.
+            self.memory.add((namespace, key))
+        elif not self.memory.add((namespace, key)):
+            IDEMPOTENCY_REQUESTS.labels(namespace, "duplicate_memory").inc()
+            return False
+        IDEMPOTENCY_REQUESTS.labels(namespace, "new").inc()
+        return True
+
+    async def release(self, namespace: str, key: str) -> None:
+        """Forget ``key`` so a provider retry is processed again, e.g. after a failure."""
+        self.memory.discard((namespace, key))
+        if self.backend is not None:
+            await run_blocking("db", self.backend.release, namespace, key)
+
+
+def get_idempotency(request: Request) -> IdempotencyStore:
+    """FastAPI dependency returning the application's idempotency store."""
+    return request.app.state.idempotency
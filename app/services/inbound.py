@@ -0,0 +1,137 @@
+import os
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from app.config import get_settings
+from app.logging_config import logger
+from app.services.audio import AudioSettings, detect_mimetype
+from app.services.conversation import ConversationDeleted, record_call_outcome
+from app.services.executor import run_blocking
+from app.services.instrumentation import provider_call
+from app.services.jobs import JobContext, register_handler
+from app.services.live_agent import LiveAgentSimulator
+from app.services.pipeline import Pipeline, Stage
+from app.services.stt import transcribe_chunks
+from app.services.unit_of_work import commit_unit
+
+INBOUND_RECORDING_JOB = "inbound_recording"
+
+
+class InboundCall:
+    """State carried through the inbound pipeline for one recording."""
+
+    __slots__ = ("ctx", "conversation_id", "settings", "locale", "transcript", "intent", "ticket_id")
+
+    def __init__(self, ctx: JobContext) -> None:
+        self.ctx = ctx
+        self.conversation_id: int = ctx.payload["conversation_id"]
+        self.settings = get_settings(ctx.payload.get("tenant"), ctx.payload.get("campaign"))
+        self.locale: Optional[str] = ctx.payload.get("locale") or self.settings["locale"]
+        self.transcript = ""
+        self.intent = ""
+        self.ticket_id: Optional[int] = None
+
+
+async def transcribe(call: InboundCall) -> InboundCall:
+    # The download is piped straight into the STT upload, so the two overlap
+    # and the recording is never buffered in full. WAV recordings whose
+    # Content-Length is within AUDIO_PREPROCESS_MAX_BYTES are the exception:
+    # they are buffered, shrunk and chunked first (see
+    # app.services.audio_prep.prepare_for_stt). Without a length, stream.
+    providers = call.ctx.providers
+    router = providers.router("stt")
+    with call.ctx.stage_timer("stt"), provider_call("recording", "http", "download") as download:
+        async with providers.http.stream("GET", call.ctx.payload["recording_url"]) as audio_resp:
+            audio_resp.raise_for_status()
+            mimetype = audio_resp.headers.get("content-type", "audio/wav").split(";")[0]
+            audio = download.count_received(audio_resp.aiter_bytes())
+            settings = AudioSettings()
+            length = int(audio_resp.headers.get("content-length") or 0)
+            if settings.enabled and 0 < length <= settings.max_bytes:
+                head = await anext(audio, b"")
+                detected = detect_mimetype(head[:16])
+                mimetype = detected or mimetype
+                if detected == "audio/wav":
+                    head, complete = await _buffer(head, audio, settings.max_bytes)
+                    if complete:
+                        from app.services.audio_prep import prepare_for_stt
+
+                        try:
+                            prepared = await run_blocking("audio", prepare_for_stt, head, settings)
+                        except ValueError as e:
+                            logger.warning(f"Uploading recording unprocessed: {e}")
+                        else:
+                            call.transcript = await transcribe_chunks(
+                                lambda chunk: router.call(
+                                    lambda name: providers.stt(call.locale, name).transcribe_stream(
+                                        chunk, prepared.mimetype
+                                    ),
+                                    prefer=call.settings.get("stt_provider"),
+                                ),
+                                prepared.chunks,
+                            )
+                            return call
+                audio = _chain(head, audio)
+            # A streamed download can only be uploaded once: no hedge or failover.
+            call.transcript = await router.call(
+                lambda name: providers.stt(call.locale, name).transcribe_stream(audio, mimetype=mimetype),
+                replayable=False,
+                deadline=float(os.getenv("STT_STREAM_DEADLINE", "900")),
+                prefer=call.settings.get("stt_provider"),
+            )
+    return call
+
+
+async def _buffer(head: bytes, chunks: AsyncIterator[bytes], limit: int) -> Tuple[bytes, bool]:
+    """Read ``chunks`` after ``head`` until exhausted (``True``) or past ``limit`` bytes."""
+    buffered = bytearray(head)
+    async for chunk in chunks:
+        buffered += chunk
+        if len(buffered) > limit:
+            return bytes(buffered), False
+    return bytes(buffered), True
+
+
+async def _chain(head: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    yield head
+    async for chunk in rest:
+        yield chunk
+
+
+async def classify(call: InboundCall) -> InboundCall:
+    with call.ctx.stage_timer("intent"):
+        classifier = call.ctx.providers.intent(call.settings.get("llm_model"))
+        call.intent = await run_blocking("intent", classifier.classify, call.transcript)
+    return call
+
+
+async def persist(call: InboundCall) -> InboundCall:
+    # Closing the conversation and opening the ticket is one transaction.
+    with call.ctx.stage_timer("ticket"):
+        live_agent = call.intent == "LIVE_AGENT"
+        try:
+            call.ticket_id = await commit_unit(
+                record_call_outcome, call.conversation_id, call.transcript, call.intent, not live_agent
+            )
+        except ConversationDeleted:
+            logger.info(f"Conversation {call.conversation_id} was deleted during processing; result dropped")
+            return call
+        if live_agent:
+            LiveAgentSimulator().handoff(call.conversation_id)
+    return call
+
+
+inbound_pipeline = Pipeline(
+    "inbound",
+    [
+        Stage("stt", transcribe, int(os.getenv("INBOUND_STT_CONCURRENCY", "8"))),
+        Stage("intent", classify, int(os.getenv("INBOUND_INTENT_CONCURRENCY", "4"))),
+        Stage("persist", persist, int(os.getenv("INBOUND_PERSIST_CONCURRENCY", "4"))),
+    ],
+)
+
+
+@register_handler(INBOUND_RECORDING_JOB, concurrency=inbound_pipeline.capacity)
+async def process_inbound_recording(ctx: JobContext) -> Dict[str, Any]:
+    """Download, transcribe and classify a recording, then create a ticket."""
+    call = await inbound_pipeline.submit(InboundCall(ctx))
+    return {"conversation_id": call.conversation_id, "intent": call.intent, "ticket_id": call.ticket_id}
@@ -0,0 +1,102 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterable, AsyncIterator, Iterator
+
+from opentelemetry import trace
+from opentelemetry.trace import Status, StatusCode
+from prometheus_client import Counter, Gauge, Histogram
+
+PROVIDER_REQUEST_SECONDS = Histogram(
+    "voice_agent_provider_request_seconds",
+    "Latency of calls to external providers and the database",
+    ["service", "provider", "operation", "outcome"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+PROVIDER_BYTES = Counter(
+    "voice_agent_provider_bytes_total",
+    "Payload bytes sent to and received from providers",
+    ["service", "provider", "direction"],
+)
+PROVIDER_ERRORS = Counter(
+    "voice_agent_provider_errors_total", "Failed provider calls by error type", ["service", "provider", "error"]
+)
+PROVIDER_RETRIES = Counter(
+    "voice_agent_provider_retries_total", "Provider calls retried after a failure", ["service", "provider"]
+)
+PROVIDER_IN_FLIGHT = Gauge(
+    "voice_agent_provider_in_flight", "Provider calls currently in progress", ["service", "provider"]
+)
+
+tracer = trace.get_tracer(__name__)
+
+
+class ProviderCall:
+    """Handle for one instrumented call, used to count its payload bytes."""
+
+    __slots__ = ("service", "provider", "span", "bytes_sent", "bytes_received")
+
+    def __init__(self, service: str, provider: str, span: trace.Span) -> None:
+        self.service = service
+        self.provider = provider
+        self.span = span
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def sent(self, n: int) -> None:
+        self.bytes_sent += n
+        PROVIDER_BYTES.labels(self.service, self.provider, "sent").inc(n)
+
+    def received(self, n: int) -> None:
+        self.bytes_received += n
+        PROVIDER_BYTES.labels(self.service, self.provider, "received").inc(n)
+
+    def set(self, key: str, value: Any) -> None:
+        self.span.set_attribute(key, value)
+
+    async def count_sent(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        async for chunk in chunks:
+            self.sent(len(chunk))
+            yield chunk
+
+    async def count_received(self, chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        async for chunk in chunks:
+            self.received(len(chunk))
+            yield chunk
+
+
+@contextmanager
+def provider_call(service: str, provider: str, operation: str, **attributes: Any) -> Iterator[ProviderCall]:
+    """Time, count and trace one call to an external provider or the database."""
+    span = tracer.start_span(
+        f"{service}.{operation}",
+        attributes={"service": service, "provider": provider, **attributes},
+    )
+    call = ProviderCall(service, provider, span)
+    in_flight = PROVIDER_IN_FLIGHT.labels(service, provider)
+    in_flight.inc()
+    outcome = "ok"
+    start = time.perf_counter()
+    try:
+        yield call
+    except (asyncio.CancelledError, GeneratorExit):
+        outcome = "cancelled"
+        raise
+    except BaseException as e:
+        outcome = "error"
+        PROVIDER_ERRORS.labels(service, provider, type(e).__name__).inc()
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, str(e)))
+        raise
+    finally:
+        PROVIDER_REQUEST_SECONDS.labels(service, provider, operation, outcome).observe(time.perf_counter() - start)
+        in_flight.dec()
+        span.set_attribute("bytes_sent", call.bytes_sent)
+        span.set_attribute("bytes_received", call.bytes_received)
+        span.end()
+
+
+def record_retry(service: str, provider: str, reason: str = "") -> None:
+    """Count a retry and note it on the current span."""
+    PROVIDER_RETRIES.labels(service, provider).inc()
+    trace.get_current_span().add_event("retry", {"service": service, "provider": provider, "reason": reason})
@@ -1,31 +1,426 @@
+import contextvars
+import json
+import math
 import os
-import openai
+import re
+import time
+from collections import Counter as TermCounter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from prometheus_client import Counter, Histogram
+
+from app.config import config_store
+from app.logging_config import logger
+from app.services.instrumentation import provider_call
+from app.services.intent_cache import IntentCache
+from app.services.ratelimit import TokenBucket
+
+INTENT_LABELS = ("SCHEDULE_CALLBACK", "RESOLVE_ISSUE", "OTHER", "LIVE_AGENT")
+FALLBACK_LABEL = "OTHER"
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+TRAINING_PATH = DATA_DIR / "intent_train.jsonl"
+EVAL_PATH = DATA_DIR / "intent_eval.jsonl"
+CACHE_GENERATION_KEY = "intent_cache_generation"
+
+INTENT_TIER_SECONDS = Histogram(
+    "voice_agent_intent_tier_seconds",
+    "Intent classification latency per tier",
+    ["tier"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.25, 1.0, 2.5, 5.0),
+)
+INTENT_PREDICTIONS = Counter(
+    "voice_agent_intent_predictions_total", "Intent predictions by deciding tier", ["tier", "label"]
+)
+
+
+class IntentPrediction(NamedTuple):
+    label: str
+    confidence: float
+    tier: str
+
+
+def load_examples(path: Path) -> List[Tuple[str, str]]:
+    """Load ``{"text", "label"}`` JSON lines."""
+    with open(path) as f:
+        return [(row["text"], row["label"]) for row in map(json.loads, f) if row]
+
+
+NEGATION_CUES = frozenset({"not", "no", "never", "don't", "dont", "doesn't", "didn't", "isn't", "wasn't", "nobody"})
+NEGATION_SCOPE = 6
+_CLAUSE = re.compile(r"[.,;:!?]|\b(?:but|and|so)\b")
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def _tokens(text: str) -> List[str]:
+    """Unigrams and bigrams; words just after a negation cue get a ``not_`` prefix."""
+    words: List[str] = []
+    for clause in _CLAUSE.split(text.lower()):
+        scope = 0
+        for word in _WORD.findall(clause):
+            if word in NEGATION_CUES:
+                words.append(word)
+                scope = NEGATION_SCOPE
+            elif scope:
+                words.append(f"not_{word}")
+                scope -= 1
+            else:
+                words.append(word)
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def negated_terms(text: str) -> frozenset:
+    """The words of ``text`` inside a negation's scope."""
+    return frozenset(token for token in _tokens(text) if token.startswith("not_") and " " not in token)
+
+
+def _negated(text: str, start: int) -> bool:
+    """Whether a negation cue precedes position ``start`` within its clause."""
+    clause = _CLAUSE.split(text[:start].lower())[-1]
+    return any(word in NEGATION_CUES for word in _WORD.findall(clause)[-(NEGATION_SCOPE + 1):])
+
+
+class KeywordRules:
+    """First tier: keyword patterns, trusted only when every non-negated match agrees."""
+
+    DEFAULT_RULES: Tuple[Tuple[str, str], ...] = (
+        (r"\b(agent|representative|operator|human|real person|someone real|manager)\b", "LIVE_AGENT"),
+        (r"\b(speak|talk)(ing)? (to|with) (a |an |some)?(one|body|person|agent|human)", "LIVE_AGENT"),
+        (r"\b(call|ring|phone) (me )?(back|again|later)\b", "SCHEDULE_CALLBACK"),
+        (r"\bcall ?back\b", "SCHEDULE_CALLBACK"),
+        (r"\b(tomorrow|later today|next week|this (afternoon|evening))\b.*\b(call|talk)\b", "SCHEDULE_CALLBACK"),
+        (r"\b(refund|charged|not working|doesn't work|won't|can't log ?in|broken|crash\w*|declined)\b", "RESOLVE_ISSUE"),
+    )
+
+    def __init__(self, rules: Iterable[Tuple[str, str]] | None = None, confidence: float = 0.95) -> None:
+        self.rules = [(re.compile(p, re.IGNORECASE), label) for p, label in (rules or self.DEFAULT_RULES)]
+        self.confidence = confidence
+
+    def predict(self, text: str) -> Optional[IntentPrediction]:
+        labels = {
+            label
+            for pattern, label in self.rules
+            for match in pattern.finditer(text)
+            if not _negated(text, match.start())
+        }
+        if len(labels) == 1:
+            return IntentPrediction(labels.pop(), self.confidence, "rules")
+        return None
+
+
+class CentroidClassifier:
+    """Second tier: TF-IDF nearest-centroid model trained from labelled transcripts."""
+
+    def __init__(self, temperature: float = 0.1) -> None:
+        self.temperature = temperature
+        self.idf: Dict[str, float] = {}
+        self.centroids: Dict[str, Dict[str, float]] = {}
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> "CentroidClassifier":
+        docs = [(_tokens(text), label) for text, label in examples]
+        df = TermCounter(term for tokens, _ in docs for term in set(tokens))
+        n = len(docs)
+        self.idf = {term: math.log((1 + n) / (1 + count)) + 1 for term, count in df.items()}
+        sums: Dict[str, Dict[str, float]] = {}
+        for tokens, label in docs:
+            centroid = sums.setdefault(label, {})
+            for term, weight in self._vector(tokens).items():
+                centroid[term] = centroid.get(term, 0.0) + weight
+        self.centroids = {label: self._normalize(vec) for label, vec in sums.items()}
+        return self
+
+    def _vector(self, tokens: List[str]) -> Dict[str, float]:
+        tf = TermCounter(t for t in tokens if t in self.idf)
+        return self._normalize({t: count * self.idf[t] for t, count in tf.items()})
+
+    @staticmethod
+    def _normalize(vec: Dict[str, float]) -> Dict[str, float]:
+        norm = math.sqrt(sum(w * w for w in vec.values()))
+        return {t: w / norm for t, w in vec.items()} if norm else {}
+
+    def predict(self, text: str) -> IntentPrediction:
+        vec = self._vector(_tokens(text))
+        if not vec or not self.centroids:
+            return IntentPrediction(FALLBACK_LABEL, 0.0, "centroid")
+        sims = {
+            label: sum(w * centroid.get(t, 0.0) for t, w in vec.items())
+            for label, centroid in self.centroids.items()
+        }
+        peak = max(sims.values())
+        exp = {label: math.exp((s - peak) / self.temperature) for label, s in sims.items()}
+        total = sum(exp.values())
+        label = max(exp, key=exp.get)
+        return IntentPrediction(label, exp[label] / total, "centroid")
 
 
 class IntentClassifier:
-    """Simple intent classifier using OpenAI chat-completion API."""
+    """Tiered intent classifier: keyword rules, a local TF-IDF model, then the LLM."""
 
-    def __init__(self, model: str | None = None):
+    def __init__(
+        self,
+        model: str | None = None,
+        threshold: float | None = None,
+        examples: Iterable[Tuple[str, str]] | None = None,
+        cache: IntentCache | None = None,
+    ) -> None:
         self.model = model or os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
         self.api_key = os.getenv("OPENAI_API_KEY")
         if not self.api_key:
-            raise ValueError("OPENAI_API_KEY environment variable not set")
-        openai.api_key = self.api_key
+            logger.warning("OPENAI_API_KEY not set; intent classification is local-only")
+        self.threshold = threshold if threshold is not None else float(os.getenv("INTENT_LOCAL_THRESHOLD", "0.75"))
+        self.timeout = float(os.getenv("INTENT_LLM_TIMEOUT", "5"))
+        self.batch_size = int(os.getenv("INTENT_BATCH_SIZE", "20"))
+        self.batch_concurrency = int(os.getenv("INTENT_BATCH_CONCURRENCY", "4"))
+        self._request_bucket = TokenBucket(float(os.getenv("INTENT_LLM_RPS", "3")))
+        tpm = float(os.getenv("INTENT_LLM_TPM", "60000"))
+        self._token_bucket = TokenBucket(tpm / 60, capacity=tpm)
+        self.rules = KeywordRules()
+        self.local = CentroidClassifier().fit(examples if examples is not None else load_examples(TRAINING_PATH))
+        self.cache = cache or IntentCache(
+            fingerprint=self.fingerprint(), path=self._cache_path(), generation=cache_generation,
+            polarity=negated_terms,
+        )
+
+    def preload(self) -> None:
+        """Import the LLM SDK now instead of on the first escalated transcript."""
+        if self.api_key:
+            _openai(self.api_key)
+
+    def _cache_path(self) -> Optional[str]:
+        """``INTENT_CACHE_PATH``, suffixed with the model unless it is the default one."""
+        path = os.getenv("INTENT_CACHE_PATH")
+        if path and self.model != os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"):
+            path = path + "." + re.sub(r"[^\w.-]", "_", self.model)
+        return path
+
+    def fingerprint(self) -> str:
+        """Identify the LLM configuration whose answers may be cached."""
+        return f"{self.model}|{','.join(INTENT_LABELS)}|{self._system_prompt()}"
+
+    @staticmethod
+    def _system_prompt() -> str:
+        return (
+            "You are an intent classifier.\n"
+            f"Possible intents: {', '.join(INTENT_LABELS)}.\n"
+            "Return only the intent label."
+        )
 
     def classify(self, text: str) -> str:
         """Return intent label for the given text."""
+        return self.predict(text).label
+
+    def predict(self, text: str, allow_llm: bool = True) -> IntentPrediction:
+        """Return the label, confidence and deciding tier for ``text``."""
+        prediction = self._predict_local(text)
+        if self._needs_llm(prediction, allow_llm):
+            prediction = self._escalate(text, prediction)
+        INTENT_PREDICTIONS.labels(prediction.tier, prediction.label).inc()
+        return prediction
+
+    def classify_many(self, texts: Sequence[str], allow_llm: bool = True) -> List[IntentPrediction]:
+        """Classify many transcripts, batching those the local tiers and cache miss into LLM requests."""
+        predictions = [self._predict_local(text) for text in texts]
+        escalate: List[int] = []
+        for i, prediction in enumerate(predictions):
+            if not self._needs_llm(prediction, allow_llm):
+                continue
+            cached = self.cache.get(texts[i])
+            if cached is not None:
+                predictions[i] = IntentPrediction(cached[0], 1.0, "cache")
+            else:
+                escalate.append(i)
+
+        batches = [escalate[i:i + self.batch_size] for i in range(0, len(escalate), self.batch_size)]
+        if batches:
+            # Each batch runs in a copy of the caller's context so its span nests.
+            contexts = [contextvars.copy_context() for _ in batches]
+            with ThreadPoolExecutor(max_workers=max(1, self.batch_concurrency)) as pool:
+                answers = pool.map(
+                    lambda ctx, idx: ctx.run(self._try_llm_batch, [texts[i] for i in idx]), contexts, batches
+                )
+                for idx, labels in zip(batches, answers):
+                    if labels is None:
+                        continue
+                    for i, label in zip(idx, labels):
+                        predictions[i] = IntentPrediction(label, 1.0, "llm")
+                        self.cache.put(texts[i], label)
+
+        for prediction in predictions:
+            INTENT_PREDICTIONS.labels(prediction.tier, prediction.label).inc()
+        return predictions
+
+    def _predict_local(self, text: str) -> IntentPrediction:
+        start = time.perf_counter()
+        prediction = self.rules.predict(text)
+        INTENT_TIER_SECONDS.labels("rules").observe(time.perf_counter() - start)
+        if prediction is None:
+            start = time.perf_counter()
+            prediction = self.local.predict(text)
+            INTENT_TIER_SECONDS.labels("centroid").observe(time.perf_counter() - start)
+        return prediction
+
+    def _needs_llm(self, prediction: IntentPrediction, allow_llm: bool) -> bool:
+        return (
+            allow_llm
+            and bool(self.api_key)
+            and prediction.tier == "centroid"
+            and prediction.confidence < self.threshold
+        )
+
+    def _pace(self, texts: Sequence[str]) -> None:
+        self._request_bucket.acquire()
+        # Rough prompt + completion token estimate (~4 characters per token).
+        self._token_bucket.acquire(100 + sum(len(t) // 4 + 12 for t in texts))
+
+    def _escalate(self, text: str, local: IntentPrediction) -> IntentPrediction:
+        start = time.perf_counter()
+        cached = self.cache.get(text)
+        if cached is not None:
+            INTENT_TIER_SECONDS.labels("cache").observe(time.perf_counter() - start)
+            return IntentPrediction(cached[0], 1.0, "cache")
+        start = time.perf_counter()
+        try:
+            prediction = self._classify_llm(text)
+        except Exception as e:
+            logger.warning(f"LLM intent classification failed, using local result: {e}")
+            return local
+        finally:
+            elapsed = time.perf_counter() - start
+            INTENT_TIER_SECONDS.labels("llm").observe(elapsed)
+        self.cache.put(text, prediction.label, llm_seconds=elapsed)
+        return prediction
+
+    def _try_llm_batch(self, texts: List[str]) -> Optional[List[str]]:
+        start = time.perf_counter()
+        try:
+            return self._classify_llm_batch(texts)
+        except Exception as e:
+            logger.warning(f"Batched LLM intent classification failed, using local results: {e}")
+            return None
+        finally:
+            INTENT_TIER_SECONDS.labels("llm_batch").observe(time.perf_counter() - start)
+
+    def _classify_llm_batch(self, texts: List[str]) -> List[str]:
+        if len(texts) == 1:
+            return [self._classify_llm(texts[0]).label]
         system_prompt = (
             "You are an intent classifier.\n"
-            "Possible intents: SCHEDULE_CALLBACK, RESOLVE_ISSUE, OTHER.\n"
-            "Return only the intent label."
+            f"Possible intents: {', '.join(INTENT_LABELS)}.\n"
+            "Classify each numbered transcript. Reply with only a JSON array of "
+            "intent labels, one per transcript, in the same order."
         )
+        numbered = "\n".join(f"{n}. {json.dumps(text)}" for n, text in enumerate(texts, 1))
+        self._pace(texts)
         messages = [
             {"role": "system", "content": system_prompt},
+            {"role": "user", "content": numbered},
+        ]
+        content = self._chat(messages, max_tokens=12 * len(texts) + 16, timeout=self.timeout * 3, batch=len(texts))
+        match = re.search(r"\[.*\]", content, re.DOTALL)
+        labels = json.loads(match.group(0)) if match else []
+        if len(labels) != len(texts):
+            logger.warning(f"LLM returned {len(labels)} labels for {len(texts)} transcripts; retrying singly")
+            return [self._classify_llm(text).label for text in texts]
+        return [parse_label(str(label)) for label in labels]
+
+    def _classify_llm(self, text: str) -> IntentPrediction:
+        self._pace([text])
+        messages = [
+            {"role": "system", "content": self._system_prompt()},
             {"role": "user", "content": text},
         ]
-        response = openai.ChatCompletion.create(
-            model=self.model,
-            messages=messages,
-        )
-        intent = response["choices"][0]["message"]["content"].strip().upper()
-        return intent
+        content = self._chat(messages, max_tokens=8, timeout=self.timeout, batch=1)
+        return IntentPrediction(parse_label(content), 1.0, "llm")
+
+    def _chat(self, messages: List[Dict[str, str]], max_tokens: int, timeout: float, batch: int) -> str:
+        with provider_call("llm", "openai", "chat", model=self.model, batch=batch) as call:
+            call.sent(sum(len(m["content"].encode()) for m in messages))
+            response = _openai(self.api_key).ChatCompletion.create(
+                model=self.model,
+                messages=messages,
+                temperature=0,
+                max_tokens=max_tokens,
+                request_timeout=timeout,
+            )
+            content = response["choices"][0]["message"]["content"]
+            call.received(len(content.encode()))
+            usage = response.get("usage") or {}
+            if usage.get("total_tokens"):
+                call.set("llm.total_tokens", usage["total_tokens"])
+            return content
+
+
+def cache_generation() -> int:
+    return int(config_store.get(CACHE_GENERATION_KEY, 0))
+
+
+def invalidate_intent_cache() -> int:
+    """Bump the cache generation so every process sharing the config file drops its LLM intent cache."""
+
+    def bump(config: Dict[str, object]) -> None:
+        config[CACHE_GENERATION_KEY] = int(config.get(CACHE_GENERATION_KEY, 0)) + 1
+
+    return int(config_store.update(bump)[CACHE_GENERATION_KEY])
+
+
+def _openai(api_key: str | None):
+    """Import the OpenAI SDK on the first LLM call; it is slow to import."""
+    import openai
+
+    if api_key:
+        openai.api_key = api_key
+    return openai
+
+
+def parse_label(raw: str) -> str:
+    """Map a free-form model reply onto ``INTENT_LABELS``."""
+    cleaned = re.sub(r"[^A-Z_ ]", "", raw.strip().upper()).replace(" ", "_")
+    if cleaned in INTENT_LABELS:
+        return cleaned
+    for label in INTENT_LABELS:
+        if label in cleaned:
+            return label
+    return FALLBACK_LABEL
+
+
+def evaluate(
+    classifier: IntentClassifier, examples: Iterable[Tuple[str, str]], allow_llm: bool = True
+) -> Dict[str, object]:
+    """Score ``classifier`` on labelled examples, broken down by tier.
+
+    ``escalation_rate`` is the share the local tiers could not settle, answered
+    by the LLM or by its cache; ``llm_rate`` and ``cache_rate`` split it.
+    """
+    tiers: Dict[str, Dict[str, float]] = {}
+    total = correct = 0
+    for text, expected in examples:
+        start = time.perf_counter()
+        prediction = classifier.predict(text, allow_llm=allow_llm)
+        elapsed = time.perf_counter() - start
+        stats = tiers.setdefault(prediction.tier, {"count": 0, "correct": 0, "seconds": 0.0})
+        stats["count"] += 1
+        stats["correct"] += prediction.label == expected
+        stats["seconds"] += elapsed
+        total += 1
+        correct += prediction.label == expected
+
+    def rate(*names: str) -> float:
+        return sum(tiers.get(name, {}).get("count", 0) for name in names) / total if total else 0.0
+
+    return {
+        "examples": total,
+        "accuracy": correct / total if total else 0.0,
+        "escalation_rate": rate("llm", "cache"),
+        "llm_rate": rate("llm"),
+        "cache_rate": rate("cache"),
+        "tiers": {
+            tier: {
+                "count": int(s["count"]),
+                "accuracy": s["correct"] / s["count"],
+                "mean_latency_ms": 1000 * s["seconds"] / s["count"],
+            }
+            for tier, s in tiers.items()
+        },
+    }
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Set, Tuple
+
+from prometheus_client import Counter
+
+from app.logging_config import logger
+
+INTENT_CACHE_REQUESTS = Counter(
+    "voice_agent_intent_cache_requests_total", "Intent cache lookups by result", ["result"]
+)
+INTENT_CACHE_SAVED_SECONDS = Counter(
+    "voice_agent_intent_cache_saved_seconds_total",
+    "Estimated LLM latency avoided by intent cache hits",
+)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split())
+
+
+class CacheEntry(NamedTuple):
+    label: str
+    created: float
+    signature: Tuple[int, ...]
+
+
+class MinHasher:
+    """MinHash signatures over character shingles of normalized text."""
+
+    def __init__(self, num_perm: int = 64, shingle: int = 4, seed: int = 1) -> None:
+        self.num_perm = num_perm
+        self.shingle = shingle
+        coeffs = hashlib.blake2b(f"minhash-{seed}".encode(), digest_size=64).digest()
+        state = int.from_bytes(coeffs, "big")
+        self._perms: List[Tuple[int, int]] = []
+        for i in range(num_perm):
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            a = (state >> 3) % _MERSENNE_PRIME or 1
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            b = (state >> 3) % _MERSENNE_PRIME
+            self._perms.append((a, b))
+
+    def signature(self, normalized: str) -> Tuple[int, ...]:
+        padded = f" {normalized} "
+        shingles = {padded[i:i + self.shingle] for i in range(max(1, len(padded) - self.shingle + 1))}
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in shingles
+        ]
+        return tuple(
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._perms
+        )
+
+
+class IntentCache:
+    """LLM intent results by exact and MinHash-similar transcript, bound to a fingerprint and a generation."""
+
+    def __init__(
+        self,
+        fingerprint: str = "",
+        path: str | None = None,
+        max_entries: int | None = None,
+        ttl: float | None = None,
+        threshold: float | None = None,
+        num_perm: int = 64,
+        bands: int = 16,
+        generation: Callable[[], int] | None = None,
+        polarity: Callable[[str], Hashable] | None = None,
+    ) -> None:
+        self.fingerprint = fingerprint
+        self._current_generation = generation or (lambda: 0)
+        self.generation = self._current_generation()
+        # Near matches must agree on this (e.g. which words are negated):
+        # "I want to cancel" and "I don't want to cancel" share most shingles.
+        self._polarity = polarity or (lambda text: None)
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries or int(os.getenv("INTENT_CACHE_SIZE", "10000"))
+        self.ttl = ttl or float(os.getenv("INTENT_CACHE_TTL", str(7 * 24 * 3600)))
+        self.threshold = threshold or float(os.getenv("INTENT_CACHE_SIMILARITY", "0.6"))
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.bands = bands
+        self._rows = num_perm // bands
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {}
+        self._lock = threading.Lock()
+        self._llm_seconds = 1.0  # running estimate of one LLM call
+        self.hits = {"exact": 0, "approximate": 0}
+        self.misses = 0
+        self.dirty = False
+        if self.path:
+            self.load()
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self._rows:(band + 1) * self._rows]
+
+    def _check_generation(self) -> None:
+        generation = self._current_generation()
+        if generation != self.generation:
+            with self._lock:
+                self._entries.clear()
+                self._buckets.clear()
+                self.generation = generation
+            logger.info(f"Intent cache invalidated (generation {generation})")
+
+    def get(self, text: str) -> Optional[Tuple[str, str]]:
+        """Return ``(label, "exact" | "approximate")`` or ``None``."""
+        self._check_generation()
+        key = normalize(text)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.created <= self.ttl:
+                self._entries.move_to_end(key)
+                return self._hit("exact", entry.label)
+            if entry is not None:
+                self._remove(key)
+
+            signature = self.hasher.signature(key)
+            candidates: Set[str] = set()
+            for band_key in self._band_keys(signature):
+                candidates |= self._buckets.get(band_key, set())
+            best: Optional[Tuple[float, str]] = None
+            polarity = self._polarity(key) if candidates else None
+            for candidate in candidates:
+                cached = self._entries[candidate]
+                if now - cached.created > self.ttl or self._polarity(candidate) != polarity:
+                    continue
+                similarity = sum(x == y for x, y in zip(signature, cached.signature)) / len(signature)
+                if similarity >= self.threshold and (best is None or similarity > best[0]):
+                    best = (similarity, candidate)
+            if best is not None:
+                self._entries.move_to_end(best[1])
+                return self._hit("approximate", self._entries[best[1]].label)
+            self.misses += 1
+            INTENT_CACHE_REQUESTS.labels("miss").inc()
+            return None
+
+    def _hit(self, kind: str, label: str) -> Tuple[str, str]:
+        self.hits[kind] += 1
+        INTENT_CACHE_REQUESTS.labels(kind).inc()
+        INTENT_CACHE_SAVED_SECONDS.inc(self._llm_seconds)
+        return label, kind
+
+    def put(self, text: str, label: str, llm_seconds: float | None = None) -> None:
+        self._check_generation()
+        key = normalize(text)
+        with self._lock:
+            if llm_seconds is not None:
+                self._llm_seconds = 0.9 * self._llm_seconds + 0.1 * llm_seconds
+            if key in self._entries:
+                self._remove(key)
+            self._insert(key, CacheEntry(label, time.time(), self.hasher.signature(key)))
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+            self.dirty = True
+
+    def _insert(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        for band_key in self._band_keys(entry.signature):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        for band_key in self._band_keys(entry.signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def invalidate(self) -> None:
+        """Drop every entry, e.g. after a prompt or label change."""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self.dirty = False
+        if self.path and self.path.exists():
+            self.path.unlink()
+
+    def save(self) -> None:
+        """Persist a snapshot atomically to ``path``."""
+        if not self.path:
+            return
+        self._check_generation()
+        with self._lock:
+            rows = [
+                {"text": key, "label": e.label, "created": e.created}
+                for key, e in self._entries.items()
+            ]
+            self.dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as fh:
+            json.dump({"fingerprint": self.fingerprint, "generation": self.generation, "entries": rows}, fh)
+        os.replace(tmp, self.path)
+
+    def load(self) -> None:
+        try:
+            with open(self.path) as fh:
+                snapshot = json.load(fh)
+        except FileNotFoundError:
+            return
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable intent cache {self.path}: {e}")
+            return
+        if snapshot.get("fingerprint") != self.fingerprint:
+            logger.info("Intent cache fingerprint changed; starting empty")
+            return
+        if snapshot.get("generation", 0) != self.generation:
+            logger.info("Intent cache was invalidated since its snapshot; starting empty")
+            return
+        now = time.time()
+        with self._lock:
+            for row in snapshot.get("entries", []):
+                if now - row["created"] <= self.ttl:
+                    self._insert(row["text"], CacheEntry(row["label"], row["created"], self.hasher.signature(row["text"])))
+
+    def stats(self) -> Dict[str, float]:
+        lookups = sum(self.hits.values()) + self.misses
+        return {
+            "entries": len(self._entries),
+            "exact_hits": self.hits["exact"],
+            "approximate_hits": self.hits["approximate"],
+            "misses": self.misses,
+            "hit_ratio": round(sum(self.hits.values()) / lookups, 4) if lookups else 0.0,
+        }
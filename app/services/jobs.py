@@ -0,0 +1,315 @@
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from opentelemetry import trace
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import Session
+
+from app.logging_config import logger
+from app.models.db import Job, SessionLocal
+from app.services.executor import run_blocking
+
+JOB_QUEUE_DEPTH = Gauge(
+    "voice_agent_job_queue_depth", "Number of background jobs by status", ["status"]
+)
+JOB_STAGE_SECONDS = Histogram(
+    "voice_agent_job_stage_seconds", "Latency of background job stages", ["kind", "stage"]
+)
+JOB_ATTEMPTS = Counter(
+    "voice_agent_job_attempts_total", "Background job attempts by outcome", ["kind", "outcome"]
+)
+
+JOB_STATUSES = ("QUEUED", "RUNNING", "SUCCEEDED", "FAILED")
+# Outcome of an attempt whose lease expired and whose job another worker reclaimed.
+SUPERSEDED = "SUPERSEDED"
+
+tracer = trace.get_tracer(__name__)
+
+
+class JobContext:
+    """Data handed to a job handler for a single attempt."""
+
+    def __init__(self, job_id: int, kind: str, payload: Dict[str, Any], attempt: int) -> None:
+        self.job_id = job_id
+        self.kind = kind
+        self.payload = payload or {}
+        self.attempt = attempt
+        self.providers: Any = None
+        self.stage: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage_timer(self, name: str):
+        """Mark ``name`` as the current stage and record how long it takes."""
+        self.stage = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = round(elapsed, 4)
+            JOB_STAGE_SECONDS.labels(self.kind, name).observe(elapsed)
+
+
+JobHandler = Callable[[JobContext], Awaitable[Dict[str, Any]]]
+HANDLERS: Dict[str, JobHandler] = {}
+# Jobs of each kind that can usefully run at once, e.g. a pipeline's stage slots.
+HANDLER_CONCURRENCY: Dict[str, int] = {}
+
+
+def register_handler(kind: str, concurrency: int = 1) -> Callable[[JobHandler], JobHandler]:
+    """Register ``func`` as the handler for jobs of type ``kind``."""
+
+    def decorator(func: JobHandler) -> JobHandler:
+        HANDLERS[kind] = func
+        HANDLER_CONCURRENCY[kind] = max(1, concurrency)
+        return func
+
+    return decorator
+
+
+def default_worker_count() -> int:
+    """``JOB_WORKERS``, or enough workers to fill every registered handler (at least 4)."""
+    configured = os.getenv("JOB_WORKERS")
+    if configured:
+        return int(configured)
+    return max(4, sum(HANDLER_CONCURRENCY.values()))
+
+
+class JobQueue:
+    """Database-backed job queue with compare-and-set claims and expiring leases."""
+
+    def __init__(
+        self,
+        max_attempts: int | None = None,
+        backoff: float | None = None,
+        lease: float | None = None,
+    ) -> None:
+        self.max_attempts = max_attempts or int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        self.backoff = backoff if backoff is not None else float(os.getenv("JOB_RETRY_BACKOFF", "2"))
+        self.lease = lease or float(os.getenv("JOB_LEASE_SECONDS", "300"))
+
+    def enqueue(
+        self,
+        session: Session,
+        kind: str,
+        payload: Dict[str, Any],
+        conversation_id: int | None = None,
+    ) -> Job:
+        """Add a job to ``session`` and commit it."""
+        now = datetime.utcnow()
+        job = Job(
+            kind=kind,
+            conversation_id=conversation_id,
+            payload=payload,
+            status="QUEUED",
+            attempts=0,
+            max_attempts=self.max_attempts,
+            run_at=now,
+            created_ts=now,
+            updated_ts=now,
+        )
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        return job
+
+    def claim(self) -> Optional[JobContext]:
+        """Atomically claim the next runnable job, or return ``None``."""
+        session = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            stale = now - timedelta(seconds=self.lease)
+            candidates = (
+                session.query(Job.id, Job.kind, Job.payload, Job.status, Job.attempts)
+                .filter(
+                    or_(
+                        and_(Job.status == "QUEUED", Job.run_at <= now),
+                        and_(Job.status == "RUNNING", Job.updated_ts < stale),
+                    )
+                )
+                .order_by(Job.run_at, Job.id)
+                .limit(5)
+                .all()
+            )
+            for job_id, kind, payload, status, attempts in candidates:
+                claimed = session.execute(
+                    update(Job)
+                    .where(Job.id == job_id, Job.status == status, Job.attempts == attempts)
+                    .values(status="RUNNING", attempts=attempts + 1, updated_ts=now)
+                )
+                session.commit()
+                if claimed.rowcount == 1:
+                    return JobContext(job_id, kind, payload, attempts + 1)
+            return None
+        finally:
+            session.close()
+
+    def heartbeat(self, ctx: JobContext) -> bool:
+        """Extend ``ctx``'s lease; ``False`` once another worker has taken the job over."""
+        session = SessionLocal()
+        try:
+            renewed = session.execute(
+                update(Job)
+                .where(Job.id == ctx.job_id, Job.status == "RUNNING", Job.attempts == ctx.attempt)
+                .values(updated_ts=datetime.utcnow())
+            )
+            session.commit()
+            return renewed.rowcount == 1
+        finally:
+            session.close()
+
+    def complete(self, ctx: JobContext, result: Dict[str, Any]) -> bool:
+        return self._finish(ctx, status="SUCCEEDED", result={**result, "timings": ctx.timings})
+
+    def fail(self, ctx: JobContext, error: str) -> str:
+        """Reschedule with backoff or fail; returns the new status, or ``SUPERSEDED`` for a stale attempt."""
+        session = SessionLocal()
+        try:
+            job = session.get(Job, ctx.job_id, with_for_update=True)
+            if job is None:  # deleted with its conversation while running
+                return "FAILED"
+            if job.status != "RUNNING" or job.attempts != ctx.attempt:
+                return SUPERSEDED
+            now = datetime.utcnow()
+            if job.attempts < job.max_attempts:
+                job.status = "QUEUED"
+                job.run_at = now + timedelta(seconds=self.backoff * 2 ** (job.attempts - 1))
+            else:
+                job.status = "FAILED"
+            job.stage = ctx.stage
+            job.error = error
+            job.updated_ts = now
+            session.commit()
+            return job.status
+        finally:
+            session.close()
+
+    def depth(self) -> Dict[str, int]:
+        """Return the number of jobs per status."""
+        session = SessionLocal()
+        try:
+            rows = session.query(Job.status, func.count(Job.id)).group_by(Job.status).all()
+        finally:
+            session.close()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def _finish(self, ctx: JobContext, status: str, result: Dict[str, Any]) -> bool:
+        session = SessionLocal()
+        try:
+            finished = session.execute(
+                update(Job)
+                .where(Job.id == ctx.job_id, Job.status == "RUNNING", Job.attempts == ctx.attempt)
+                .values(status=status, stage=ctx.stage, result=result, error=None, updated_ts=datetime.utcnow())
+            )
+            session.commit()
+            return finished.rowcount == 1
+        finally:
+            session.close()
+
+
+class JobWorker:
+    """Pool of asyncio tasks that poll a :class:`JobQueue` and run handlers."""
+
+    def __init__(
+        self,
+        queue: JobQueue | None = None,
+        concurrency: int | None = None,
+        poll_interval: float | None = None,
+        providers: Any = None,
+    ) -> None:
+        self.queue = queue or JobQueue()
+        self.providers = providers
+        self.concurrency = concurrency or default_worker_count()
+        self.poll_interval = poll_interval or float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    async def start(self) -> None:
+        self._stopping.clear()
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"job-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        self._tasks.append(asyncio.create_task(self._report_depth(), name="job-depth"))
+        logger.info(f"Started {self.concurrency} job workers")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                ctx = await run_blocking("db", self.queue.claim)
+            except Exception as e:
+                logger.warning(f"Job claim failed: {e}")
+                ctx = None
+            if ctx is None:
+                await self._sleep(self.poll_interval)
+                continue
+            await self.run_job(ctx)
+
+    async def run_job(self, ctx: JobContext) -> None:
+        ctx.providers = self.providers
+        handler = HANDLERS.get(ctx.kind)
+        heartbeat = asyncio.create_task(self._heartbeat(ctx), name=f"job-heartbeat-{ctx.job_id}")
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind {ctx.kind}")
+            with tracer.start_as_current_span(
+                f"job.{ctx.kind}", attributes={"job.id": ctx.job_id, "job.attempt": ctx.attempt}
+            ):
+                result = await handler(ctx)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            status = await run_blocking("db", self.queue.fail, ctx, f"{type(e).__name__}: {e}")
+            outcome = {"QUEUED": "retry", SUPERSEDED: "superseded"}.get(status, "failed")
+            JOB_ATTEMPTS.labels(ctx.kind, outcome).inc()
+            logger.warning(f"Job {ctx.job_id} failed at stage {ctx.stage}: {e} ({outcome})")
+            return
+        finally:
+            heartbeat.cancel()
+        if await run_blocking("db", self.queue.complete, ctx, result or {}):
+            JOB_ATTEMPTS.labels(ctx.kind, "succeeded").inc()
+        else:
+            JOB_ATTEMPTS.labels(ctx.kind, "superseded").inc()
+            logger.warning(f"Job {ctx.job_id} attempt {ctx.attempt} finished after its lease was taken over")
+
+    async def _heartbeat(self, ctx: JobContext) -> None:
+        # Renew well inside the lease so long provider deadlines (e.g. a 900 s
+        # streamed STT upload) do not let another worker reclaim a live job.
+        while True:
+            await asyncio.sleep(self.queue.lease / 3)
+            try:
+                if not await run_blocking("db", self.queue.heartbeat, ctx):
+                    return
+            except Exception as e:
+                logger.warning(f"Job {ctx.job_id} heartbeat failed: {e}")
+
+    async def _report_depth(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                counts = await run_blocking("db", self.queue.depth)
+                for status, count in counts.items():
+                    JOB_QUEUE_DEPTH.labels(status).set(count)
+            except Exception as e:
+                logger.warning(f"Job depth query failed: {e}")
+            await self._sleep(max(self.poll_interval, 5.0))
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
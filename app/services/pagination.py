@@ -0,0 +1,46 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(ts: Optional[datetime], row_id: int) -> str:
+    raw = json.dumps([ts.isoformat() if ts else None, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts, row_id = json.loads(raw)
+        return (datetime.fromisoformat(ts) if ts else None), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def keyset_page(
+    query: Query, ts_column: Any, id_column: Any, cursor: Optional[str], limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """Return one page of ``query`` newest first by ``(ts_column, id_column)``, plus the next cursor."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(ts_column, id_column) < tuple_(ts, row_id))
+    rows: Sequence[Any] = (
+        query.order_by(ts_column.desc(), id_column.desc()).limit(limit + 1).all()
+    )
+    if len(rows) <= limit:
+        return list(rows), None
+    page = list(rows[:limit])
+    last = page[-1]
+    return page, encode_cursor(getattr(last, ts_column.key), getattr(last, id_column.key))
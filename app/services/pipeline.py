@@ -0,0 +1,144 @@
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from opentelemetry import context as otel_context
+from opentelemetry import trace
+from prometheus_client import Gauge
+
+PIPELINE_QUEUE_DEPTH = Gauge(
+    "voice_agent_pipeline_queue_depth", "Items waiting in front of a pipeline stage", ["pipeline", "stage"]
+)
+PIPELINE_STAGE_BUSY = Gauge(
+    "voice_agent_pipeline_stage_busy", "Stage workers currently processing an item", ["pipeline", "stage"]
+)
+
+tracer = trace.get_tracer(__name__)
+
+StageFunc = Callable[[Any], Awaitable[Any]]
+
+
+class Stage(NamedTuple):
+    """One step of a :class:`Pipeline`: ``func`` maps an item to the next item."""
+
+    name: str
+    func: StageFunc
+    concurrency: int = 1
+
+
+class _Envelope:
+    __slots__ = ("item", "future", "context", "enqueued")
+
+    def __init__(self, item: Any, future: asyncio.Future, context: Any) -> None:
+        self.item = item
+        self.future = future
+        self.context = context
+        self.enqueued = time.perf_counter()
+
+
+class Pipeline:
+    """Async stage pipeline with bounded queues and per-stage concurrency."""
+
+    def __init__(self, name: str, stages: List[Stage], queue_size: int | None = None) -> None:
+        if not stages:
+            raise ValueError("a pipeline needs at least one stage")
+        self.name = name
+        self.stages = stages
+        self.queue_size = queue_size or int(os.getenv("PIPELINE_QUEUE_SIZE", "16"))
+        self._queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def capacity(self) -> int:
+        """Items the stage workers can process at once."""
+        return sum(max(1, stage.concurrency) for stage in self.stages)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers) and self._loop is asyncio.get_running_loop()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queues = [asyncio.Queue(self.queue_size) for _ in self.stages]
+        self._workers = [
+            asyncio.create_task(self._work(index), name=f"{self.name}-{stage.name}-{n}")
+            for index, stage in enumerate(self.stages)
+            for n in range(max(1, stage.concurrency))
+        ]
+
+    async def aclose(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        for queue in self._queues:
+            while not queue.empty():
+                envelope = queue.get_nowait()
+                if not envelope.future.done():
+                    envelope.future.cancel()
+        self._workers = []
+        self._queues = []
+
+    async def submit(self, item: Any) -> Any:
+        """Run ``item`` through every stage and return the last stage's result."""
+        if not self.running:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._put(0, _Envelope(item, future, otel_context.get_current()))
+        return await future
+
+    def depth(self) -> Dict[str, int]:
+        return {stage.name: queue.qsize() for stage, queue in zip(self.stages, self._queues)}
+
+    async def _put(self, index: int, envelope: _Envelope) -> None:
+        envelope.enqueued = time.perf_counter()
+        await self._queues[index].put(envelope)
+        PIPELINE_QUEUE_DEPTH.labels(self.name, self.stages[index].name).set(self._queues[index].qsize())
+
+    async def _work(self, index: int) -> None:
+        stage = self.stages[index]
+        queue = self._queues[index]
+        depth = PIPELINE_QUEUE_DEPTH.labels(self.name, stage.name)
+        busy = PIPELINE_STAGE_BUSY.labels(self.name, stage.name)
+        while True:
+            envelope = await queue.get()
+            depth.set(queue.qsize())
+            if envelope.future.done():  # the submitter was cancelled
+                continue
+            waited = time.perf_counter() - envelope.enqueued
+            busy.inc()
+            try:
+                with tracer.start_as_current_span(
+                    f"{self.name}.{stage.name}",
+                    context=envelope.context,
+                    attributes={
+                        "pipeline.name": self.name,
+                        "pipeline.stage": stage.name,
+                        "pipeline.queue_wait_ms": round(waited * 1000, 3),
+                    },
+                ):
+                    result = await stage.func(envelope.item)
+            except asyncio.CancelledError:
+                if not envelope.future.done():
+                    envelope.future.cancel()
+                raise
+            except Exception as e:
+                if not envelope.future.done():
+                    envelope.future.set_exception(e)
+                continue
+            finally:
+                busy.dec()
+            if envelope.future.done():
+                continue
+            if index + 1 == len(self.stages):
+                envelope.future.set_result(result)
+                continue
+            envelope.item = result
+            try:
+                await self._put(index + 1, envelope)
+            except asyncio.CancelledError:
+                envelope.future.cancel()
+                raise
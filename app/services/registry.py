@@ -0,0 +1,254 @@
+import asyncio
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import requests
+from fastapi import Request
+from prometheus_client import Gauge
+from requests.adapters import HTTPAdapter
+
+from app.logging_config import logger
+from app.services.executor import run_blocking
+from app.services.intent import IntentClassifier
+from app.services.resilience import ProviderRouter, candidates_from_env
+from app.services.stt import STTClient
+from app.services.telephony import TelephonyService, deadline_http_client
+from app.services.tts import TTSClient
+from app.services.tts_cache import TTSCache
+
+HTTP_POOL_SIZE = Gauge(
+    "voice_agent_http_pool_size", "Maximum connections in a shared HTTP pool", ["pool"]
+)
+HTTP_POOL_IN_USE = Gauge(
+    "voice_agent_http_pool_in_use", "Requests currently holding a connection from a shared HTTP pool", ["pool"]
+)
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    """Response stream that releases the in-use gauge when it is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, gauge) -> None:
+        self._stream = stream
+        self._gauge = gauge
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._gauge.dec()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Wrap a transport to report how many pooled connections are in use."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, pool: str) -> None:
+        self._transport = transport
+        self._in_use = HTTP_POOL_IN_USE.labels(pool)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._in_use.inc()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self._in_use.dec()
+            raise
+        response.stream = _TrackedStream(response.stream, self._in_use)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class PoolSettings:
+    """Connection pool sizes and timeouts, read from the environment."""
+
+    def __init__(self) -> None:
+        self.max_connections = int(os.getenv("HTTP_POOL_SIZE", "100"))
+        self.max_keepalive = int(os.getenv("HTTP_POOL_KEEPALIVE", "20"))
+        self.keepalive_expiry = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+        self.timeout = float(os.getenv("HTTP_TIMEOUT", "60"))
+        self.connect_timeout = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+        self.http2 = os.getenv("HTTP2", "1").lower() not in ("0", "false", "no")
+        self.sync_pool_size = int(os.getenv("HTTP_SYNC_POOL_SIZE", "32"))
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ProviderRegistry:
+    """Application-scoped provider clients sharing persistent connection pools."""
+
+    def __init__(
+        self,
+        settings: PoolSettings | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.settings = settings or PoolSettings()
+        self._transport = transport
+        self.http: Optional[httpx.AsyncClient] = None
+        self.session: Optional[requests.Session] = None
+        self.tts_cache = TTSCache()
+        self._telephony: Optional[TelephonyService] = None
+        self._intent: Dict[Optional[str], IntentClassifier] = {}
+        self._tts: Dict[Tuple[Optional[str], ...], TTSClient] = {}
+        self._stt: Dict[Tuple[Optional[str], Optional[str]], STTClient] = {}
+        self._routers: Dict[str, ProviderRouter] = {}
+        self._lock = threading.Lock()
+        self.intent_cache_interval = float(os.getenv("INTENT_CACHE_SAVE_INTERVAL", "300"))
+        self._cache_saver: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        s = self.settings
+        http2 = s.http2 and self._transport is None and _http2_available()
+        transport = self._transport or httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=s.max_connections,
+                max_keepalive_connections=s.max_keepalive,
+                keepalive_expiry=s.keepalive_expiry,
+            ),
+        )
+        self.http = httpx.AsyncClient(
+            transport=InstrumentedTransport(transport, "async"),
+            timeout=httpx.Timeout(s.timeout, connect=s.connect_timeout),
+            follow_redirects=True,
+        )
+        HTTP_POOL_SIZE.labels("async").set(s.max_connections)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=s.sync_pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        HTTP_POOL_SIZE.labels("sync").set(s.sync_pool_size)
+        if self.intent_cache_interval > 0:
+            self._cache_saver = asyncio.create_task(self._save_intent_caches(), name="intent-cache-saver")
+        logger.info(f"Provider registry started (http2={http2}, pool={s.max_connections})")
+
+    async def _save_intent_caches(self) -> None:
+        """Snapshot changed intent caches every ``INTENT_CACHE_SAVE_INTERVAL`` seconds."""
+        while True:
+            await asyncio.sleep(self.intent_cache_interval)
+            for classifier in list(self._intent.values()):
+                if not classifier.cache.dirty:
+                    continue
+                try:
+                    await run_blocking("intent", classifier.cache.save)
+                except OSError as e:
+                    logger.warning(f"Intent cache save failed: {e}")
+
+    async def aclose(self) -> None:
+        if self._cache_saver is not None:
+            self._cache_saver.cancel()
+            await asyncio.gather(self._cache_saver, return_exceptions=True)
+            self._cache_saver = None
+        if self.http is not None:
+            await self.http.aclose()
+            self.http = None
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+        for classifier in self._intent.values():
+            classifier.cache.save()
+        self._tts.clear()
+        self._stt.clear()
+        self._telephony = None
+        self._intent.clear()
+
+    def telephony(self) -> TelephonyService:
+        if self._telephony is None:
+            with self._lock:
+                if self._telephony is None:
+                    from twilio.rest import Client
+
+                    http_client = deadline_http_client(self.settings.timeout)
+                    client = Client(
+                        os.getenv("TWILIO_ACCOUNT_SID"),
+                        os.getenv("TWILIO_AUTH_TOKEN"),
+                        http_client=http_client,
+                    )
+                    self._telephony = TelephonyService(client=client)
+        return self._telephony
+
+    def tts(
+        self,
+        locale: Optional[str] = None,
+        provider: Optional[str] = None,
+        voice_id: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> TTSClient:
+        key = (provider, locale, voice_id, model)
+        client = self._tts.get(key)
+        if client is None:
+            with self._lock:
+                client = self._tts.get(key) or TTSClient(
+                    provider=provider,
+                    locale=locale,
+                    session=self.session,
+                    http_client=self.http,
+                    voice_id=voice_id,
+                    model=model,
+                )
+                self._tts[key] = client
+        return client
+
+    def tts_for(self, settings: Dict[str, Any], provider: Optional[str] = None) -> TTSClient:
+        """Return the TTS client for effective tenant/campaign ``settings`` (see ``get_settings``)."""
+        return self.tts(
+            settings.get("locale"),
+            provider or settings.get("tts_provider"),
+            settings.get("voice_id"),
+            settings.get("tts_model"),
+        )
+
+    def stt(self, locale: Optional[str] = None, provider: Optional[str] = None) -> STTClient:
+        key = (provider, locale)
+        client = self._stt.get(key)
+        if client is None:
+            with self._lock:
+                client = self._stt.get(key) or STTClient(
+                    provider=provider, locale=locale, http_client=self.http
+                )
+                self._stt[key] = client
+        return client
+
+    def router(self, service: str) -> ProviderRouter:
+        """Return the failover router for ``stt``, ``tts`` or ``telephony``."""
+        router = self._routers.get(service)
+        if router is None:
+            with self._lock:
+                router = self._routers.get(service) or ProviderRouter(service, candidates_from_env(service))
+                self._routers[service] = router
+        return router
+
+    def health(self) -> Dict[str, Dict[str, Dict]]:
+        """Circuit state, failure counts and latency per service and provider."""
+        return {service: self.router(service).snapshot() for service in ("stt", "tts", "telephony")}
+
+    def intent(self, model: Optional[str] = None) -> IntentClassifier:
+        """Return the classifier for ``model`` (a tenant's ``llm_model``), default if ``None``."""
+        classifier = self._intent.get(model)
+        if classifier is None:
+            with self._lock:
+                classifier = self._intent.get(model)
+                if classifier is None:
+                    classifier = self._intent[model] = IntentClassifier(model=model)
+        return classifier
+
+
+def get_providers(request: Request) -> ProviderRegistry:
+    """FastAPI dependency returning the application's provider registry."""
+    return request.app.state.providers
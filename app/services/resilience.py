@@ -0,0 +1,352 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+from prometheus_client import Counter, Gauge
+
+from app.logging_config import logger
+from app.services.instrumentation import record_retry
+
+T = TypeVar("T")
+
+CIRCUIT_STATE = Gauge(
+    "voice_agent_provider_circuit_state",
+    "Circuit breaker state per provider (0 closed, 1 half-open, 2 open)",
+    ["service", "provider"],
+)
+PROVIDER_FAILOVERS = Counter(
+    "voice_agent_provider_failovers_total", "Calls moved to the next provider after a failure", ["service", "provider"]
+)
+PROVIDER_HEDGES = Counter(
+    "voice_agent_provider_hedges_total",
+    "Hedged second requests by outcome (launched, won)",
+    ["service", "provider", "outcome"],
+)
+PROVIDER_TIMEOUTS = Counter(
+    "voice_agent_provider_timeouts_total", "Provider calls abandoned at their deadline", ["service", "provider"]
+)
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Candidate providers per service when ``<SERVICE>_PROVIDERS`` is not set: the
+# configured default first, then any other provider whose credentials exist.
+_DEFAULT_CANDIDATES = {
+    "stt": ("STT_PROVIDER", "openai", [("openai", "OPENAI_API_KEY"), ("deepgram", "DEEPGRAM_API_KEY")]),
+    "tts": ("TTS_PROVIDER", "elevenlabs", [("elevenlabs", "ELEVEN_API_KEY")]),
+    "telephony": (None, "twilio", []),
+}
+# What each provider returns, where a service's providers differ. Failover and
+# hedging only move between providers with the same output as the first one.
+_OUTPUT_FORMATS = {"tts": {"elevenlabs": "audio", "twilio": "twiml"}}
+_DEFAULT_DEADLINES = {"stt": 60.0, "tts": 15.0, "telephony": 15.0}
+_HEDGED_SERVICES = ("stt", "tts")
+
+# Monotonic time at which the current router attempt is abandoned. It is
+# copied into executor threads by run_blocking; see call_timeout().
+_attempt_expires: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "provider_attempt_expires", default=None
+)
+
+
+class ProviderUnavailable(RuntimeError):
+    """Every candidate provider for a service failed or has an open circuit."""
+
+
+def call_timeout(default: float) -> float:
+    """Return ``default`` capped to the time left before the current attempt's deadline."""
+    expires = _attempt_expires.get()
+    if expires is None:
+        return default
+    return max(0.001, min(default, expires - time.monotonic()))
+
+
+def is_provider_fault(exc: BaseException) -> bool:
+    """Return ``False`` for errors caused by the request itself (4xx other than 408/429).
+
+    Those are neither counted against the provider nor retried elsewhere.
+    """
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None) or getattr(exc, "status", None)
+    if isinstance(status, int) and 400 <= status < 500:
+        return status in (408, 429)
+    return not isinstance(exc, (ValueError, TypeError))
+
+
+class CircuitBreaker:
+    """Refuse calls for ``reset_timeout`` after ``failure_threshold`` failures in a row, then allow one probe."""
+
+    def __init__(self, service: str, provider: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.service = service
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.labels(service, provider).set(0)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._set(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._trial:
+                    return False
+                self._trial = True
+            return self.state != OPEN
+
+    def available(self) -> bool:
+        """Like :meth:`allow` but without claiming the half-open trial."""
+        with self._lock:
+            if self.state == OPEN:
+                return time.monotonic() - self.opened_at >= self.reset_timeout
+            return not (self.state == HALF_OPEN and self._trial)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._trial = False
+            if self.state != CLOSED:
+                logger.info(f"{self.service}/{self.provider} circuit closed")
+                self._set(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(f"{self.service}/{self.provider} circuit opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+                self._set(OPEN)
+
+    def release(self) -> None:
+        """Give back a half-open trial whose call was cancelled before finishing."""
+        with self._lock:
+            self._trial = False
+
+    def _set(self, state: str) -> None:
+        self.state = state
+        CIRCUIT_STATE.labels(self.service, self.provider).set(_STATE_VALUES[state])
+
+
+class ProviderHealth:
+    """Breaker, deadline and recent latencies for one provider of a service."""
+
+    def __init__(self, service: str, provider: str, deadline: float, window: int = 200) -> None:
+        self.service = service
+        self.provider = provider
+        self.deadline = deadline
+        self.breaker = CircuitBreaker(
+            service,
+            provider,
+            failure_threshold=int(os.getenv("BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("BREAKER_RESET_SECONDS", "30")),
+        )
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        p95 = self.quantile(0.95)
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "successes": self.successes,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "deadline_seconds": self.deadline,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+
+
+class ProviderRouter:
+    """Route calls for one service across its providers with breakers, deadlines, failover and hedging."""
+
+    def __init__(
+        self,
+        service: str,
+        providers: List[str],
+        hedge: bool | None = None,
+        deadlines: Dict[str, float] | None = None,
+    ) -> None:
+        if not providers:
+            raise ValueError(f"no providers configured for {service}")
+        self.service = service
+        self.providers = providers
+        default = float(os.getenv(f"{service.upper()}_DEADLINE", str(_DEFAULT_DEADLINES.get(service, 30.0))))
+        deadlines = deadlines or {}
+        self.health = {
+            name: ProviderHealth(
+                service,
+                name,
+                deadlines.get(name)
+                or float(os.getenv(f"{service.upper()}_{name.upper()}_DEADLINE", str(default))),
+            )
+            for name in providers
+        }
+        if hedge is None:
+            hedge = service in _HEDGED_SERVICES and os.getenv(f"{service.upper()}_HEDGE", "1").lower() not in (
+                "0", "false", "no",
+            )
+        self.hedge = hedge
+        self.hedge_quantile = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+        self.hedge_min_samples = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+        self.hedge_min_delay = float(os.getenv("HEDGE_MIN_DELAY", "0.05"))
+
+    def healthy(self) -> List[str]:
+        return [name for name in self.providers if self.health[name].breaker.available()]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: self.health[name].snapshot() for name in self.providers}
+
+    def order(self, prefer: Optional[str] = None) -> List[str]:
+        """Return the providers in preference order, ``prefer`` first if it is a candidate."""
+        if prefer and prefer.lower() in self.health:
+            prefer = prefer.lower()
+            return [prefer, *(name for name in self.providers if name != prefer)]
+        return list(self.providers)
+
+    def preferred(self, prefer: Optional[str] = None) -> str:
+        """Return the provider a call would try first: the first in :meth:`order` whose circuit is not open."""
+        order = self.order(prefer)
+        return next((name for name in order if self.health[name].breaker.available()), order[0])
+
+    async def call(
+        self,
+        func: Callable[[str], Awaitable[T]],
+        replayable: bool = True,
+        deadline: float | None = None,
+        prefer: Optional[str] = None,
+    ) -> T:
+        """Run ``func(provider)`` on the best available provider.
+
+        ``replayable=False`` allows a single attempt with no hedge or failover.
+        """
+        last_error: Optional[BaseException] = None
+        tried: List[str] = []
+        for name in self.order(prefer):
+            if name in tried or not self.health[name].breaker.allow():
+                continue
+            tried.append(name)
+            if len(tried) > 1:
+                PROVIDER_FAILOVERS.labels(self.service, name).inc()
+                record_retry(self.service, name, "failover")
+            try:
+                if replayable and self.hedge:
+                    return await self._hedged(func, name, tried, deadline)
+                return await self._attempt(func, name, deadline)
+            except Exception as e:
+                if not is_provider_fault(e):
+                    raise
+                last_error = e
+                logger.warning(f"{self.service} call via {name} failed: {type(e).__name__}: {e}")
+                if not replayable:
+                    raise
+        if last_error is not None:
+            raise ProviderUnavailable(f"all {self.service} providers failed: {last_error}") from last_error
+        raise ProviderUnavailable(f"no {self.service} provider available (circuits open)")
+
+    async def _attempt(self, func: Callable[[str], Awaitable[T]], name: str, deadline: float | None = None) -> T:
+        health = self.health[name]
+        deadline = deadline or health.deadline
+        start = time.perf_counter()
+        token = _attempt_expires.set(time.monotonic() + deadline)
+        try:
+            result = await asyncio.wait_for(func(name), timeout=deadline)
+        except asyncio.TimeoutError:
+            health.timeouts += 1
+            health.failures += 1
+            PROVIDER_TIMEOUTS.labels(self.service, name).inc()
+            health.breaker.record_failure()
+            raise TimeoutError(f"{self.service}/{name} exceeded its {deadline:g}s deadline") from None
+        except asyncio.CancelledError:
+            health.breaker.release()
+            raise
+        except Exception as e:
+            if is_provider_fault(e):
+                health.failures += 1
+                health.breaker.record_failure()
+            else:
+                health.breaker.release()
+            raise
+        finally:
+            _attempt_expires.reset(token)
+        health.latencies.append(time.perf_counter() - start)
+        health.successes += 1
+        health.breaker.record_success()
+        return result
+
+    def _hedge_delay(self, name: str) -> Optional[float]:
+        health = self.health[name]
+        if len(health.latencies) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, health.quantile(self.hedge_quantile))
+
+    async def _hedged(
+        self, func: Callable[[str], Awaitable[T]], name: str, tried: List[str], deadline: float | None
+    ) -> T:
+        delay = self._hedge_delay(name)
+        primary = asyncio.ensure_future(self._attempt(func, name, deadline))
+        if delay is None:
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+        backup = next((p for p in self.healthy() if p not in tried), name)
+        if not self.health[backup].breaker.allow():
+            return await primary
+        if backup != name:
+            tried.append(backup)
+        PROVIDER_HEDGES.labels(self.service, backup, "launched").inc()
+        second = asyncio.ensure_future(self._attempt(func, backup, deadline))
+        pending = {primary, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            PROVIDER_HEDGES.labels(self.service, backup, "won").inc()
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+def candidates_from_env(service: str) -> List[str]:
+    """Return the providers for ``service`` in preference order, all with the same output format."""
+    explicit = os.getenv(f"{service.upper()}_PROVIDERS")
+    if explicit:
+        names = list(dict.fromkeys(p.strip().lower() for p in explicit.split(",") if p.strip()))
+    else:
+        env_name, fallback, others = _DEFAULT_CANDIDATES.get(service, (None, service, []))
+        names = [(os.getenv(env_name, fallback) if env_name else fallback).lower()]
+        for name, credential in others:
+            if name not in names and (credential is None or os.getenv(credential)):
+                names.append(name)
+    formats = _OUTPUT_FORMATS.get(service)
+    if formats and names:
+        output = formats.get(names[0])
+        dropped = [name for name in names if formats.get(name) != output]
+        if dropped:
+            logger.warning(f"Not failing {service} over to {', '.join(dropped)}: different output than {names[0]}")
+            names = [name for name in names if name not in dropped]
+    return names
@@ -0,0 +1,356 @@
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import and_, delete, exists, or_, select
+from sqlalchemy.orm import Session
+
+from app.logging_config import logger
+from app.models.db import Conversation, Job, Ticket, session_scope
+
+ACTIONS = ("delete", "archive")
+FORMATS = ("jsonl", "parquet")
+ACTIVE_JOB_STATUSES = ("QUEUED", "RUNNING")
+
+
+class RetentionPolicy(NamedTuple):
+    """Which conversations to remove and whether to archive them first."""
+
+    name: str
+    action: str = "archive"
+    older_than_days: Optional[float] = None
+    status: Optional[str] = None
+    direction: Optional[str] = None
+    phone: Optional[str] = None
+    include_active: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RetentionPolicy":
+        unknown = set(data) - set(cls._fields)
+        if unknown:
+            raise ValueError(f"unknown retention policy fields: {', '.join(sorted(unknown))}")
+        policy = cls(**data)
+        if policy.action not in ACTIONS:
+            raise ValueError(f"retention action must be one of {', '.join(ACTIONS)}, not {policy.action!r}")
+        if policy.older_than_days is None and not (policy.status or policy.direction or policy.phone):
+            raise ValueError(f"retention policy {policy.name!r} has no filter and would match every conversation")
+        return policy
+
+
+class RetentionReport:
+    """Rows removed (or matched, on a dry run) by one policy run."""
+
+    def __init__(self, policy: RetentionPolicy, dry_run: bool = False) -> None:
+        self.policy = policy
+        self.dry_run = dry_run
+        self.conversations = 0
+        self.tickets = 0
+        self.jobs = 0
+        self.batches = 0
+        self.files: List[str] = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rate(self) -> float:
+        """Conversations per second so far."""
+        return self.conversations / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "policy": self.policy.name,
+            "action": self.policy.action,
+            "dry_run": self.dry_run,
+            "conversations": self.conversations,
+            "tickets": self.tickets,
+            "jobs": self.jobs,
+            "batches": self.batches,
+            "files": self.files,
+            "seconds": round(self.elapsed, 2),
+            "conversations_per_second": round(self.rate, 1),
+        }
+
+
+class ArchiveWriter:
+    """Write archived conversations, with their tickets, to rotating JSONL or Parquet files."""
+
+    def __init__(self, directory: str, prefix: str, fmt: str = "jsonl", rows_per_file: int | None = None) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"archive format must be one of {', '.join(FORMATS)}, not {fmt!r}")
+        if fmt == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise RuntimeError("Parquet archives need the pyarrow package; use --format jsonl") from None
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.fmt = fmt
+        self.rows_per_file = rows_per_file or int(os.getenv("RETENTION_ROWS_PER_FILE", "100000"))
+        self.files: List[str] = []
+        self._handle: Any = None
+        self._rows_in_file = 0
+
+    def _open(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        suffix = "jsonl.gz" if self.fmt == "jsonl" else "parquet"
+        path = self.directory / f"{self.prefix}-{len(self.files) + 1:04d}.{suffix}"
+        self.files.append(str(path))
+        self._rows_in_file = 0
+        if self.fmt == "jsonl":
+            self._handle = gzip.open(path, "wt", encoding="utf-8")
+        else:
+            import pyarrow.parquet as pq
+
+            self._handle = pq.ParquetWriter(str(path), _parquet_schema(), compression="zstd")
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        while rows:
+            if self._handle is None or self._rows_in_file >= self.rows_per_file:
+                self.close()
+                self._open()
+            take = rows[: self.rows_per_file - self._rows_in_file]
+            rows = rows[len(take):]
+            if self.fmt == "jsonl":
+                self._handle.write("".join(json.dumps(row, default=str) + "\n" for row in take))
+                self._handle.flush()
+            else:
+                import pyarrow as pa
+
+                self._handle.write_table(pa.Table.from_pylist([_flatten(row) for row in take], _parquet_schema()))
+            self._rows_in_file += len(take)
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def _flatten(row: Dict[str, Any]) -> Dict[str, Any]:
+    flat = dict(row)
+    flat["intents"] = json.dumps(row["intents"]) if row["intents"] is not None else None
+    flat["tickets"] = json.dumps(row["tickets"], default=str)
+    return flat
+
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("phone", pa.string()),
+            ("direction", pa.string()),
+            ("locale", pa.string()),
+            ("start_ts", pa.timestamp("us")),
+            ("end_ts", pa.timestamp("us")),
+            ("transcript", pa.string()),
+            ("intents", pa.string()),
+            ("status", pa.string()),
+            ("tickets", pa.string()),
+        ]
+    )
+
+
+def delete_conversations(session: Session, ids: List[int]) -> Dict[str, int]:
+    """Lock and delete conversations ``ids`` with their tickets and jobs; the caller commits."""
+    options = {"synchronize_session": False}
+    session.execute(select(Conversation.id).where(Conversation.id.in_(ids)).with_for_update())
+    tickets = session.execute(delete(Ticket).where(Ticket.conversation_id.in_(ids)), execution_options=options)
+    jobs = session.execute(delete(Job).where(Job.conversation_id.in_(ids)), execution_options=options)
+    conversations = session.execute(delete(Conversation).where(Conversation.id.in_(ids)), execution_options=options)
+    return {"conversations": conversations.rowcount, "tickets": tickets.rowcount, "jobs": jobs.rowcount}
+
+
+def _archive_rows(session: Session, ids: List[int]) -> List[Dict[str, Any]]:
+    tickets: Dict[int, List[Dict[str, Any]]] = {}
+    for t in session.execute(select(Ticket.__table__).where(Ticket.conversation_id.in_(ids))).mappings():
+        tickets.setdefault(t["conversation_id"], []).append(
+            {k: t[k] for k in ("id", "category", "status", "created_ts", "resolved_ts")}
+        )
+    rows = []
+    for c in session.execute(select(Conversation.__table__).where(Conversation.id.in_(ids))).mappings():
+        row = dict(c)
+        row["tickets"] = tickets.get(c["id"], [])
+        rows.append(row)
+    return rows
+
+
+def _filters(policy: RetentionPolicy, now: datetime) -> list:
+    clauses = []
+    if policy.older_than_days is not None:
+        clauses.append(Conversation.start_ts < now - timedelta(days=policy.older_than_days))
+    if policy.status:
+        clauses.append(Conversation.status == policy.status)
+    if policy.direction:
+        clauses.append(Conversation.direction == policy.direction)
+    if policy.phone:
+        clauses.append(Conversation.phone == policy.phone)
+    if not policy.include_active:
+        clauses.append(
+            ~exists().where(Job.conversation_id == Conversation.id, Job.status.in_(ACTIVE_JOB_STATUSES))
+        )
+    return clauses
+
+
+def _next_batch(session: Session, policy: RetentionPolicy, clauses: list, after: Any, size: int) -> list:
+    """Return the next ``size`` matching rows after the keyset position ``after``."""
+    if policy.older_than_days is not None:
+        query = select(Conversation.id, Conversation.start_ts).where(*clauses)
+        if after is not None:
+            ts, last_id = after
+            query = query.where(
+                or_(Conversation.start_ts > ts, and_(Conversation.start_ts == ts, Conversation.id > last_id))
+            )
+        query = query.order_by(Conversation.start_ts, Conversation.id)
+    else:
+        query = select(Conversation.id).where(*clauses)
+        if after is not None:
+            query = query.where(Conversation.id > after)
+        query = query.order_by(Conversation.id)
+    return session.execute(query.limit(size)).all()
+
+
+def apply_policy(
+    policy: RetentionPolicy,
+    batch_size: int | None = None,
+    archive_dir: str | None = None,
+    archive_format: str = "jsonl",
+    dry_run: bool = False,
+    progress: Callable[[RetentionReport], None] | None = None,
+    now: datetime | None = None,
+) -> RetentionReport:
+    """Archive (if asked) and delete matching conversations, one commit per batch."""
+    batch_size = batch_size or int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+    now = now or datetime.utcnow()
+    report = RetentionReport(policy, dry_run)
+    writer = None
+    if policy.action == "archive" and not dry_run:
+        if not archive_dir:
+            raise ValueError(f"retention policy {policy.name!r} archives rows but no archive directory was given")
+        stamp = now.strftime("%Y%m%dT%H%M%S")
+        writer = ArchiveWriter(archive_dir, f"{policy.name}-{stamp}", archive_format)
+    clauses = _filters(policy, now)
+    after: Any = None
+    try:
+        while True:
+            with session_scope() as session:
+                rows = _next_batch(session, policy, clauses, after, batch_size)
+                if not rows:
+                    break
+                ids = [row[0] for row in rows]
+                after = (rows[-1][1], ids[-1]) if policy.older_than_days is not None else ids[-1]
+                if dry_run:
+                    report.tickets += session.query(Ticket.id).filter(Ticket.conversation_id.in_(ids)).count()
+                    report.jobs += session.query(Job.id).filter(Job.conversation_id.in_(ids)).count()
+                else:
+                    if writer is not None:
+                        writer.write(_archive_rows(session, ids))
+                    counts = delete_conversations(session, ids)
+                    session.commit()
+                    report.tickets += counts["tickets"]
+                    report.jobs += counts["jobs"]
+            report.conversations += len(ids)
+            report.batches += 1
+            report.elapsed = time.perf_counter() - report.started
+            if progress:
+                progress(report)
+    finally:
+        if writer is not None:
+            writer.close()
+            report.files = writer.files
+        report.elapsed = time.perf_counter() - report.started
+    logger.info(
+        f"Retention policy {policy.name}: {'matched' if dry_run else policy.action + 'd'} "
+        f"{report.conversations} conversations, {report.tickets} tickets, {report.jobs} jobs "
+        f"in {report.elapsed:.1f}s"
+    )
+    return report
+
+
+def erase_phone(phone: str, **kwargs: Any) -> RetentionReport:
+    """Delete every conversation, ticket and job for ``phone``, active or not."""
+    policy = RetentionPolicy(name="erase", action="delete", phone=phone, include_active=True)
+    return apply_policy(policy, **kwargs)
+
+
+def scrub_archives(directory: str, phone: str, dry_run: bool = False) -> Dict[str, Any]:
+    """Remove ``phone``'s conversations from the archive files in ``directory``."""
+    report: Dict[str, Any] = {"rows": 0, "files": [], "skipped": []}
+    root = Path(directory)
+    if not root.is_dir():
+        return report
+    for path in sorted(root.glob("*.jsonl.gz")) + sorted(root.glob("*.parquet")):
+        if path.suffix == ".parquet":
+            try:
+                removed = _scrub_parquet(path, phone, dry_run)
+            except ImportError:
+                report["skipped"].append(str(path))
+                continue
+        else:
+            removed = _scrub_jsonl(path, phone, dry_run)
+        if removed:
+            report["rows"] += removed
+            report["files"].append(str(path))
+    return report
+
+
+def _scrub_jsonl(path: Path, phone: str, dry_run: bool) -> int:
+    removed = 0
+    needle = json.dumps(phone)
+    tmp = path.with_name(path.name + ".tmp")
+    out = None if dry_run else gzip.open(tmp, "wt", encoding="utf-8")
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                if needle in line and json.loads(line).get("phone") == phone:
+                    removed += 1
+                elif out is not None:
+                    out.write(line)
+    except BaseException:
+        if out is not None:
+            out.close()
+            tmp.unlink(missing_ok=True)
+        raise
+    if out is not None:
+        out.close()
+        if removed:
+            os.replace(tmp, path)
+        else:
+            tmp.unlink()
+    return removed
+
+
+def _scrub_parquet(path: Path, phone: str, dry_run: bool) -> int:
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path)
+    kept = table.filter(pc.fill_null(pc.not_equal(table["phone"], phone), True))
+    removed = table.num_rows - kept.num_rows
+    if removed and not dry_run:
+        tmp = path.with_name(path.name + ".tmp")
+        pq.write_table(kept, tmp, compression="zstd")
+        os.replace(tmp, path)
+    return removed
+
+
+def load_policies(path: str | None = None) -> List[RetentionPolicy]:
+    """Read policies from a JSON file, or the ``retention_policies`` config key."""
+    if path:
+        with open(path) as fh:
+            data = json.load(fh)
+    else:
+        from app.config import config_store
+
+        data = config_store.get("retention_policies", [])
+    if isinstance(data, dict):
+        data = data.get("retention_policies", [])
+    return [RetentionPolicy.from_dict(item) for item in data]
+
+
+def run_policies(policies: Iterable[RetentionPolicy], **kwargs: Any) -> List[RetentionReport]:
+    return [apply_policy(policy, **kwargs) for policy in policies]
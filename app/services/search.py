@@ -0,0 +1,229 @@
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import Float, and_, column, func, inspect, literal, literal_column, select, table, text
+from sqlalchemy.orm import Session
+
+from app.models.db import Conversation
+from app.services.conversation import intent_clause
+
+SNIPPET_WORDS = 16
+conversations_fts = table("conversations_fts", column("rowid"), column("transcript"))
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchHit(NamedTuple):
+    conversation_id: int
+    phone: Optional[str]
+    start_ts: Optional[datetime]
+    intents: Optional[List[str]]
+    rank: float
+    snippet: str
+
+
+class SearchResults(NamedTuple):
+    hits: List[SearchHit]
+    truncated: bool = False
+
+
+def query_terms(q: str) -> List[str]:
+    return [t.lower() for t in _TERM_RE.findall(q)]
+
+
+def like_pattern(term: str) -> str:
+    """Match ``term`` anywhere, with ``LIKE`` wildcards in it taken literally (escape character ``\\``)."""
+    return "%" + re.sub(r"([\\%_])", r"\\\1", term) + "%"
+
+
+def fts5_query(terms: List[str]) -> str:
+    """Quote every term so user input can never be parsed as FTS5 syntax."""
+    return " ".join(f'"{t}"' for t in terms)
+
+
+class TranscriptSearch:
+    """Ranked transcript search over FTS5, ``tsvector`` or a ``LIKE`` scan, whichever the DB has."""
+
+    def __init__(self, rank_window: int | None = None) -> None:
+        self.rank_window = rank_window if rank_window is not None else int(os.getenv("SEARCH_RANK_WINDOW", "0"))
+        self._backends: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def backend(self, session: Session) -> str:
+        bind = session.get_bind()
+        key = str(bind.url)
+        backend = self._backends.get(key)
+        if backend is None:
+            with self._lock:
+                backend = self._backends[key] = self._detect(bind)
+        return backend
+
+    @staticmethod
+    def _detect(bind: Any) -> str:
+        inspector = inspect(bind)
+        if bind.dialect.name == "sqlite" and inspector.has_table("conversations_fts"):
+            return "fts5"
+        if bind.dialect.name == "postgresql":
+            columns = {c["name"] for c in inspector.get_columns("conversations")}
+            if "transcript_tsv" in columns:
+                return "tsvector"
+        return "scan"
+
+    def search(
+        self,
+        session: Session,
+        q: str,
+        intent: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> SearchResults:
+        """Return hits for ``q``, best match first."""
+        terms = query_terms(q)
+        if not terms:
+            return SearchResults([])
+        filters = []
+        id_range = None
+        if date_from:
+            filters.append(Conversation.start_ts >= date_from)
+        if date_to:
+            filters.append(Conversation.start_ts < date_to)
+        if filters:
+            # Bound the ids via the start_ts index so the text index can skip
+            # straight to the date range instead of filtering every match.
+            id_range = session.execute(
+                select(func.min(Conversation.id), func.max(Conversation.id)).where(*filters)
+            ).one()
+            if id_range[0] is None:
+                return SearchResults([])
+        if intent:
+            filters.append(intent_clause(intent))
+
+        backend = self.backend(session)
+        if backend == "fts5":
+            return self._search_fts5(session, terms, filters, id_range, limit, offset)
+        if id_range:
+            filters.append(Conversation.id.between(*id_range))
+        if backend == "tsvector":
+            return self._search_tsvector(session, q, filters, limit, offset)
+        return self._search_scan(session, terms, filters, limit, offset)
+
+    def _rank_floor(self, session: Session, candidates, id_column, params: Dict[str, Any]) -> Optional[int]:
+        """Return the smallest id among the newest ``rank_window`` matches, if there are more."""
+        if self.rank_window <= 0:
+            return None
+        stmt = candidates.order_by(id_column.desc()).offset(self.rank_window - 1).limit(1)
+        return session.execute(stmt, params).scalar()
+
+    def _search_fts5(self, session, terms, filters, id_range, limit, offset) -> SearchResults:
+        params = {"match": fts5_query(terms)}
+        rowid = conversations_fts.c.rowid
+        where = [text("conversations_fts MATCH :match"), *filters]
+        if id_range:
+            where.append(rowid.between(*id_range))
+        candidates = select(rowid).select_from(conversations_fts)
+        if filters:
+            candidates = candidates.join(Conversation, Conversation.id == rowid)
+        floor = self._rank_floor(session, candidates.where(*where), rowid, params)
+        if floor is not None:
+            where.append(rowid >= floor)
+
+        rank = literal_column("bm25(conversations_fts)", Float)
+        stmt = (
+            select(
+                Conversation.id,
+                Conversation.phone,
+                Conversation.start_ts,
+                Conversation.intents,
+                (-rank).label("rank"),
+                text(f"snippet(conversations_fts, 0, '[', ']', '…', {SNIPPET_WORDS})"),
+            )
+            .select_from(conversations_fts)
+            .join(Conversation, Conversation.id == conversations_fts.c.rowid)
+            .where(*where)
+            .order_by(rank, Conversation.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        rows = session.execute(stmt, params)
+        return SearchResults([SearchHit(*row) for row in rows], floor is not None)
+
+    def _search_tsvector(self, session, q, filters, limit, offset) -> SearchResults:
+        query = text("websearch_to_tsquery('english', :q)")
+        tsv = text("conversations.transcript_tsv")
+        where = [tsv.op("@@")(query), *filters]
+        floor = self._rank_floor(session, select(Conversation.id).where(*where), Conversation.id, {"q": q})
+        if floor is not None:
+            where.append(Conversation.id >= floor)
+        rank = literal_column(
+            "ts_rank_cd(conversations.transcript_tsv, websearch_to_tsquery('english', :q))", Float
+        )
+        page = (
+            select(Conversation.id, rank.label("rank"))
+            .where(and_(*where))
+            .order_by(rank.desc(), Conversation.id)
+            .limit(limit)
+            .offset(offset)
+            .subquery()
+        )
+        # ts_headline is expensive, so it only runs on the rows of this page.
+        headline = text(
+            f"ts_headline('english', conversations.transcript, websearch_to_tsquery('english', :q), "
+            f"'StartSel=[, StopSel=], MaxWords={SNIPPET_WORDS}, MinWords=5')"
+        )
+        stmt = (
+            select(
+                Conversation.id,
+                Conversation.phone,
+                Conversation.start_ts,
+                Conversation.intents,
+                page.c.rank,
+                headline,
+            )
+            .join(page, page.c.id == Conversation.id)
+            .order_by(page.c.rank.desc(), Conversation.id)
+        )
+        rows = session.execute(stmt, {"q": q})
+        return SearchResults([SearchHit(*row) for row in rows], floor is not None)
+
+    def _search_scan(self, session, terms, filters, limit, offset) -> SearchResults:
+        like = [Conversation.transcript.ilike(like_pattern(t), escape="\\") for t in terms]
+        stmt = (
+            select(
+                Conversation.id,
+                Conversation.phone,
+                Conversation.start_ts,
+                Conversation.intents,
+                literal(0.0),
+                Conversation.transcript,
+            )
+            .where(*like, *filters)
+            .order_by(Conversation.start_ts.desc(), Conversation.id.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        return SearchResults([
+            SearchHit(*row[:5], make_snippet(row[5] or "", terms))
+            for row in session.execute(stmt)
+        ])
+
+
+def make_snippet(transcript: str, terms: List[str], words: int = SNIPPET_WORDS) -> str:
+    """Return about ``words`` words around the first matching term, matches in brackets."""
+    tokens = transcript.split()
+    lowered = [t.lower() for t in tokens]
+    first = next((i for i, t in enumerate(lowered) if any(term in t for term in terms)), 0)
+    start = max(0, first - words // 2)
+    window = [
+        f"[{tok}]" if any(term in low for term in terms) else tok
+        for tok, low in zip(tokens[start:start + words], lowered[start:start + words])
+    ]
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + words < len(tokens) else ""
+    return prefix + " ".join(window) + suffix
+
+
+transcript_search = TranscriptSearch()
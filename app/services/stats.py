@@ -0,0 +1,339 @@
+import asyncio
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import bindparam, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.logging_config import logger
+from app.models.db import (
+    Conversation, StatsHourly, StatsIntentHourly, StatsWatermark, Ticket, session_scope,
+)
+from app.services.executor import run_blocking
+
+STATS_ROLLUP_ROWS = Counter(
+    "voice_agent_stats_rollup_rows_total", "Source rows folded into the analytics rollups", ["source"]
+)
+STATS_ROLLUP_LAG = Gauge(
+    "voice_agent_stats_rollup_lag_seconds", "Age of the newest row folded into the rollups", ["source"]
+)
+
+EPOCH = datetime(1970, 1, 1)
+BUCKETS = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(days=7)}
+UNKNOWN = "unknown"
+
+# Source name -> (timestamp column, id column) its watermark walks.
+SOURCES = {
+    "conversations": (Conversation.end_ts, Conversation.id),
+    "tickets_created": (Ticket.created_ts, Ticket.id),
+    "tickets_resolved": (Ticket.resolved_ts, Ticket.id),
+}
+_COUNTERS = (
+    "calls", "handled_calls", "handle_seconds", "tickets_opened", "tickets_resolved", "resolve_seconds",
+)
+
+Key = Tuple[datetime, str, str]
+
+
+def hour_of(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def bucket_start(ts: datetime, bucket: str) -> datetime:
+    """Start of the UTC ``hour``, ``day`` or ISO ``week`` (Monday) holding ``ts``."""
+    start = hour_of(ts)
+    if bucket == "hour":
+        return start
+    start = start.replace(hour=0)
+    if bucket == "week":
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def _source_query(source: str):
+    if source == "conversations":
+        return select(
+            Conversation.id,
+            Conversation.end_ts,
+            Conversation.start_ts,
+            Conversation.locale,
+            Conversation.direction,
+            Conversation.intents,
+        )
+    ts = Ticket.created_ts if source == "tickets_created" else Ticket.resolved_ts
+    return select(
+        Ticket.id, ts, Ticket.created_ts, Ticket.resolved_ts, Conversation.locale, Conversation.direction
+    ).outerjoin(Conversation, Conversation.id == Ticket.conversation_id)
+
+
+def _aggregate(source: str, rows: List[Any]) -> Tuple[Dict[Key, Dict[str, float]], Dict[Tuple, int]]:
+    totals: Dict[Key, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    intents: Dict[Tuple, int] = defaultdict(int)
+    for row in rows:
+        locale, direction = row.locale or UNKNOWN, row.direction or UNKNOWN
+        if source == "conversations":
+            key = (hour_of(row.start_ts or row.end_ts), locale, direction)
+            totals[key]["calls"] += 1
+            if row.start_ts:
+                totals[key]["handled_calls"] += 1
+                totals[key]["handle_seconds"] += max(0.0, (row.end_ts - row.start_ts).total_seconds())
+            for intent in set(row.intents or []):
+                intents[key + (str(intent)[:50],)] += 1
+        elif source == "tickets_created":
+            totals[(hour_of(row.created_ts), locale, direction)]["tickets_opened"] += 1
+        else:
+            key = (hour_of(row.resolved_ts), locale, direction)
+            totals[key]["tickets_resolved"] += 1
+            if row.created_ts:
+                totals[key]["resolve_seconds"] += max(0.0, (row.resolved_ts - row.created_ts).total_seconds())
+    return totals, intents
+
+
+def _merge(session: Session, model: Any, increments: Dict[Tuple, Dict[str, float]]) -> None:
+    """Add ``increments`` (keyed by primary key tuple) to ``model``'s rollup rows."""
+    if not increments:
+        return
+    table = model.__table__
+    keys = [c.name for c in table.primary_key.columns]
+    counters = [c.name for c in table.columns if c.name not in keys]
+    conn = session.connection()
+    existing = set(
+        tuple(row)
+        for row in conn.execute(
+            select(*table.primary_key.columns).where(table.c.bucket_ts.in_({key[0] for key in increments}))
+        )
+    )
+    updates, inserts = [], []
+    for key, values in increments.items():
+        row = {**dict(zip(keys, key)), **{c: values.get(c, 0) for c in counters}}
+        if key in existing:
+            updates.append({f"k_{k}": v for k, v in row.items()})
+        else:
+            inserts.append(row)
+    if updates:
+        conn.execute(
+            table.update()
+            .where(*[table.c[k] == bindparam(f"k_{k}") for k in keys])
+            .values({c: table.c[c] + bindparam(f"k_{c}") for c in counters}),
+            updates,
+        )
+    if inserts:
+        conn.execute(table.insert(), inserts)
+
+
+class StatsRollup:
+    """Fold closed calls and ticket changes into the hourly rollups, past a per-source watermark."""
+
+    def __init__(self, batch_size: int | None = None, lag: float | None = None) -> None:
+        self.batch_size = batch_size or int(os.getenv("STATS_ROLLUP_BATCH", "5000"))
+        self.lag = lag if lag is not None else float(os.getenv("STATS_ROLLUP_LAG", "60"))
+
+    def run(self, progress: Callable[[str, int, float], None] | None = None) -> Dict[str, int]:
+        """Catch every source up to ``now - lag`` and return the rows processed.
+
+        ``progress(source, rows, seconds)`` is called after every batch.
+        """
+        upper = datetime.utcnow() - timedelta(seconds=self.lag)
+        processed = {}
+        for source in SOURCES:
+            total = 0
+            start = time.perf_counter()
+            while True:
+                try:
+                    count = self.step(source, upper)
+                except IntegrityError:
+                    logger.info(f"Stats rollup for {source} raced another worker; retrying")
+                    continue
+                if count == 0:
+                    break
+                total += count
+                if progress:
+                    progress(source, total, time.perf_counter() - start)
+            processed[source] = total
+        return processed
+
+    def step(self, source: str, upper: datetime) -> int:
+        ts_column, id_column = SOURCES[source]
+        with session_scope() as session:
+            mark = session.get(StatsWatermark, source, with_for_update=True)
+            mark_ts, mark_id = (mark.ts, mark.last_id) if mark else (EPOCH, 0)
+            rows = session.execute(
+                _source_query(source)
+                .where(
+                    ts_column >= mark_ts,
+                    ts_column < upper,
+                    or_(ts_column > mark_ts, id_column > mark_id),
+                )
+                .order_by(ts_column, id_column)
+                .limit(self.batch_size)
+            ).all()
+            if not rows:
+                if mark:
+                    mark.checked_ts = upper
+                else:
+                    session.add(StatsWatermark(name=source, ts=EPOCH, last_id=0, checked_ts=upper))
+                session.commit()
+                STATS_ROLLUP_LAG.labels(source).set((datetime.utcnow() - mark_ts).total_seconds())
+                return 0
+            new_ts, new_id = rows[-1][1], rows[-1][0]
+            if mark:
+                claimed = session.execute(
+                    update(StatsWatermark)
+                    .where(
+                        StatsWatermark.name == source,
+                        StatsWatermark.ts == mark_ts,
+                        StatsWatermark.last_id == mark_id,
+                    )
+                    .values(ts=new_ts, last_id=new_id)
+                ).rowcount
+                if not claimed:
+                    session.rollback()
+                    return self.step(source, upper)
+            else:
+                session.execute(insert(StatsWatermark).values(name=source, ts=new_ts, last_id=new_id))
+            totals, intents = _aggregate(source, rows)
+            _merge(session, StatsHourly, totals)
+            _merge(session, StatsIntentHourly, {key: {"calls": calls} for key, calls in intents.items()})
+            session.commit()
+        STATS_ROLLUP_ROWS.labels(source).inc(len(rows))
+        STATS_ROLLUP_LAG.labels(source).set((datetime.utcnow() - new_ts).total_seconds())
+        return len(rows)
+
+    def reset(self) -> None:
+        """Drop every rollup row and watermark so the next run rebuilds from scratch."""
+        with session_scope() as session:
+            for model in (StatsHourly, StatsIntentHourly, StatsWatermark):
+                session.execute(delete(model))
+            session.commit()
+
+
+def move_intent_counts(session: Session, labels: Dict[int, List[str]]) -> int:
+    """Move already folded intent counts to the new ``labels``; call before rewriting ``intents``."""
+    mark = session.get(StatsWatermark, "conversations", with_for_update=True, populate_existing=True)
+    if mark is None or not labels:
+        return 0
+    rows = session.execute(
+        _source_query("conversations").where(Conversation.id.in_(labels), Conversation.end_ts.isnot(None))
+    ).all()
+    deltas: Dict[Tuple, int] = defaultdict(int)
+    moved = 0
+    for row in rows:
+        old, new = set(row.intents or []), set(labels[row.id])
+        if old == new or (row.end_ts, row.id) > (mark.ts, mark.last_id):
+            continue
+        key = (hour_of(row.start_ts or row.end_ts), row.locale or UNKNOWN, row.direction or UNKNOWN)
+        for intent in old:
+            deltas[key + (str(intent)[:50],)] -= 1
+        for intent in new:
+            deltas[key + (str(intent)[:50],)] += 1
+        moved += 1
+    _merge(session, StatsIntentHourly, {key: {"calls": n} for key, n in deltas.items() if n})
+    return moved
+
+
+class StatsRollupWorker:
+    """Run :meth:`StatsRollup.run` every ``STATS_ROLLUP_INTERVAL`` seconds (0 disables)."""
+
+    def __init__(self, rollup: StatsRollup | None = None, interval: float | None = None) -> None:
+        self.rollup = rollup or StatsRollup()
+        self.interval = interval if interval is not None else float(os.getenv("STATS_ROLLUP_INTERVAL", "60"))
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    async def start(self) -> None:
+        if self.interval <= 0:
+            return
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="stats-rollup")
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await run_blocking("db", self.rollup.run)
+            except Exception as e:
+                logger.warning(f"Stats rollup failed: {e}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+def _summary(values: Dict[str, float]) -> Dict[str, Any]:
+    calls, opened, resolved = int(values["calls"]), int(values["tickets_opened"]), int(values["tickets_resolved"])
+    handled = values["handled_calls"]
+    return {
+        "calls": calls,
+        "avg_handle_seconds": round(values["handle_seconds"] / handled, 1) if handled else None,
+        "tickets_opened": opened,
+        "tickets_resolved": resolved,
+        "ticket_rate": round(opened / calls, 4) if calls else None,
+        "resolution_rate": round(resolved / opened, 4) if opened else None,
+        "avg_resolve_seconds": round(values["resolve_seconds"] / resolved, 1) if resolved else None,
+    }
+
+
+def query_stats(
+    session: Session,
+    date_from: datetime,
+    date_to: datetime,
+    bucket: str = "hour",
+    locale: Optional[str] = None,
+    direction: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Aggregate the hourly rollups into ``bucket`` rows over ``[date_from, date_to)``."""
+    filters = [StatsHourly.bucket_ts >= hour_of(date_from), StatsHourly.bucket_ts < date_to]
+    intent_filters = [StatsIntentHourly.bucket_ts >= hour_of(date_from), StatsIntentHourly.bucket_ts < date_to]
+    if locale:
+        filters.append(StatsHourly.locale == locale)
+        intent_filters.append(StatsIntentHourly.locale == locale)
+    if direction:
+        filters.append(StatsHourly.direction == direction)
+        intent_filters.append(StatsIntentHourly.direction == direction)
+
+    totals: Dict[datetime, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    intents: Dict[datetime, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    sums = [func.sum(getattr(StatsHourly, name)) for name in _COUNTERS]
+    hourly = select(StatsHourly.bucket_ts, *sums).where(*filters).group_by(StatsHourly.bucket_ts)
+    for bucket_ts, *row in session.execute(hourly):
+        values = totals[bucket_start(bucket_ts, bucket)]
+        for name, value in zip(_COUNTERS, row):
+            values[name] += value
+    by_intent = (
+        select(StatsIntentHourly.bucket_ts, StatsIntentHourly.intent, func.sum(StatsIntentHourly.calls))
+        .where(*intent_filters)
+        .group_by(StatsIntentHourly.bucket_ts, StatsIntentHourly.intent)
+    )
+    for bucket_ts, intent, calls in session.execute(by_intent):
+        intents[bucket_start(bucket_ts, bucket)][intent] += calls
+
+    items = []
+    overall: Dict[str, float] = defaultdict(float)
+    overall_intents: Dict[str, int] = defaultdict(int)
+    start, step = bucket_start(date_from, bucket), BUCKETS[bucket]
+    while start < date_to:
+        values = totals.get(start, defaultdict(float))
+        for name in _COUNTERS:
+            overall[name] += values[name]
+        for intent, calls in intents.get(start, {}).items():
+            overall_intents[intent] += calls
+        items.append({"bucket_start": start, **_summary(values), "intents": dict(intents.get(start, {}))})
+        start += step
+    checked = session.execute(select(StatsWatermark.checked_ts)).scalars().all()
+    return {
+        "bucket": bucket,
+        "as_of": min(checked) if len(checked) == len(SOURCES) and all(checked) else None,
+        "totals": {**_summary(overall), "intents": dict(overall_intents)},
+        "items": items,
+    }
@@ -1,71 +1,261 @@
+import asyncio
+import io
+import mimetypes
 import os
-from typing import Optional, List
-import tempfile
+import re
+import uuid
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Optional, List, Sequence, Union
+
+import httpx
 
 from app.config import get_default_locale
+from app.services.audio import detect_mimetype, ulaw_to_pcm16
+from app.services.instrumentation import provider_call
+from app.services.resilience import call_timeout
+from app.services.stt_stream import StreamingSTTBackend, TranscriptEvent, get_streaming_backend
+
+AudioBytes = Union[bytes, bytearray, memoryview]
+AudioSource = Union[AudioBytes, AsyncIterable[bytes]]
+
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
 
 
 class STTClient:
     """Speech-to-text client supporting OpenAI Whisper and Deepgram, with optional locale."""
 
-    def __init__(self, provider: Optional[str] = None, locale: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        provider: Optional[str] = None,
+        locale: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
         self.provider = (provider or os.getenv("STT_PROVIDER", "openai")).lower()
         self.locale = locale or os.getenv("DEFAULT_LOCALE") or get_default_locale()
+        self._http_client = http_client
+        self._timeout = float(os.getenv("STT_TIMEOUT", "60"))
+        self._client: Any = None
         if self.provider == "openai":
-            try:
-                import openai
-            except ImportError as e:
-                raise ImportError("openai package required for Whisper STT") from e
-            self._client = openai
             self._model = os.getenv("OPENAI_WHISPER_MODEL", "whisper-1")
             self._api_key = os.getenv("OPENAI_API_KEY")
-            if self._api_key:
-                self._client.api_key = self._api_key
         elif self.provider == "deepgram":
-            try:
-                from deepgram import Deepgram
-            except ImportError as e:
-                raise ImportError("deepgram-sdk package required for Deepgram STT") from e
             self._api_key = os.getenv("DEEPGRAM_API_KEY")
             if not self._api_key:
                 raise ValueError("DEEPGRAM_API_KEY not set")
-            self._client = Deepgram(self._api_key)
             self._model = os.getenv("DEEPGRAM_MODEL", "general")
         else:
             raise ValueError(f"Unsupported STT provider: {self.provider}")
 
-    def transcribe(self, audio_path: str) -> str:
-        """Transcribe audio file located at ``audio_path`` and return text."""
+    def _sdk(self) -> Any:
+        """Import the provider SDK on first use. Only :meth:`transcribe` needs it."""
+        if self._client is None:
+            if self.provider == "openai":
+                try:
+                    import openai
+                except ImportError as e:
+                    raise ImportError("openai package required for Whisper STT") from e
+                if self._api_key:
+                    openai.api_key = self._api_key
+                self._client = openai
+            else:
+                try:
+                    from deepgram import Deepgram
+                except ImportError as e:
+                    raise ImportError("deepgram-sdk package required for Deepgram STT") from e
+                self._client = Deepgram(self._api_key)
+        return self._client
+
+    def transcribe(self, audio: AudioBytes, mimetype: Optional[str] = None) -> str:
+        """Transcribe in-memory ``audio`` and return text.
+
+        Without ``mimetype`` the format is detected from the audio itself.
+        """
+        mimetype = mimetype or detect_mimetype(bytes(audio[:16])) or "audio/wav"
+        with provider_call("stt", self.provider, "transcribe", locale=self.locale) as call:
+            call.sent(len(audio))
+            text = self._transcribe(audio, mimetype)
+            call.received(len(text.encode()))
+            return text
+
+    def _transcribe(self, audio: AudioBytes, mimetype: str) -> str:
         if self.provider == "openai":
-            with open(audio_path, "rb") as fh:
-                # include locale for language-specific transcription
-                response = self._client.Audio.transcribe(self._model, fh, language=self.locale)
+            fh = io.BytesIO(audio)
+            fh.name = "audio" + (mimetypes.guess_extension(mimetype, strict=False) or ".wav")
+            # include locale for language-specific transcription
+            response = self._sdk().Audio.transcribe(
+                self._model, fh, language=self.locale, request_timeout=call_timeout(self._timeout)
+            )
             return response.get("text", "")
         elif self.provider == "deepgram":
-            with open(audio_path, "rb") as fh:
-                source = {"buffer": fh.read(), "mimetype": "audio/wav"}
+            buffer = audio if isinstance(audio, bytes) else bytes(audio)
+            source = {"buffer": buffer, "mimetype": mimetype}
             options = {"model": self._model, "language": self.locale}
-            response = self._client.transcription.sync_prerecorded(source, options)
+            response = self._sdk().transcription.sync_prerecorded(
+                source, options, timeout=call_timeout(self._timeout)
+            )
             return response["results"]["channels"][0]["alternatives"][0]["transcript"]
         raise RuntimeError("Unhandled STT provider")
 
+    async def transcribe_stream(
+        self,
+        audio: AudioSource,
+        mimetype: str = "audio/wav",
+        http_client: httpx.AsyncClient | None = None,
+    ) -> str:
+        """Transcribe bytes or an async byte iterator by streaming it into the provider upload."""
+        owned = http_client is None and self._http_client is None
+        client = http_client or self._http_client or httpx.AsyncClient(timeout=HTTP_TIMEOUT)
+        try:
+            with provider_call("stt", self.provider, "transcribe_stream", locale=self.locale) as call:
+                text = await self._transcribe_stream(client, call.count_sent(iter_audio(audio)), mimetype)
+                call.received(len(text.encode()))
+                return text
+        finally:
+            if owned:
+                await client.aclose()
+
+    async def _transcribe_stream(
+        self, client: httpx.AsyncClient, chunks: AsyncIterator[bytes], mimetype: str
+    ) -> str:
+        if self.provider == "openai":
+            boundary = uuid.uuid4().hex
+            fields = {"model": self._model, "language": self.locale}
+            response = await client.post(
+                f"{os.getenv('OPENAI_API_BASE', 'https://api.openai.com/v1')}/audio/transcriptions",
+                content=_multipart_stream(boundary, fields, chunks, mimetype),
+                headers={
+                    "Authorization": f"Bearer {self._api_key}",
+                    "Content-Type": f"multipart/form-data; boundary={boundary}",
+                },
+            )
+            response.raise_for_status()
+            return response.json().get("text", "")
+        elif self.provider == "deepgram":
+            response = await client.post(
+                os.getenv("DEEPGRAM_API_URL", "https://api.deepgram.com/v1/listen"),
+                params={"model": self._model, "language": self.locale},
+                content=chunks,
+                headers={"Authorization": f"Token {self._api_key}", "Content-Type": mimetype},
+            )
+            response.raise_for_status()
+            return response.json()["results"]["channels"][0]["alternatives"][0]["transcript"]
+        raise RuntimeError("Unhandled STT provider")
+
+
+async def transcribe_chunks(
+    transcribe: Callable[[bytes], Awaitable[str]],
+    chunks: Sequence[bytes],
+    concurrency: int | None = None,
+) -> str:
+    """Transcribe overlapping chunks of one recording in parallel and stitch the text."""
+    limit = asyncio.Semaphore(concurrency or int(os.getenv("STT_CHUNK_CONCURRENCY", "4")))
+
+    async def one(chunk: bytes) -> str:
+        async with limit:
+            return await transcribe(chunk)
+
+    tasks = [asyncio.ensure_future(one(chunk)) for chunk in chunks]
+    try:
+        texts = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return stitch_transcripts(texts)
+
+
+def _words(text: str) -> List[str]:
+    return [re.sub(r"[^\w']", "", w).lower() for w in text.split()]
+
+
+def stitch_transcripts(texts: Sequence[str], max_overlap: int = 20) -> str:
+    """Join transcripts of overlapping chunks, dropping words repeated at each seam."""
+    merged: List[str] = []
+    for text in texts:
+        words = text.split()
+        if merged and words:
+            tail, head = _words(" ".join(merged[-max_overlap:])), _words(" ".join(words[:max_overlap]))
+            for k in range(min(len(tail), len(head)), 0, -1):
+                if tail[-k:] == head[:k]:
+                    words = words[k:]
+                    break
+        merged.extend(words)
+    return " ".join(merged)
+
+
+async def iter_audio(audio: AudioSource, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """Yield ``audio`` in chunks, whether it is bytes-like or an async iterator."""
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        view = memoryview(audio)
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start:start + chunk_size])
+        return
+    async for chunk in audio:
+        yield chunk
+
+
+async def _multipart_stream(
+    boundary: str, fields: dict, chunks: AsyncIterator[bytes], mimetype: str
+) -> AsyncIterator[bytes]:
+    """Encode a ``multipart/form-data`` body around a streamed file part."""
+    for name, value in fields.items():
+        if value is None:
+            continue
+        yield (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{value}\r\n"
+        ).encode()
+    extension = mimetypes.guess_extension(mimetype, strict=False) or ".wav"
+    yield (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="audio{extension}"\r\n'
+        f"Content-Type: {mimetype}\r\n\r\n"
+    ).encode()
+    async for chunk in chunks:
+        yield chunk
+    yield f"\r\n--{boundary}--\r\n".encode()
+
 
 class STTStreamListener:
-    """Utility class to accumulate audio chunks and transcribe when finished."""
+    """Feed audio chunks to a streaming STT backend as they arrive."""
 
-    def __init__(self, provider: Optional[str] = None, locale: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        provider: Optional[str] = None,
+        locale: Optional[str] = None,
+        backend: Optional[StreamingSTTBackend] = None,
+        on_event: Optional[Callable[[TranscriptEvent], Any]] = None,
+    ) -> None:
         self.locale = locale
         self.provider = provider
-        self._chunks: List[bytes] = []
+        self.backend = backend or get_streaming_backend(provider, locale=locale)
+        self.on_event = on_event
+        self._finals: List[str] = []
+        self._consumer: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        await self.backend.start()
+        self._consumer = asyncio.create_task(self._consume())
+
+    async def _consume(self) -> None:
+        async for event in self.backend.events():
+            if event.is_final:
+                self._finals.append(event.text)
+            if self.on_event:
+                result = self.on_event(event)
+                if asyncio.iscoroutine(result):
+                    await result
 
-    def feed_chunk(self, data: bytes) -> None:
-        self._chunks.append(data)
+    async def feed_chunk(self, data: bytes) -> None:
+        """Forward 16-bit PCM audio to the backend."""
+        await self.backend.feed(data)
 
-    def finish(self) -> str:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-            for chunk in self._chunks:
-                tmp.write(chunk)
-            path = tmp.name
-        client = STTClient(provider=self.provider, locale=self.locale)
-        return client.transcribe(path)
+    async def feed_ulaw(self, data: bytes) -> None:
+        """Decode mu-law audio (as sent by Twilio) and forward it."""
+        await self.backend.feed(ulaw_to_pcm16(data))
 
+    async def finish(self) -> str:
+        await self.backend.finish()
+        if self._consumer:
+            await self._consumer
+        return " ".join(self._finals)
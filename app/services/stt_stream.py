@@ -0,0 +1,198 @@
+import asyncio
+import json
+import os
+from typing import AsyncIterator, Callable, Dict, NamedTuple, Optional, Type
+from urllib.parse import urlencode
+
+from app.logging_config import logger
+from app.services.audio import TWILIO_SAMPLE_RATE, pcm16_rms
+
+
+class TranscriptEvent(NamedTuple):
+    """A partial or final transcript produced by a streaming backend."""
+
+    text: str
+    is_final: bool
+    start: float = 0.0
+    end: float = 0.0
+
+
+class StreamingSTTBackend:
+    """Base class for incremental speech-to-text backends fed 16-bit mono PCM."""
+
+    def __init__(self, locale: Optional[str] = None, sample_rate: int = TWILIO_SAMPLE_RATE) -> None:
+        self.locale = locale
+        self.sample_rate = sample_rate
+        self._events: asyncio.Queue[Optional[TranscriptEvent]] = asyncio.Queue()
+
+    async def start(self) -> None:
+        pass
+
+    async def feed(self, pcm: bytes) -> None:
+        raise NotImplementedError
+
+    async def finish(self) -> None:
+        raise NotImplementedError
+
+    async def events(self) -> AsyncIterator[TranscriptEvent]:
+        while True:
+            event = await self._events.get()
+            if event is None:
+                return
+            yield event
+
+    def _emit(self, event: Optional[TranscriptEvent]) -> None:
+        self._events.put_nowait(event)
+
+
+def _placeholder_recognizer(pcm: bytes, sample_rate: int) -> str:
+    return f"[speech {len(pcm) / (2 * sample_rate):.1f}s]"
+
+
+class LocalStreamingBackend(StreamingSTTBackend):
+    """Offline stand-in backend with energy-based endpointing."""
+
+    def __init__(
+        self,
+        locale: Optional[str] = None,
+        sample_rate: int = TWILIO_SAMPLE_RATE,
+        recognizer: Callable[[bytes, int], str] | None = None,
+        energy_threshold: float | None = None,
+        partial_interval: float = 0.5,
+        endpoint_silence: float = 0.6,
+    ) -> None:
+        super().__init__(locale=locale, sample_rate=sample_rate)
+        self.recognizer = recognizer or _placeholder_recognizer
+        self.energy_threshold = energy_threshold or float(os.getenv("STT_STREAM_ENERGY", "500"))
+        self._frame_bytes = 2 * sample_rate // 50  # 20 ms frames
+        self._partial_bytes = int(2 * sample_rate * partial_interval)
+        self._endpoint_frames = max(1, int(endpoint_silence * 50))
+        self._pending = b""
+        self._segment = bytearray()
+        self._since_partial = 0
+        self._silent_frames = 0
+        self._offset = 0.0
+        self._segment_start = 0.0
+
+    async def feed(self, pcm: bytes) -> None:
+        data = self._pending + pcm
+        usable = len(data) - len(data) % self._frame_bytes
+        self._pending = data[usable:]
+        for i in range(0, usable, self._frame_bytes):
+            self._process_frame(data[i:i + self._frame_bytes])
+
+    def _process_frame(self, frame: bytes) -> None:
+        frame_seconds = len(frame) / (2 * self.sample_rate)
+        voiced = pcm16_rms(frame) >= self.energy_threshold
+        if voiced:
+            if not self._segment:
+                self._segment_start = self._offset
+            self._segment += frame
+            self._since_partial += len(frame)
+            self._silent_frames = 0
+            if self._since_partial >= self._partial_bytes:
+                self._since_partial = 0
+                self._emit_segment(is_final=False)
+        elif self._segment:
+            self._segment += frame
+            self._silent_frames += 1
+            if self._silent_frames >= self._endpoint_frames:
+                self._emit_segment(is_final=True)
+        self._offset += frame_seconds
+
+    def _emit_segment(self, is_final: bool) -> None:
+        text = self.recognizer(bytes(self._segment), self.sample_rate)
+        self._emit(TranscriptEvent(text, is_final, self._segment_start, self._offset))
+        if is_final:
+            self._segment = bytearray()
+            self._since_partial = 0
+            self._silent_frames = 0
+
+    async def finish(self) -> None:
+        if self._pending:
+            self._process_frame(self._pending)
+            self._pending = b""
+        if self._segment:
+            self._emit_segment(is_final=True)
+        self._emit(None)
+
+
+class DeepgramStreamingBackend(StreamingSTTBackend):
+    """Deepgram live transcription over a WebSocket with interim results."""
+
+    url = "wss://api.deepgram.com/v1/listen"
+
+    def __init__(self, locale: Optional[str] = None, sample_rate: int = TWILIO_SAMPLE_RATE) -> None:
+        super().__init__(locale=locale, sample_rate=sample_rate)
+        self._api_key = os.getenv("DEEPGRAM_API_KEY")
+        if not self._api_key:
+            raise ValueError("DEEPGRAM_API_KEY not set")
+        self._model = os.getenv("DEEPGRAM_MODEL", "general")
+        self._ws = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        try:
+            from websockets.asyncio.client import connect
+        except ImportError as e:
+            raise ImportError("websockets package required for Deepgram streaming STT") from e
+        params = {
+            "encoding": "linear16",
+            "sample_rate": self.sample_rate,
+            "channels": 1,
+            "interim_results": "true",
+            "model": self._model,
+        }
+        if self.locale:
+            params["language"] = self.locale
+        self._ws = await connect(
+            f"{self.url}?{urlencode(params)}",
+            additional_headers={"Authorization": f"Token {self._api_key}"},
+        )
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        try:
+            async for message in self._ws:
+                data = json.loads(message)
+                if data.get("type") != "Results":
+                    continue
+                text = data["channel"]["alternatives"][0]["transcript"]
+                if not text:
+                    continue
+                start = float(data.get("start", 0.0))
+                end = start + float(data.get("duration", 0.0))
+                self._emit(TranscriptEvent(text, bool(data.get("is_final")), start, end))
+        except Exception as e:
+            logger.warning(f"Deepgram stream closed: {e}")
+        finally:
+            self._emit(None)
+
+    async def feed(self, pcm: bytes) -> None:
+        await self._ws.send(pcm)
+
+    async def finish(self) -> None:
+        await self._ws.send(json.dumps({"type": "CloseStream"}))
+        if self._reader:
+            await self._reader
+        await self._ws.close()
+
+
+STREAMING_BACKENDS: Dict[str, Type[StreamingSTTBackend]] = {
+    "local": LocalStreamingBackend,
+    "deepgram": DeepgramStreamingBackend,
+}
+
+
+def register_streaming_backend(name: str, backend: Type[StreamingSTTBackend]) -> None:
+    """Make ``backend`` selectable through ``STT_STREAM_BACKEND``."""
+    STREAMING_BACKENDS[name] = backend
+
+
+def get_streaming_backend(name: Optional[str] = None, locale: Optional[str] = None) -> StreamingSTTBackend:
+    """Instantiate the configured streaming backend (Deepgram with a key, else local)."""
+    default = "deepgram" if os.getenv("DEEPGRAM_API_KEY") else "local"
+    name = (name or os.getenv("STT_STREAM_BACKEND", default)).lower()
+    if name not in STREAMING_BACKENDS:
+        raise ValueError(f"Unsupported streaming STT backend: {name}")
+    return STREAMING_BACKENDS[name](locale=locale)
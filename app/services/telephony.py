@@ -1,16 +1,46 @@
+import asyncio
 import os
-from typing import Dict, Any
-
-from twilio.rest import Client
-from twilio.twiml.voice_response import VoiceResponse
-from twilio.base.exceptions import TwilioException
+import random
+from typing import TYPE_CHECKING, Any, Dict
 
 from app.logging_config import logger
+from app.services.executor import run_blocking
+from app.services.instrumentation import provider_call, record_retry
+from app.services.resilience import call_timeout
+
+if TYPE_CHECKING:
+    from twilio.rest import Client
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Rate limits, server errors and transport failures are worth retrying; 4xx are not."""
+    from twilio.base.exceptions import TwilioException, TwilioRestException
+
+    if isinstance(exc, TwilioRestException):
+        return exc.status == 429 or exc.status >= 500
+    return isinstance(exc, (TwilioException, OSError))
+
+
+def deadline_http_client(timeout: float) -> Any:
+    """Return a pooled Twilio HTTP client whose requests also stop at the router deadline."""
+    from twilio.http.http_client import TwilioHttpClient
+
+    class DeadlineHttpClient(TwilioHttpClient):
+        def request(self, *args: Any, timeout: float | None = None, **kwargs: Any):
+            return super().request(*args, timeout=call_timeout(timeout or self.timeout), **kwargs)
+
+    return DeadlineHttpClient(pool_connections=True, timeout=timeout)
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 30.0) -> float:
+    """Full-jitter exponential backoff for retry ``attempt`` (1-based)."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
 
 class TelephonyService:
     """Twilio/Vapi telephony integration used for outbound and inbound calls."""
 
-    def __init__(self) -> None:
+    def __init__(self, client: "Client | None" = None) -> None:
         self.account_sid = os.getenv("TWILIO_ACCOUNT_SID")
         self.auth_token = os.getenv("TWILIO_AUTH_TOKEN")
         self.caller_id = os.getenv("TWILIO_CALLER_ID")
@@ -19,27 +49,50 @@ class TelephonyService:
         if not all([self.account_sid, self.auth_token, self.caller_id]):
             raise ValueError("Twilio credentials not configured")
 
-        self._client = Client(self.account_sid, self.auth_token)
+        if client is None:
+            from twilio.rest import Client
+
+            client = Client(self.account_sid, self.auth_token)
+        self._client = client
 
     async def start_outbound_call(
-        self, phone_number: str, prompt: str, metadata: Dict[str, Any] | None = None
+        self,
+        phone_number: str,
+        prompt: str,
+        metadata: Dict[str, Any] | None = None,
+        caller_id: str | None = None,
+        retries: int = 1,
+        stream_params: Dict[str, Any] | None = None,
     ) -> Dict[str, Any]:
-        """Trigger an outbound call via Twilio."""
+        """Trigger an outbound call via Twilio, retrying retryable failures ``retries`` times."""
+
+        from twilio.twiml.voice_response import VoiceResponse
 
         vr = VoiceResponse()
         if self.stream_url:
-            vr.connect().stream(url=self.stream_url)
+            stream = vr.connect().stream(url=self.stream_url)
+            for name, value in (stream_params or {}).items():
+                stream.parameter(name=name, value=str(value))
         vr.say(prompt)
 
-        try:
-            call = self._client.calls.create(
-                twiml=str(vr), to=phone_number, from_=self.caller_id
-            )
-        except TwilioException as e:
-            logger.warning(f"Outbound call failed: {e}. Retrying once")
-            call = self._client.calls.create(
-                twiml=str(vr), to=phone_number, from_=self.caller_id
-            )
+        create = self._client.calls.create
+        from_ = caller_id or self.caller_id
+        twiml = str(vr)
+        attempt = 0
+        while True:
+            try:
+                with provider_call("telephony", "twilio", "create_call", attempt=attempt + 1) as instrumented:
+                    instrumented.sent(len(twiml))
+                    call = await run_blocking("telephony", create, twiml=twiml, to=phone_number, from_=from_)
+                break
+            except Exception as e:
+                attempt += 1
+                if attempt > retries or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt, base=0.5)
+                record_retry("telephony", "twilio", type(e).__name__)
+                logger.warning(f"Outbound call failed: {e}. Retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
 
         return {
             "status": "started",
@@ -53,8 +106,12 @@ class TelephonyService:
     async def handle_inbound_call(self, event: Dict[str, Any]) -> str:
         """Return TwiML for an inbound Twilio call that streams audio."""
 
+        from twilio.twiml.voice_response import VoiceResponse
+
         vr = VoiceResponse()
         if self.stream_url:
-            vr.connect().stream(url=self.stream_url)
+            stream = vr.connect().stream(url=self.stream_url)
+            if event.get("From"):
+                stream.parameter(name="From", value=event["From"])
         vr.say("Please begin speaking after the beep.")
         return str(vr)
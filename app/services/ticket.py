@@ -1,6 +1,10 @@
 from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 from app.models.db import SessionLocal, Ticket
+from app.services.pagination import keyset_page
 
 
 class TicketService:
@@ -9,7 +13,8 @@ class TicketService:
     def __init__(self, session: Session | None = None) -> None:
         self.session = session or SessionLocal()
 
-    def create_ticket(self, conversation_id: int, category: str) -> Ticket:
+    def create_ticket(self, conversation_id: int, category: str, commit: bool = True) -> Ticket:
+        """Create a ticket. With ``commit=False`` it is only flushed, for use in a larger unit of work."""
         ticket = Ticket(
             conversation_id=conversation_id,
             category=category,
@@ -17,7 +22,64 @@ class TicketService:
             created_ts=datetime.utcnow(),
         )
         self.session.add(ticket)
-        self.session.commit()
-        self.session.refresh(ticket)
+        if commit:
+            self.session.commit()
+            self.session.refresh(ticket)
+        else:
+            self.session.flush()
         return ticket
 
+    def create_tickets_bulk(
+        self, tickets: Iterable[Tuple[int, str]], commit: bool = True
+    ) -> List[int]:
+        """Insert ``(conversation_id, category)`` pairs in one statement and return the ids in order."""
+        now = datetime.utcnow()
+        rows = [
+            {"conversation_id": conv_id, "category": category, "status": "OPEN", "created_ts": now}
+            for conv_id, category in tickets
+        ]
+        if not rows:
+            return []
+        result = self.session.execute(
+            insert(Ticket).returning(Ticket.id, sort_by_parameter_order=True), rows
+        )
+        ids = list(result.scalars())
+        if commit:
+            self.session.commit()
+        return ids
+
+
+def resolve_ticket(session: Session, ticket_id: int) -> Optional[Ticket]:
+    """Mark a ticket ``RESOLVED`` and commit. A resolved ticket keeps its ``resolved_ts``."""
+    session.execute(
+        update(Ticket)
+        .where(Ticket.id == ticket_id, Ticket.status != "RESOLVED")
+        .values(status="RESOLVED", resolved_ts=datetime.utcnow())
+    )
+    session.commit()
+    return session.get(Ticket, ticket_id)
+
+
+def list_tickets(
+    session: Session,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    conversation_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> Tuple[List[Ticket], Optional[str]]:
+    """Return a page of tickets, newest first."""
+    query = session.query(Ticket)
+    if status:
+        query = query.filter(Ticket.status == status)
+    if category:
+        query = query.filter(Ticket.category == category)
+    if conversation_id is not None:
+        query = query.filter(Ticket.conversation_id == conversation_id)
+    if created_from:
+        query = query.filter(Ticket.created_ts >= created_from)
+    if created_to:
+        query = query.filter(Ticket.created_ts < created_to)
+    return keyset_page(query, Ticket.created_ts, Ticket.id, cursor, limit)
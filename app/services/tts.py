@@ -1,23 +1,97 @@
+import asyncio
 import os
-from typing import Optional
+import re
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, List, Optional, Tuple
 
 from app.config import get_default_locale
+from app.services.instrumentation import provider_call
+from app.services.resilience import call_timeout
 
+import httpx
 import requests
+from prometheus_client import Histogram
+
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+TTS_FIRST_BYTE_SECONDS = Histogram(
+    "voice_agent_tts_first_byte_seconds",
+    "Time from a streaming synthesis request to its first audio chunk",
+    ["provider", "mode"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0),
+)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?\u2026\u3002\uff01\uff1f])[\"')\]]*\s+")
+_CLAUSE_END = re.compile(r"(?<=[,;:\u3001])\s+")
+_END = object()
+
+
+def split_sentences(text: str, min_chars: int = 20, max_chars: int = 300) -> List[str]:
+    """Split ``text`` into segments at sentence boundaries for pipelined synthesis."""
+    segments: List[str] = []
+    current = ""
+    for sentence in _SENTENCE_END.split(text.strip()):
+        for piece in _split_long(sentence.strip(), max_chars):
+            current = f"{current} {piece}" if current else piece
+            if len(current) >= min_chars:
+                segments.append(current)
+                current = ""
+    if current:
+        if segments and len(segments[-1]) + len(current) < max_chars:
+            segments[-1] = f"{segments[-1]} {current}"
+        else:
+            segments.append(current)
+    return segments
+
+
+def _split_long(sentence: str, max_chars: int) -> List[str]:
+    if len(sentence) <= max_chars:
+        return [sentence] if sentence else []
+    pieces: List[str] = []
+    current = ""
+    for clause in _CLAUSE_END.split(sentence):
+        while len(clause) > max_chars:
+            cut = clause.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            clause, rest = clause[:cut].strip(), clause[cut:].strip()
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(clause)
+            clause = rest
+        if current and len(current) + len(clause) + 1 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {clause}" if current else clause
+    if current:
+        pieces.append(current)
+    return pieces
 
 
 class TTSClient:
     """Text-to-speech client supporting ElevenLabs and Twilio, with optional locale."""
 
-    def __init__(self, provider: Optional[str] = None, locale: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        provider: Optional[str] = None,
+        locale: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        voice_id: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> None:
         self.provider = (provider or os.getenv("TTS_PROVIDER", "elevenlabs")).lower()
         self.locale = locale or os.getenv("DEFAULT_LOCALE") or get_default_locale()
+        self._session = session or requests
+        self._timeout = float(os.getenv("TTS_TIMEOUT", "30"))
+        self._http_client = http_client
         if self.provider == "elevenlabs":
             self._api_key = os.getenv("ELEVEN_API_KEY")
             if not self._api_key:
                 raise ValueError("ELEVEN_API_KEY not set")
-            self._voice_id = os.getenv("ELEVEN_VOICE_ID", "default")
-            self._model_id = os.getenv("ELEVEN_MODEL_ID", "eleven_multilingual_v2")
+            self._voice_id = voice_id or os.getenv("ELEVEN_VOICE_ID", "default")
+            self._model_id = model or os.getenv("ELEVEN_MODEL_ID", "eleven_multilingual_v2")
         elif self.provider == "twilio":
             try:
                 from twilio.twiml.voice_response import VoiceResponse
@@ -28,15 +102,26 @@ class TTSClient:
         else:
             raise ValueError(f"Unsupported TTS provider: {self.provider}")
 
+    def cache_identity(self) -> Tuple[str, str, str, str]:
+        """Return the (provider, voice, model, locale) tuple that determines the audio."""
+        if self.provider == "elevenlabs":
+            return (self.provider, self._voice_id, self._model_id, self.locale)
+        return (self.provider, self._voice, "", self.locale)
+
     def synthesize(self, text: str) -> bytes:
         """Generate speech audio for ``text``. Returns bytes or TwiML XML."""
         if self.provider == "elevenlabs":
             url = f"https://api.elevenlabs.io/v1/text-to-speech/{self._voice_id}"
             headers = {"xi-api-key": self._api_key}
             payload = {"text": text, "model_id": self._model_id}
-            response = requests.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            return response.content
+            with provider_call("tts", self.provider, "synthesize", chars=len(text)) as call:
+                call.sent(len(text.encode()))
+                response = self._session.post(
+                    url, json=payload, headers=headers, timeout=call_timeout(self._timeout)
+                )
+                response.raise_for_status()
+                call.received(len(response.content))
+                return response.content
         elif self.provider == "twilio":
             vr = self._VoiceResponse()
             # include locale to select appropriate language voice
@@ -44,3 +129,114 @@ class TTSClient:
             return str(vr).encode()
         raise RuntimeError("Unhandled TTS provider")
 
+    async def stream(
+        self,
+        text: str,
+        http_client: httpx.AsyncClient | None = None,
+        output_format: Optional[str] = None,
+        previous_text: Optional[str] = None,
+        next_text: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """Yield synthesized audio for ``text`` as it arrives from the provider."""
+        if self.provider == "twilio":
+            yield self.synthesize(text)
+            return
+        if self.provider != "elevenlabs":
+            raise RuntimeError("Unhandled TTS provider")
+        url = f"https://api.elevenlabs.io/v1/text-to-speech/{self._voice_id}/stream"
+        if output_format:
+            url = f"{url}?output_format={output_format}"
+        headers = {"xi-api-key": self._api_key}
+        payload = {"text": text, "model_id": self._model_id}
+        if previous_text:
+            payload["previous_text"] = previous_text
+        if next_text:
+            payload["next_text"] = next_text
+        owned = http_client is None and self._http_client is None
+        client = http_client or self._http_client or httpx.AsyncClient(timeout=HTTP_TIMEOUT)
+        try:
+            with provider_call("tts", self.provider, "stream", chars=len(text)) as call:
+                call.sent(len(text.encode()))
+                async with client.stream("POST", url, json=payload, headers=headers) as response:
+                    response.raise_for_status()
+                    async for chunk in call.count_received(response.aiter_bytes()):
+                        yield chunk
+        finally:
+            if owned:
+                await client.aclose()
+
+    async def stream_sentences(
+        self,
+        text: str,
+        depth: int | None = None,
+        http_client: httpx.AsyncClient | None = None,
+        output_format: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """Yield audio for ``text`` in order, synthesizing up to ``depth`` sentences ahead."""
+        depth = max(1, depth or int(os.getenv("TTS_PIPELINE_DEPTH", "3")))
+        segments = split_sentences(text)
+        start = time.perf_counter()
+        first = True
+        if self.provider != "elevenlabs" or len(segments) <= 1:
+            async for chunk in self.stream(text, http_client, output_format):
+                if first:
+                    first = False
+                    TTS_FIRST_BYTE_SECONDS.labels(self.provider, "single").observe(time.perf_counter() - start)
+                yield chunk
+            return
+
+        owned = http_client is None and self._http_client is None
+        client = http_client or self._http_client or httpx.AsyncClient(timeout=HTTP_TIMEOUT)
+        pending: Deque[Tuple[asyncio.Task, asyncio.Queue]] = deque()
+
+        def launch(i: int) -> None:
+            queue: asyncio.Queue = asyncio.Queue()
+            previous = segments[i - 1] if i else None
+            following = segments[i + 1] if i + 1 < len(segments) else None
+            task = asyncio.create_task(self._fill(queue, segments[i], client, output_format, previous, following))
+            pending.append((task, queue))
+
+        launched = 0
+        try:
+            while launched < min(depth, len(segments)):
+                launch(launched)
+                launched += 1
+            while pending:
+                _, queue = pending[0]
+                while True:
+                    item = await queue.get()
+                    if item is _END:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    if first:
+                        first = False
+                        TTS_FIRST_BYTE_SECONDS.labels(self.provider, "pipelined").observe(time.perf_counter() - start)
+                    yield item
+                pending.popleft()
+                if launched < len(segments):
+                    launch(launched)
+                    launched += 1
+        finally:
+            for task, _ in pending:
+                task.cancel()
+            await asyncio.gather(*(task for task, _ in pending), return_exceptions=True)
+            if owned:
+                await client.aclose()
+
+    async def _fill(
+        self,
+        queue: asyncio.Queue,
+        text: str,
+        client: httpx.AsyncClient,
+        output_format: Optional[str],
+        previous_text: Optional[str],
+        next_text: Optional[str],
+    ) -> None:
+        try:
+            async for chunk in self.stream(text, client, output_format, previous_text, next_text):
+                queue.put_nowait(chunk)
+        except Exception as e:
+            queue.put_nowait(e)
+        else:
+            queue.put_nowait(_END)
@@ -0,0 +1,214 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+from app.logging_config import logger
+from app.services.executor import run_blocking
+from app.services.tts import TTSClient
+
+TTS_CACHE_REQUESTS = Counter(
+    "voice_agent_tts_cache_requests_total", "TTS cache lookups by result", ["result"]
+)
+TTS_CACHE_EVICTIONS = Counter(
+    "voice_agent_tts_cache_evictions_total", "Entries evicted from the TTS cache", ["tier"]
+)
+TTS_CACHE_BYTES = Gauge("voice_agent_tts_cache_bytes", "Bytes held by the TTS cache", ["tier"])
+
+
+def cache_key(provider: str, voice_id: str, model_id: str, locale: str, text: str) -> str:
+    """Return the content address of a synthesized prompt."""
+    text_hash = hashlib.sha256(text.encode()).hexdigest()
+    parts = "\x1f".join([provider, voice_id or "", model_id or "", locale or "", text_hash])
+    return hashlib.sha256(parts.encode()).hexdigest()
+
+
+class DiskTier:
+    """Directory of cached audio files that survives restarts, evicted LRU by mtime."""
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.bytes = sum(p.stat().st_size for p in self.directory.glob("*/*.audio"))
+        self.evictions = 0
+        TTS_CACHE_BYTES.labels("disk").set(self.bytes)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.audio"
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return data
+
+    def put(self, key: str, audio: bytes) -> None:
+        path = self._path(key)
+        if path.exists():
+            return
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(audio)
+        os.replace(tmp, path)
+        self.bytes += len(audio)
+        if self.bytes > self.max_bytes:
+            self._evict()
+        TTS_CACHE_BYTES.labels("disk").set(self.bytes)
+
+    def _evict(self) -> None:
+        files = sorted(
+            (p.stat().st_mtime, p.stat().st_size, p) for p in self.directory.glob("*/*.audio")
+        )
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in files:
+            if self.bytes <= target:
+                break
+            path.unlink(missing_ok=True)
+            self.bytes -= size
+            self.evictions += 1
+            TTS_CACHE_EVICTIONS.labels("disk").inc()
+
+
+class TTSCache:
+    """Content-addressed cache for synthesized prompt audio, coalescing concurrent misses."""
+
+    def __init__(
+        self,
+        max_bytes: int | None = None,
+        disk_dir: str | None = None,
+        disk_max_bytes: int | None = None,
+    ) -> None:
+        self.max_bytes = max_bytes or int(os.getenv("TTS_CACHE_MEMORY_BYTES", str(64 * 2**20)))
+        disk_dir = disk_dir or os.getenv("TTS_CACHE_DIR")
+        disk_max = disk_max_bytes or int(os.getenv("TTS_CACHE_DISK_BYTES", str(2 * 2**30)))
+        self.disk = DiskTier(disk_dir, disk_max) if disk_dir else None
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def key_for(self, tts: TTSClient, text: str) -> str:
+        return cache_key(*tts.cache_identity(), text)
+
+    def get(self, key: str) -> Optional[bytes]:
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+        return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.max_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._memory[key] = audio
+        self._bytes += len(audio)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+            TTS_CACHE_EVICTIONS.labels("memory").inc()
+        TTS_CACHE_BYTES.labels("memory").set(self._bytes)
+
+    async def get_or_synthesize(self, tts: TTSClient, text: str) -> bytes:
+        """Return cached audio for ``text`` or synthesize it exactly once."""
+        return await self.get_or_render(self.key_for(tts, text), lambda: run_blocking("tts", tts.synthesize, text))
+
+    async def get_or_render(self, key: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Return cached audio for ``key``, rendering once in a cache-owned task on a miss."""
+
+        async def keyed() -> Tuple[str, bytes]:
+            return key, await render()
+
+        return await self.get_or_render_as(key, keyed)
+
+    async def get_or_render_as(self, key: str, render: Callable[[], Awaitable[Tuple[str, bytes]]]) -> bytes:
+        """Like :meth:`get_or_render`, but ``render`` names the key its audio belongs to.
+
+        A routed render that fails over returns another provider's voice; it is
+        stored under that provider's key, never under ``key``.
+        """
+        audio = self.get(key)
+        if audio is not None:
+            self.hits += 1
+            TTS_CACHE_REQUESTS.labels("memory_hit").inc()
+            return audio
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            TTS_CACHE_REQUESTS.labels("coalesced").inc()
+        else:
+            task = asyncio.ensure_future(self._load_or_render(key, render))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # avoid "exception never retrieved" when every waiter left
+
+    async def _load_or_render(self, key: str, render: Callable[[], Awaitable[Tuple[str, bytes]]]) -> bytes:
+        if self.disk is not None:
+            audio = await run_blocking("tts", self.disk.get, key)
+            if audio is not None:
+                self.disk_hits += 1
+                TTS_CACHE_REQUESTS.labels("disk_hit").inc()
+                self.put(key, audio)
+                return audio
+        self.misses += 1
+        TTS_CACHE_REQUESTS.labels("miss").inc()
+        served, audio = await render()
+        self.put(served, audio)
+        if self.disk is not None:
+            try:
+                await run_blocking("tts", self.disk.put, served, audio)
+            except OSError as e:
+                logger.warning(f"TTS disk cache write failed: {e}")
+        return audio
+
+    async def warm(self, tts: TTSClient, prompts: Iterable[str], concurrency: int = 4) -> Dict[str, int]:
+        """Pre-render ``prompts`` so the first dial of a campaign is a cache hit."""
+        sem = asyncio.Semaphore(concurrency)
+        unique = list(dict.fromkeys(prompts))
+        cached = sum(1 for text in unique if self.get(self.key_for(tts, text)) is not None)
+
+        async def render(text: str) -> None:
+            async with sem:
+                await self.get_or_synthesize(tts, text)
+
+        await asyncio.gather(*(render(text) for text in unique))
+        return {"prompts": len(unique), "already_cached": cached, "rendered": len(unique) - cached}
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.disk_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._memory),
+            "memory_bytes": self._bytes,
+            "memory_max_bytes": self.max_bytes,
+            "disk_bytes": self.disk.bytes if self.disk else 0,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_ratio": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "disk_evictions": self.disk.evictions if self.disk else 0,
+        }
@@ -0,0 +1,134 @@
+import asyncio
+import os
+import time
+from typing import Any, Callable, List, Optional, Set, Tuple, TypeVar
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy.orm import Session
+
+from app.logging_config import logger
+from app.models.db import engine, session_scope
+from app.services.executor import run_blocking
+from app.services.instrumentation import provider_call
+
+T = TypeVar("T")
+Work = Callable[[Session], Any]
+
+DB_COMMITS = Counter(
+    "voice_agent_db_commits_total", "Unit-of-work commits by write path", ["mode"]
+)
+DB_WRITE_BATCH_SIZE = Histogram(
+    "voice_agent_db_write_batch_size",
+    "Units of work grouped into one write-behind commit",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+
+def run_unit(work: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``work(session, *args)`` in its own transaction and commit once."""
+    with provider_call("db", engine.dialect.name, "unit_of_work"), session_scope() as session:
+        result = work(session, *args, **kwargs)
+        session.commit()
+    DB_COMMITS.labels("direct").inc()
+    return result
+
+
+def _commit_batch(items: List[Work]) -> List[Tuple[bool, Any]]:
+    """Apply every unit in one transaction, isolating failures if it aborts."""
+    try:
+        instrumented = provider_call("db", engine.dialect.name, "write_behind_batch", batch=len(items))
+        with instrumented, session_scope() as session:
+            results = [work(session) for work in items]
+            session.commit()
+        DB_COMMITS.labels("batched").inc()
+        return [(True, r) for r in results]
+    except Exception as e:
+        if len(items) == 1:
+            return [(False, e)]
+        logger.warning(f"Write-behind batch of {len(items)} failed ({e}); retrying units one by one")
+    outcomes: List[Tuple[bool, Any]] = []
+    for work in items:
+        try:
+            outcomes.append((True, run_unit(work)))
+        except Exception as e:
+            outcomes.append((False, e))
+    return outcomes
+
+
+class WriteBehindBuffer:
+    """Groups units of work from concurrent calls into shared commits."""
+
+    def __init__(self, window: float | None = None, max_batch: int | None = None) -> None:
+        self.window = window if window is not None else float(os.getenv("DB_WRITE_BEHIND_WINDOW_MS", "5")) / 1000
+        self.max_batch = max_batch or int(os.getenv("DB_WRITE_BEHIND_MAX_BATCH", "64"))
+        self._pending: List[Tuple[Work, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushing: Set[asyncio.Task] = set()
+
+    async def submit(self, work: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((lambda session: work(session, *args, **kwargs), future))
+        if len(self._pending) >= self.max_batch:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush_now)
+        return await future
+
+    def _flush_now(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._flush(batch))
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+
+    async def _flush(self, batch: List[Tuple[Work, asyncio.Future]]) -> None:
+        DB_WRITE_BATCH_SIZE.observe(len(batch))
+        try:
+            outcomes = await run_blocking("db", _commit_batch, [work for work, _ in batch])
+        except Exception as e:
+            outcomes = [(False, e)] * len(batch)
+        for (_, future), (ok, value) in zip(batch, outcomes):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    async def drain(self) -> None:
+        """Commit everything still buffered. Called on application shutdown."""
+        self._flush_now()
+        if self._flushing:
+            await asyncio.gather(*self._flushing, return_exceptions=True)
+
+
+_buffer: Optional[WriteBehindBuffer] = None
+
+
+def write_behind_enabled() -> bool:
+    return os.getenv("DB_WRITE_BEHIND", "0").lower() not in ("0", "false", "no", "")
+
+
+def get_write_buffer() -> Optional[WriteBehindBuffer]:
+    """Return the process-wide write-behind buffer, or ``None`` if disabled."""
+    global _buffer
+    if _buffer is None and write_behind_enabled():
+        _buffer = WriteBehindBuffer()
+    return _buffer
+
+
+async def commit_unit(work: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Persist one unit of work, through the write-behind buffer when enabled."""
+    buffer = get_write_buffer()
+    if buffer is not None:
+        return await buffer.submit(work, *args, **kwargs)
+    return await run_blocking("db", run_unit, work, *args, **kwargs)
+
+
+async def drain_write_buffer() -> None:
+    if _buffer is not None:
+        await _buffer.drain()
@@ -0,0 +1,142 @@
+import asyncio
+import importlib
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from prometheus_client import Gauge
+
+from app.logging_config import logger
+from app.models.db import DbPoolSettings, engine, warm_async_pool, warm_pool
+from app.services.executor import run_blocking
+from app.services.resilience import candidates_from_env
+
+APP_READY = Gauge("voice_agent_ready", "1 once startup warm-up has finished and the app can take traffic")
+WARMUP_SECONDS = Gauge("voice_agent_warmup_seconds", "Time spent in each startup warm-up step", ["step"])
+
+# Base URLs to open keep-alive connections to, per configured provider.
+_PROVIDER_HOSTS = {
+    "openai": lambda: os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1"),
+    "deepgram": lambda: os.getenv("DEEPGRAM_API_URL", "https://api.deepgram.com/v1/listen"),
+    "elevenlabs": lambda: "https://api.elevenlabs.io/v1",
+}
+
+_TRUE = ("1", "true", "yes")
+
+
+def migrate_on_startup() -> bool:
+    """Whether the app applies pending migrations itself (``DB_MIGRATE_ON_STARTUP``)."""
+    return os.getenv("DB_MIGRATE_ON_STARTUP", "0").lower() in _TRUE
+
+
+class Warmup:
+    """Check the schema, warm DB and provider connections, and report readiness."""
+
+    REQUIRED = ("schema", "database")
+
+    def __init__(self, providers: Any) -> None:
+        self.providers = providers
+        self.checks: Dict[str, Dict[str, Any]] = {}
+        self.done = False
+        self.started = time.perf_counter()
+        self.elapsed: Optional[float] = None
+        self.db_connections = int(os.getenv("DB_POOL_WARM", str(min(4, DbPoolSettings().pool_size))))
+        self.warm_http = os.getenv("READY_WARM_HTTP", "1").lower() in _TRUE
+        self.http_timeout = float(os.getenv("READY_WARM_HTTP_TIMEOUT", "3"))
+        self._task: Optional[asyncio.Task] = None
+        APP_READY.set(0)
+
+    @property
+    def ready(self) -> bool:
+        return self.done and all(self.checks.get(step, {}).get("ok") for step in self.REQUIRED)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else "warming" if not self.done else "not_ready",
+            "seconds": round(self.elapsed, 3) if self.elapsed is not None else None,
+            "checks": self.checks,
+        }
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self.run(), name="warmup")
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def run(self) -> None:
+        await self._step("schema", self._schema)
+        await self._step("database", self._database)
+        await self._step("providers", self._providers)
+        if self.warm_http:
+            await self._step("http", self._http)
+        self.done = True
+        self.elapsed = time.perf_counter() - self.started
+        APP_READY.set(1 if self.ready else 0)
+        level = "info" if self.ready else "warning"
+        getattr(logger, level)(f"Warm-up finished in {self.elapsed:.2f}s ({self.status()['status']})")
+
+    async def _step(self, name: str, func: Callable[[], Awaitable[Any]]) -> None:
+        start = time.perf_counter()
+        try:
+            detail = await func()
+            ok = True
+        except Exception as e:
+            detail = f"{type(e).__name__}: {e}"
+            ok = False
+            logger.warning(f"Warm-up step {name} failed: {detail}")
+        seconds = time.perf_counter() - start
+        WARMUP_SECONDS.labels(name).set(seconds)
+        self.checks[name] = {"ok": ok, "seconds": round(seconds, 3), "detail": detail}
+
+    async def _schema(self) -> str:
+        from app.models.migrations import pending_migrations
+
+        pending = await run_blocking("db", pending_migrations, engine)
+        if pending:
+            raise RuntimeError(f"pending migrations {', '.join(pending)}; run scripts/manage.py migrate")
+        return "up to date"
+
+    async def _database(self) -> Dict[str, int]:
+        sync = await run_blocking("db", warm_pool, self.db_connections)
+        return {"connections": sync, "async_connections": await warm_async_pool(self.db_connections)}
+
+    async def _providers(self) -> Dict[str, str]:
+        loaded: Dict[str, str] = {}
+
+        async def load(name: str, pool: str, func: Callable[[], Any]) -> None:
+            try:
+                await run_blocking(pool, func)
+                loaded[name] = "ok"
+            except Exception as e:
+                loaded[name] = f"{type(e).__name__}: {e}"
+
+        jobs = [load(f"stt/{p}", "stt", lambda p=p: self.providers.stt(None, p)) for p in candidates_from_env("stt")]
+        jobs += [load(f"tts/{p}", "tts", lambda p=p: self.providers.tts(None, p)) for p in candidates_from_env("tts")]
+        if os.getenv("TWILIO_ACCOUNT_SID"):
+            jobs.append(load("telephony/twilio", "telephony", self.providers.telephony))
+        jobs.append(load("intent", "intent", lambda: self.providers.intent().preload()))
+        if os.getenv("AUDIO_PREPROCESS", "1").lower() not in ("0", "false", "no"):
+            jobs.append(load("audio", "audio", lambda: importlib.import_module("app.services.audio_prep")))
+        await asyncio.gather(*jobs)
+        return loaded
+
+    async def _http(self) -> Dict[str, str]:
+        urls: List[str] = []
+        for service in ("stt", "tts"):
+            for name in candidates_from_env(service):
+                url = _PROVIDER_HOSTS.get(name, lambda: None)()
+                if url and url not in urls:
+                    urls.append(url)
+        results: Dict[str, str] = {}
+
+        async def connect(url: str) -> None:
+            try:
+                response = await self.providers.http.request("HEAD", url, timeout=self.http_timeout)
+                results[url] = str(response.status_code)
+            except Exception as e:
+                results[url] = f"{type(e).__name__}: {e}"
+
+        await asyncio.gather(*(connect(url) for url in urls))
+        return results
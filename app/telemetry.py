@@ -0,0 +1,84 @@
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Sequence
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+    SpanExportResult,
+)
+
+from app.logging_config import logger
+
+_provider: Optional[TracerProvider] = None
+_lock = threading.Lock()
+
+
+class FileSpanExporter(SpanExporter):
+    """Append finished spans to a file as JSON lines, rotated past ``max_bytes``."""
+
+    def __init__(self, path: str, max_bytes: int | None = None) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes or int(os.getenv("OTEL_TRACES_FILE_MAX_BYTES", str(100 * 1024 * 1024)))
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        try:
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if self.path.exists() and self.path.stat().st_size > self.max_bytes:
+                    os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+                with open(self.path, "a") as fh:
+                    fh.write(lines)
+        except OSError as e:
+            logger.warning(f"Could not write spans to {self.path}: {e}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def exporter_from_env() -> Optional[SpanExporter]:
+    """Build the span exporter named by ``OTEL_TRACES_EXPORTER`` (``file``, ``otlp``, ``console`` or ``none``)."""
+    kind = os.getenv("OTEL_TRACES_EXPORTER", "file").lower()
+    if kind == "none":
+        return None
+    if kind == "console":
+        return ConsoleSpanExporter()
+    if kind == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning("OTLP exporter not installed; writing spans to OTEL_TRACES_FILE instead")
+        else:
+            return OTLPSpanExporter()
+    return FileSpanExporter(os.getenv("OTEL_TRACES_FILE", "traces.jsonl"))
+
+
+def configure_tracing() -> TracerProvider:
+    """Install the process-wide tracer provider once, exporting in batches."""
+    global _provider
+    with _lock:
+        if _provider is None:
+            provider = TracerProvider(
+                resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", "voice-agent")})
+            )
+            exporter = exporter_from_env()
+            if exporter is not None:
+                provider.add_span_processor(BatchSpanProcessor(exporter))
+            trace.set_tracer_provider(provider)
+            _provider = provider
+    return _provider
+
+
+def flush_tracing(timeout_millis: int = 5000) -> None:
+    """Export spans still queued in the batch processor, e.g. on shutdown."""
+    if _provider is not None:
+        _provider.force_flush(timeout_millis)
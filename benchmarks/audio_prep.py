@@ -0,0 +1,96 @@
+"""Upload size and STT latency with and without audio preprocessing.
+
+    python -m benchmarks.audio_prep --seconds 60 600 1800 --rate 44100 --channels 2
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+import httpx
+import numpy as np
+
+from app.services.audio import AudioSettings
+from app.services.audio_prep import encode_wav, prepare_for_stt
+from app.services.stt import STTClient, transcribe_chunks
+from benchmarks.fakes import FakeProviderTransport
+
+
+def make_recording(seconds: float, rate: int, channels: int, silence: float, seed: int = 0) -> bytes:
+    """Build a 16-bit PCM WAV of tone bursts (0.2-2 s) and pauses (0.1-1 s)."""
+    rng = np.random.default_rng(seed)
+    parts = [np.zeros(int(rate * silence), np.float32)]
+    total = int(rate * seconds)
+    filled = 0
+    while filled < total:
+        n = int(rate * rng.uniform(0.2, 2.0))
+        t = np.arange(n) / rate
+        burst = 0.3 * np.sin(2 * np.pi * rng.uniform(120, 300) * t) + 0.03 * rng.standard_normal(n)
+        gap = np.zeros(int(rate * rng.uniform(0.1, 1.0)), np.float32)
+        parts += [burst.astype(np.float32), gap]
+        filled += n + len(gap)
+    parts.append(np.zeros(int(rate * silence), np.float32))
+    mono = np.concatenate(parts)
+    samples = np.repeat(mono[:, None], channels, axis=1).ravel()
+    # encode_wav writes mono; patch the header for the interleaved channels.
+    wav = bytearray(encode_wav(samples, rate))
+    wav[22:24] = channels.to_bytes(2, "little")
+    wav[28:32] = (rate * 2 * channels).to_bytes(4, "little")
+    wav[32:34] = (2 * channels).to_bytes(2, "little")
+    return bytes(wav)
+
+
+async def measure(stt: STTClient, transport: FakeProviderTransport, http: httpx.AsyncClient, run) -> tuple:
+    before = transport.bytes_received
+    start = time.perf_counter()
+    await run()
+    return transport.bytes_received - before, time.perf_counter() - start
+
+
+async def main(args) -> None:
+    transport = FakeProviderTransport(latency=args.latency, per_mb=args.per_mb)
+    stt = STTClient(provider="openai", locale="en-US")
+    async with httpx.AsyncClient(transport=transport) as http:
+        print(
+            f"{'seconds':>8} {'mode':>9} {'uploaded MB':>12} {'prep s':>8} {'stt s':>8} {'total s':>8} {'chunks':>7}"
+        )
+        for seconds in args.seconds:
+            wav = make_recording(seconds, args.rate, args.channels, args.silence)
+            size, elapsed = await measure(
+                stt, transport, http, lambda: stt.transcribe_stream(wav, "audio/wav", http_client=http)
+            )
+            print(f"{seconds:>8} {'raw':>9} {size / 2**20:>12.2f} {0:>8.2f} {elapsed:>8.2f} {elapsed:>8.2f} {1:>7}")
+            for encoding in ("pcm16", "mulaw"):
+                os.environ["AUDIO_ENCODING"] = encoding
+                settings = AudioSettings()
+                settings.chunk_seconds = args.chunk_seconds
+                start = time.perf_counter()
+                prepared = prepare_for_stt(wav, settings)
+                prep = time.perf_counter() - start
+                size, elapsed = await measure(
+                    stt,
+                    transport,
+                    http,
+                    lambda: transcribe_chunks(
+                        lambda chunk: stt.transcribe_stream(chunk, prepared.mimetype, http_client=http),
+                        prepared.chunks,
+                    ),
+                )
+                print(
+                    f"{seconds:>8} {encoding:>9} {size / 2**20:>12.2f} {prep:>8.2f} {elapsed:>8.2f} "
+                    f"{prep + elapsed:>8.2f} {len(prepared.chunks):>7}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, nargs="+", default=[60, 600, 1800], help="Recording lengths")
+    parser.add_argument("--rate", type=int, default=44100, help="Recording sample rate")
+    parser.add_argument("--channels", type=int, default=2, help="Recording channels")
+    parser.add_argument("--silence", type=float, default=5, help="Silence at each end in seconds")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake STT base latency in seconds")
+    parser.add_argument("--per-mb", type=float, default=0.8, help="Fake STT upload time per MB in seconds")
+    parser.add_argument("--chunk-seconds", type=float, default=300, help="Chunk length for long recordings")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,106 @@
+"""Campaign dialer benchmark against a fake Twilio API.
+
+    python -m benchmarks.campaign --contacts 2000 --cps 200 --concurrency 32
+"""
+import argparse
+import asyncio
+import csv
+import os
+import tempfile
+import time
+from collections import Counter
+
+os.environ.setdefault("TWILIO_ACCOUNT_SID", "AC" + "0" * 32)
+os.environ.setdefault("TWILIO_AUTH_TOKEN", "bench")
+os.environ.setdefault("TWILIO_CALLER_ID", "+15550000000")
+os.environ.setdefault("TELEPHONY_MAX_WORKERS", "256")
+
+from twilio.rest import Client
+
+from app.services.campaign import Campaign
+from app.services.executor import shutdown_executors
+from app.services.resilience import ProviderRouter
+from app.services.telephony import TelephonyService
+from benchmarks.fakes import FakeTwilioHttpClient
+
+
+def write_contacts(path: str, n: int) -> None:
+    with open(path, "w", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["phone", "first_name", "account"])
+        for i in range(n):
+            writer.writerow([f"+1555{i:07d}", f"Customer{i}", f"A-{i:06d}"])
+
+
+def peak_per_second(starts: list) -> int:
+    if not starts:
+        return 0
+    origin = starts[0]
+    return max(Counter(int(t - origin) for t in starts).values())
+
+
+async def main(args) -> None:
+    path = os.path.join(tempfile.mkdtemp(prefix="voice-bench-"), "contacts.csv")
+    write_contacts(path, args.contacts)
+    fake = FakeTwilioHttpClient(args.latency, args.error_rate, args.throttle_rate)
+    telephony = TelephonyService(
+        client=Client(os.environ["TWILIO_ACCOUNT_SID"], os.environ["TWILIO_AUTH_TOKEN"], http_client=fake)
+    )
+    caller_ids = [f"+1555999{i:04d}" for i in range(args.callers)]
+    campaign = Campaign(
+        "bench",
+        path,
+        "csv",
+        args.contacts,
+        prompt="Hi {first_name}, this is a reminder about account {account}.",
+        caller_ids=caller_ids,
+        cps=args.cps,
+        max_concurrency=args.concurrency,
+        per_caller_concurrency=args.per_caller,
+        backoff=args.backoff,
+        record=False,
+    )
+
+    start = time.perf_counter()
+    campaign.start(telephony, ProviderRouter("telephony", ["twilio"]))
+    paused = False
+    while not campaign.finished:
+        await asyncio.sleep(0.25)
+        p = campaign.progress()
+        if not paused and p["percent"] >= 50 and args.pause:
+            paused = True
+            campaign.pause()
+            await asyncio.sleep(0.2)  # let in-flight calls finish
+            before = len(fake.started)
+            await asyncio.sleep(args.pause)
+            print(f"paused {args.pause:.1f}s: {len(fake.started) - before} calls started while paused")
+            campaign.resume()
+        print(f"  {p['status']:>9} {p['percent']:>5.1f}% {p['calls_per_second']:>7.1f} calls/s eta {p['eta_seconds']}s")
+    await campaign.wait()
+    elapsed = time.perf_counter() - start
+
+    p = campaign.progress()
+    print(f"\ncontacts     {args.contacts}")
+    print(f"elapsed      {elapsed:.2f}s (active {p['elapsed_seconds']}s)")
+    print(f"succeeded    {p['succeeded']}  failed {p['failed']}  retried {p['retried']}")
+    print(f"throughput   {p['calls_per_second']:.1f} calls/s (limit {args.cps})")
+    print(f"peak cps     {peak_per_second(fake.started)}")
+    print(f"peak active  {fake.peak} (limit {args.concurrency})")
+    print(f"per caller   max {max(fake.peak_per_caller.values())} (limit {args.per_caller})")
+    print(f"responses    {dict(fake.statuses)}")
+    shutdown_executors()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--contacts", type=int, default=2000, help="Rows in the contact list")
+    parser.add_argument("--cps", type=float, default=200, help="Calls-per-second limit")
+    parser.add_argument("--concurrency", type=int, default=32, help="Global concurrent call cap")
+    parser.add_argument("--callers", type=int, default=4, help="Number of caller IDs")
+    parser.add_argument("--per-caller", type=int, default=6, help="Concurrent call cap per caller ID")
+    parser.add_argument("--latency", type=float, default=0.1, help="Fake Twilio response time in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Fraction of 503 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.05, help="Fraction of 429 responses")
+    parser.add_argument("--backoff", type=float, default=0.05, help="Base retry backoff in seconds")
+    parser.add_argument("--pause", type=float, default=1.0, help="Seconds to pause halfway (0 to skip)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,84 @@
+"""Load test for the inbound call pipeline.
+
+    python -m benchmarks.concurrency --latency 0.2 --requests 64
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='voice-bench-')}/bench.db"
+)
+os.environ.setdefault("DB_MIGRATE_ON_STARTUP", "1")
+os.environ.setdefault("READY_WARM_HTTP", "0")
+os.environ.setdefault("JOB_WORKERS", "16")
+os.environ.setdefault("JOB_POLL_INTERVAL", "0.01")
+os.environ.setdefault("STT_PROVIDER", "openai")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+import httpx
+
+from app.main import create_app
+from app.services.registry import ProviderRegistry
+from benchmarks.fakes import FakeProviderTransport
+
+
+class _Latency:
+    seconds = 0.2
+
+
+class FakeIntentClassifier:
+    def classify(self, text: str) -> str:
+        time.sleep(_Latency.seconds / 2)
+        return "SCHEDULE_CALLBACK"
+
+
+class BenchProviders(ProviderRegistry):
+    def intent(self) -> FakeIntentClassifier:
+        return FakeIntentClassifier()
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, total: int) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            resp = await client.post(
+                "/call/inbound",
+                json={"phone": f"+1555{i:07d}", "recording_url": "http://fake/rec.wav?seconds=5"},
+            )
+            resp.raise_for_status()
+            job_id = resp.json()["job_id"]
+            while True:
+                job = (await client.get(f"/jobs/{job_id}")).json()
+                if job["status"] in ("SUCCEEDED", "FAILED"):
+                    return
+                await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+async def main(latency: float, total: int, levels: list[int]) -> None:
+    _Latency.seconds = latency
+    providers = BenchProviders(transport=FakeProviderTransport(latency=latency))
+    app = create_app(providers=providers)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"{'concurrency':>12} {'req/s':>10}")
+            for level in levels:
+                rps = await run_level(client, level, total)
+                print(f"{level:>12} {rps:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake STT latency in seconds")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per concurrency level")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.requests, args.levels))
@@ -0,0 +1,111 @@
+"""Database write-path benchmark.
+
+    python -m benchmarks.db_writes --calls 2000 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='voice-bench-')}/bench.db"
+)
+
+from sqlalchemy import event
+
+from app.models.db import Conversation, engine, init_db, session_scope
+from app.services.conversation import close_conversation, record_call_outcome
+from app.services.executor import run_blocking, shutdown_executors
+from app.services.ticket import TicketService
+from app.services.unit_of_work import WriteBehindBuffer, run_unit
+
+
+class CommitCounter:
+    def __init__(self) -> None:
+        self.count = 0
+        event.listen(engine, "commit", self._on_commit)
+
+    def _on_commit(self, conn) -> None:
+        self.count += 1
+
+
+def seed_conversations(n: int) -> list[int]:
+    with session_scope() as session:
+        convs = [
+            Conversation(phone=f"+1555{i:07d}", direction="INBOUND", start_ts=datetime.utcnow())
+            for i in range(n)
+        ]
+        session.add_all(convs)
+        session.commit()
+        return [c.id for c in convs]
+
+
+def per_statement(conversation_id: int) -> None:
+    with session_scope() as session:
+        conv = session.get(Conversation, conversation_id)
+        close_conversation(session, conv, "please call me back tomorrow", "SCHEDULE_CALLBACK")
+        TicketService(session).create_ticket(conversation_id, "SCHEDULE_CALLBACK")
+
+
+async def run_mode(mode: str, ids: list[int], concurrency: int, counter: CommitCounter) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    buffer = WriteBehindBuffer() if mode == "write-behind" else None
+
+    async def one(conversation_id: int) -> None:
+        async with sem:
+            args = (conversation_id, "please call me back tomorrow", "SCHEDULE_CALLBACK")
+            if mode == "per-statement":
+                await run_blocking("db", per_statement, conversation_id)
+            elif buffer is not None:
+                await buffer.submit(record_call_outcome, *args)
+            else:
+                await run_blocking("db", run_unit, record_call_outcome, *args)
+
+    before = counter.count
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in ids))
+    elapsed = time.perf_counter() - start
+    commits = counter.count - before
+    return {"calls/s": len(ids) / elapsed, "commits": commits, "commits/s": commits / elapsed}
+
+
+def bench_tickets(ids: list[int], counter: CommitCounter) -> dict:
+    results = {}
+    for mode in ("one-by-one", "bulk"):
+        before = counter.count
+        start = time.perf_counter()
+        with session_scope() as session:
+            service = TicketService(session)
+            if mode == "bulk":
+                service.create_tickets_bulk((i, "OTHER") for i in ids)
+            else:
+                for i in ids:
+                    service.create_ticket(i, "OTHER")
+        elapsed = time.perf_counter() - start
+        results[mode] = {"tickets/s": len(ids) / elapsed, "commits": counter.count - before}
+    return results
+
+
+async def main(calls: int, concurrency: int) -> None:
+    init_db()
+    counter = CommitCounter()
+    print(f"{'mode':>14} {'calls/s':>10} {'commits':>8} {'commits/s':>10}")
+    for mode in ("per-statement", "unit-of-work", "write-behind"):
+        ids = seed_conversations(calls)
+        r = await run_mode(mode, ids, concurrency, counter)
+        print(f"{mode:>14} {r['calls/s']:>10.1f} {r['commits']:>8} {r['commits/s']:>10.1f}")
+
+    print(f"\n{'tickets':>14} {'tickets/s':>10} {'commits':>8}")
+    for mode, r in bench_tickets(seed_conversations(calls), counter).items():
+        print(f"{mode:>14} {r['tickets/s']:>10.1f} {r['commits']:>8}")
+    shutdown_executors()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1000, help="Calls persisted per mode")
+    parser.add_argument("--concurrency", type=int, default=32, help="Calls in flight at once")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.concurrency))
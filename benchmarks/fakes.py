@@ -0,0 +1,210 @@
+"""In-process stand-ins for recording storage, STT, TTS and Twilio."""
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import AsyncIterator, Dict, Sequence
+
+import httpx
+import requests
+from requests.adapters import BaseAdapter
+from twilio.http import HttpClient
+from twilio.http.response import Response
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 64 * 1024
+
+
+class _GeneratedAudio(httpx.AsyncByteStream):
+    def __init__(self, total: int) -> None:
+        self.total = total
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        remaining = self.total
+        block = b"\x00\x01" * (CHUNK_SIZE // 2)
+        while remaining > 0:
+            n = min(CHUNK_SIZE, remaining)
+            remaining -= n
+            yield block[:n]
+            await asyncio.sleep(0)
+
+
+class FakeProviderTransport(httpx.AsyncBaseTransport):
+    """Serve ``GET`` recordings and answer Whisper/Deepgram uploads."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        transcript: str = "please call me back tomorrow",
+        transcripts: Sequence[str] | None = None,
+        error_rate: float = 0.0,
+        seed: int = 3,
+        per_mb: float = 0.0,
+    ) -> None:
+        self.latency = latency
+        self.per_mb = per_mb
+        self.transcript = transcript
+        self.transcripts = list(transcripts or [transcript])
+        self.error_rate = error_rate
+        self.bytes_received = 0
+        self.uploads = 0
+        self._random = random.Random(seed)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            seconds = float(request.url.params.get("seconds", "10"))
+            total = int(seconds * SAMPLE_RATE * 2)
+            return httpx.Response(
+                200,
+                headers={"content-type": "audio/wav", "content-length": str(total)},
+                stream=_GeneratedAudio(total),
+            )
+        received = 0
+        async for chunk in request.stream:
+            received += len(chunk)
+        self.bytes_received += received
+        delay = self.latency + self.per_mb * received / 2**20
+        if delay:
+            await asyncio.sleep(delay)
+        if self._random.random() < self.error_rate:
+            return httpx.Response(503, json={"error": "overloaded"})
+        transcript = self.transcripts[self.uploads % len(self.transcripts)]
+        self.uploads += 1
+        if request.url.path.endswith("/listen"):
+            body = {"results": {"channels": [{"alternatives": [{"transcript": transcript}]}]}}
+        else:
+            body = {"text": transcript}
+        return httpx.Response(200, content=json.dumps(body).encode(), headers={"content-type": "application/json"})
+
+
+class _SynthesizedSpeech(httpx.AsyncByteStream):
+    def __init__(self, owner: "FakeTTSTransport", text: str, first_byte: float, chunks: int, interval: float) -> None:
+        self.owner = owner
+        self.text = text
+        self.first_byte = first_byte
+        self.chunks = chunks
+        self.interval = interval
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        self.owner.active += 1
+        self.owner.peak = max(self.owner.peak, self.owner.active)
+        try:
+            await asyncio.sleep(self.first_byte)
+            data = self.text.encode()
+            step = max(1, -(-len(data) // self.chunks))
+            for i in range(0, len(data), step):
+                if i:
+                    await asyncio.sleep(self.interval)
+                yield data[i:i + step]
+        finally:
+            self.owner.active -= 1
+
+
+class FakeTTSTransport(httpx.AsyncBaseTransport):
+    """Answer ElevenLabs ``/stream`` requests with the request text as "audio"."""
+
+    def __init__(self, base_latency: float = 0.15, per_char: float = 0.003, chunks: int = 4, interval: float = 0.01) -> None:
+        self.base_latency = base_latency
+        self.per_char = per_char
+        self.chunks = chunks
+        self.interval = interval
+        self.requests = 0
+        self.active = 0
+        self.peak = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(await request.aread())
+        text = body["text"]
+        self.requests += 1
+        first_byte = self.base_latency + self.per_char * len(text)
+        stream = _SynthesizedSpeech(self, text, first_byte, self.chunks, self.interval)
+        return httpx.Response(200, headers={"content-type": "audio/mpeg"}, stream=stream)
+
+
+class FakeElevenLabsAdapter(BaseAdapter):
+    """``requests`` adapter answering ElevenLabs text-to-speech POSTs."""
+
+    def __init__(self, latency: float = 0.2, error_rate: float = 0.0, bytes_per_char: int = 200, seed: int = 11) -> None:
+        super().__init__()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.bytes_per_char = bytes_per_char
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.requests += 1
+            roll = self._random.random()
+        time.sleep(self.latency)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        if roll < self.error_rate:
+            response.status_code = 503
+            response._content = b'{"detail": "overloaded"}'
+            response.headers["content-type"] = "application/json"
+        else:
+            text = json.loads(request.body)["text"]
+            response.status_code = 200
+            response._content = b"\x00" * (len(text) * self.bytes_per_char)
+            response.headers["content-type"] = "audio/mpeg"
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+class FakeTwilioHttpClient(HttpClient):
+    """Answer ``Calls.json`` POSTs like Twilio, from the calling thread."""
+
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0, throttle_rate: float = 0.0, seed: int = 7) -> None:
+        super().__init__(logging.getLogger("twilio.http_client"), is_async=False)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.statuses: Counter = Counter()
+        self.peak = 0
+        self.peak_per_caller: Dict[str, int] = {}
+        self.started: list = []
+        self._active = 0
+        self._active_per_caller: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def request(self, method, uri, params=None, data=None, headers=None, auth=None, timeout=None, allow_redirects=False):
+        caller = (data or {}).get("From", "")
+        with self._lock:
+            self._active += 1
+            self._active_per_caller[caller] += 1
+            self.peak = max(self.peak, self._active)
+            self.peak_per_caller[caller] = max(self.peak_per_caller.get(caller, 0), self._active_per_caller[caller])
+            self.started.append(time.monotonic())
+            roll = self._random.random()
+        try:
+            time.sleep(self.latency)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._active_per_caller[caller] -= 1
+
+        if roll < self.throttle_rate:
+            status, body = 429, {"code": 20429, "message": "Too Many Requests", "status": 429}
+        elif roll < self.throttle_rate + self.error_rate:
+            status, body = 503, {"code": 20503, "message": "Service Unavailable", "status": 503}
+        else:
+            status = 201
+            body = {
+                "sid": "CA" + uuid.uuid4().hex,
+                "to": (data or {}).get("To"),
+                "from": caller,
+                "status": "queued",
+            }
+        with self._lock:
+            self.statuses[status] += 1
+        return Response(status, json.dumps(body))
@@ -0,0 +1,429 @@
+"""End-to-end load benchmark with local stand-ins for every provider.
+
+    python -m benchmarks.load --levels 1 5 10 25 50 --requests 200
+    python -m benchmarks.load --compare benchmarks/results/<earlier>.json
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='voice-bench-')}/bench.db")
+os.environ.setdefault("DB_MIGRATE_ON_STARTUP", "1")
+os.environ.setdefault("READY_WARM_HTTP", "0")
+os.environ.setdefault("JOB_WORKERS", "32")
+os.environ.setdefault("JOB_POLL_INTERVAL", "0.01")
+os.environ.setdefault("OTEL_TRACES_EXPORTER", "none")
+os.environ.setdefault("STT_PROVIDER", "openai")
+os.environ.setdefault("TTS_PROVIDER", "elevenlabs")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("ELEVEN_API_KEY", "bench")
+os.environ.setdefault("TWILIO_ACCOUNT_SID", "AC" + "0" * 32)
+os.environ.setdefault("TWILIO_AUTH_TOKEN", "bench")
+os.environ.setdefault("TWILIO_CALLER_ID", "+15550000000")
+# The stand-ins have no quota; keep the client-side LLM pacing out of the way.
+os.environ.setdefault("INTENT_LLM_RPS", "10000")
+os.environ.setdefault("INTENT_LLM_TPM", "100000000")
+
+import httpx
+from twilio.rest import Client
+
+from app.logging_config import logger
+from app.main import create_app
+from app.models.db import engine
+from app.services.intent import INTENT_LABELS, IntentClassifier
+from app.services.registry import ProviderRegistry
+from app.services.stt import STTClient
+from app.services.telephony import TelephonyService
+from benchmarks.fakes import FakeElevenLabsAdapter, FakeProviderTransport, FakeTwilioHttpClient
+
+ENDPOINTS = ("inbound", "outbound", "webhook_twilio", "webhook_vapi")
+RESULTS_DIR = Path(__file__).parent / "results"
+
+TRANSCRIPTS = [
+    "please call me back tomorrow morning",
+    "I want to talk to a real person right now",
+    "my internet has been down since yesterday",
+    "can you move my appointment to friday",
+    "I was charged twice on my last bill",
+    "hmm well I am not really sure what I need",
+]
+PROMPTS = [
+    "Hi, this is a reminder about your appointment tomorrow at ten.",
+    "Hello, we are calling to confirm your recent order.",
+    "Good afternoon, your service request has been completed.",
+]
+
+
+class InjectedError(RuntimeError):
+    pass
+
+
+class _Stub:
+    """Blocking stand-in for an SDK call with latency and error injection."""
+
+    def __init__(self, latency: float, error_rate: float, seed: int) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    def __call__(self, name: str) -> None:
+        time.sleep(self.latency)
+        if self._random.random() < self.error_rate:
+            raise InjectedError(f"injected {name} failure")
+
+
+class BenchSTTClient(STTClient):
+    stub: _Stub
+
+    def _transcribe(self, audio, mimetype: str) -> str:
+        self.stub("stt")
+        return TRANSCRIPTS[len(audio) % len(TRANSCRIPTS)]
+
+
+class BenchIntentClassifier(IntentClassifier):
+    stub: _Stub
+
+    def _chat(self, messages, max_tokens: int, timeout: float, batch: int) -> str:
+        self.stub("llm")
+        if batch > 1:
+            return json.dumps([INTENT_LABELS[0]] * batch)
+        return INTENT_LABELS[0]
+
+
+class BenchProviders(ProviderRegistry):
+    """Provider registry wired to the local stand-ins."""
+
+    def __init__(self, args) -> None:
+        super().__init__(
+            transport=FakeProviderTransport(
+                latency=args.stt_latency, transcripts=TRANSCRIPTS, error_rate=args.error_rate
+            )
+        )
+        self.twilio = FakeTwilioHttpClient(args.twilio_latency, args.error_rate)
+        self.elevenlabs = FakeElevenLabsAdapter(args.tts_latency, args.error_rate)
+        self.stt_stub = _Stub(args.stt_latency, args.error_rate, seed=5)
+        self.llm_stub = _Stub(args.llm_latency, args.error_rate, seed=7)
+
+    async def start(self) -> None:
+        await super().start()
+        self.session.mount("https://api.elevenlabs.io", self.elevenlabs)
+
+    def telephony(self) -> TelephonyService:
+        if self._telephony is None:
+            client = Client(
+                os.environ["TWILIO_ACCOUNT_SID"], os.environ["TWILIO_AUTH_TOKEN"], http_client=self.twilio
+            )
+            self._telephony = TelephonyService(client=client)
+        return self._telephony
+
+    def stt(self, locale: Optional[str] = None, provider: Optional[str] = None) -> STTClient:
+        key = (provider, locale)
+        if key not in self._stt:
+            client = BenchSTTClient(provider=provider, locale=locale, http_client=self.http)
+            client.stub = self.stt_stub
+            self._stt[key] = client
+        return self._stt[key]
+
+    def intent(self, model: Optional[str] = None) -> IntentClassifier:
+        if model not in self._intent:
+            classifier = BenchIntentClassifier(model=model)
+            classifier.stub = self.llm_stub
+            self._intent[model] = classifier
+        return self._intent[model]
+
+
+def generate_traffic(n: int, mix: Dict[str, float], duplicate_rate: float, seed: int) -> List[Dict[str, Any]]:
+    """Build ``n`` requests drawn from ``mix``, with some webhooks redelivered."""
+    rng = random.Random(seed)
+    endpoints = list(mix)
+    weights = [mix[e] for e in endpoints]
+    sids: List[str] = []
+    traffic = []
+    for i in range(n):
+        endpoint = rng.choices(endpoints, weights)[0]
+        phone = f"+1555{rng.randrange(10**7):07d}"
+        if endpoint == "inbound":
+            seconds = rng.choice((5, 15, 30, 60))
+            body = {"phone": phone, "recording_url": f"http://fake/rec.wav?seconds={seconds}"}
+        elif endpoint == "outbound":
+            body = {"phone": phone, "prompt": rng.choice(PROMPTS)}
+        else:
+            if sids and rng.random() < duplicate_rate:
+                sid = rng.choice(sids)
+            else:
+                sid = f"CA{i:032d}"
+                sids.append(sid)
+            if endpoint == "webhook_twilio":
+                body = {"CallSid": sid, "From": phone, "To": "+15550000000", "CallStatus": "ringing"}
+            else:
+                body = {"id": sid, "phone": phone, "type": "call.started"}
+        traffic.append({"endpoint": endpoint, "body": body})
+    return traffic
+
+
+def load_traffic(path: str) -> List[Dict[str, Any]]:
+    with open(path) as fh:
+        traffic = [json.loads(line) for line in fh if line.strip()]
+    unknown = {t["endpoint"] for t in traffic} - set(ENDPOINTS)
+    if unknown:
+        raise SystemExit(f"unknown endpoints in {path}: {sorted(unknown)}")
+    return traffic
+
+
+def for_level(traffic: List[Dict[str, Any]], concurrency: int) -> List[Dict[str, Any]]:
+    """Tag webhook IDs with the level so redeliveries are only repeated within it."""
+    tagged = []
+    for request in traffic:
+        body = dict(request["body"])
+        for key in ("CallSid", "id", "call_id"):
+            if key in body:
+                body[key] = f"{body[key]}-c{concurrency}"
+        tagged.append({"endpoint": request["endpoint"], "body": body})
+    return tagged
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Sampler:
+    """Track peak RSS and database connections checked out during a level."""
+
+    def __init__(self, interval: float = 0.02) -> None:
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_db = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _sample(self) -> None:
+        self.peak_rss = max(self.peak_rss, rss_bytes())
+        checkedout = getattr(engine.pool, "checkedout", None)
+        if checkedout is not None:
+            self.peak_db = max(self.peak_db, checkedout())
+
+    async def _run(self) -> None:
+        while True:
+            self._sample()
+            await asyncio.sleep(self.interval)
+
+    def __enter__(self) -> "Sampler":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._task.cancel()
+        self._sample()
+
+
+async def send(client: httpx.AsyncClient, request: Dict[str, Any]) -> Dict[str, Any]:
+    """Issue one request and return its timings; inbound waits for the job."""
+    endpoint, body = request["endpoint"], request["body"]
+    start = time.perf_counter()
+    if endpoint == "inbound":
+        resp = await client.post("/call/inbound", json=body)
+        accepted = time.perf_counter() - start
+        if resp.status_code != 202:
+            return {"ok": False, "status": resp.status_code, "latency": accepted}
+        job_id = resp.json()["job_id"]
+        while True:
+            job = (await client.get(f"/jobs/{job_id}")).json()
+            if job["status"] in ("SUCCEEDED", "FAILED"):
+                break
+            await asyncio.sleep(0.01)
+        return {
+            "ok": job["status"] == "SUCCEEDED",
+            "status": job["status"],
+            "latency": time.perf_counter() - start,
+            "accept": accepted,
+        }
+    if endpoint == "outbound":
+        resp = await client.post("/call/outbound", json=body)
+    else:
+        resp = await client.post(f"/webhook/{endpoint.split('_', 1)[1]}", data=body)
+    return {"ok": resp.status_code < 400, "status": resp.status_code, "latency": time.perf_counter() - start}
+
+
+async def run_level(client: httpx.AsyncClient, traffic: List[Dict[str, Any]], concurrency: int, slo: float):
+    sem = asyncio.Semaphore(concurrency)
+    results: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
+    async def one(request: Dict[str, Any]) -> None:
+        async with sem:
+            try:
+                outcome = await send(client, request)
+            except Exception as e:
+                outcome = {"ok": False, "status": type(e).__name__, "latency": 0.0}
+            results[request["endpoint"]].append(outcome)
+
+    with Sampler() as sampler:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(r) for r in traffic))
+        elapsed = time.perf_counter() - start
+
+    endpoints = {}
+    for endpoint, outcomes in sorted(results.items()):
+        latencies = sorted(o["latency"] for o in outcomes if o["ok"])
+        statuses = defaultdict(int)
+        for o in outcomes:
+            statuses[str(o["status"])] += 1
+        stats = {
+            "requests": len(outcomes),
+            "errors": sum(not o["ok"] for o in outcomes),
+            "throughput": round(len(outcomes) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "statuses": dict(statuses),
+        }
+        stats["slo_met"] = bool(latencies) and stats["p95_ms"] <= slo * 1000
+        accepts = sorted(o["accept"] for o in outcomes if "accept" in o)
+        if accepts:
+            stats["accept_p95_ms"] = round(percentile(accepts, 95) * 1000, 1)
+        endpoints[endpoint] = stats
+    return {
+        "concurrency": concurrency,
+        "requests": len(traffic),
+        "elapsed_s": round(elapsed, 3),
+        "throughput": round(len(traffic) / elapsed, 2),
+        "peak_rss_mb": round(sampler.peak_rss / 2**20, 1),
+        "peak_db_connections": sampler.peak_db,
+        "endpoints": endpoints,
+    }
+
+
+def print_level(level: Dict[str, Any]) -> None:
+    print(
+        f"\nconcurrency {level['concurrency']}: {level['throughput']:.1f} req/s, "
+        f"peak RSS {level['peak_rss_mb']} MB, peak DB connections {level['peak_db_connections']}"
+    )
+    print(f"  {'endpoint':<15} {'n':>5} {'err':>4} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  slo")
+    for name, s in level["endpoints"].items():
+        print(
+            f"  {name:<15} {s['requests']:>5} {s['errors']:>4} {s['throughput']:>7.1f} "
+            f"{s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f}  {'ok' if s['slo_met'] else 'MISS'}"
+        )
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> None:
+    """Print per-level, per-endpoint changes in throughput and p95 latency."""
+    print(f"\ncompared with {old.get('commit', '?')} ({old.get('timestamp', '?')})")
+    before = {level["concurrency"]: level for level in old["levels"]}
+    for level in new["levels"]:
+        prev = before.get(level["concurrency"])
+        if prev is None:
+            continue
+        print(f"  concurrency {level['concurrency']}: {_delta(prev['throughput'], level['throughput'])} req/s")
+        for name, s in level["endpoints"].items():
+            p = prev["endpoints"].get(name)
+            if p:
+                print(
+                    f"    {name:<15} p95 {_delta(p['p95_ms'], s['p95_ms'])} ms"
+                    f"  p99 {_delta(p['p99_ms'], s['p99_ms'])} ms  errors {p['errors']} -> {s['errors']}"
+                )
+
+
+def _delta(old: float, new: float) -> str:
+    change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+    return f"{old:.1f} -> {new:.1f} ({change})"
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def main(args) -> None:
+    if args.traffic:
+        traffic = load_traffic(args.traffic)
+    else:
+        mix = dict(zip(ENDPOINTS, args.mix))
+        traffic = generate_traffic(args.requests, mix, args.duplicate_rate, args.seed)
+    form_parser = importlib.util.find_spec("python_multipart") or importlib.util.find_spec("multipart")
+    if form_parser is None and any(t["endpoint"].startswith("webhook") for t in traffic):
+        print("python-multipart is not installed; skipping webhook requests", file=sys.stderr)
+        traffic = [t for t in traffic if not t["endpoint"].startswith("webhook")]
+
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level, format="{time:ISO8601} | {level} | {message}")
+
+    providers = BenchProviders(args)
+    app = create_app(providers=providers)
+    transport = httpx.ASGITransport(app=app)
+    levels = []
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for concurrency in args.levels:
+                level = await run_level(client, for_level(traffic, concurrency), concurrency, args.slo)
+                print_level(level)
+                levels.append(level)
+        health = providers.health()
+
+    commit = git_commit()
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    results = {
+        "commit": commit,
+        "timestamp": timestamp,
+        "python": sys.version.split()[0],
+        "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "log_level")},
+        "levels": levels,
+        "provider_health": health,
+    }
+    output = Path(args.output or RESULTS_DIR / f"{commit}-{timestamp}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\nresults written to {output}")
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text()), results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--traffic", help="JSON lines traffic file to replay (default: generate a mix)")
+    parser.add_argument("--requests", type=int, default=200, help="Generated requests per level")
+    parser.add_argument(
+        "--mix",
+        type=float,
+        nargs=4,
+        default=[0.6, 0.2, 0.15, 0.05],
+        metavar=("INBOUND", "OUTBOUND", "TWILIO", "VAPI"),
+        help="Relative weights of the generated endpoints",
+    )
+    parser.add_argument("--duplicate-rate", type=float, default=0.1, help="Fraction of redelivered webhooks")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 5, 10, 25, 50], help="Concurrency levels")
+    parser.add_argument("--twilio-latency", type=float, default=0.15, help="Fake Twilio response time (s)")
+    parser.add_argument("--tts-latency", type=float, default=0.3, help="Fake ElevenLabs response time (s)")
+    parser.add_argument("--stt-latency", type=float, default=0.4, help="Fake Whisper/Deepgram response time (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Fake OpenAI chat response time (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of failed provider calls")
+    parser.add_argument("--slo", type=float, default=3.0, help="p95 round-trip target in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--log-level", default="WARNING", help="App log level during the run")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,72 @@
+"""Peak RSS per call as the recording length grows.
+
+    python -m benchmarks.memory --seconds 60 600 1800 3600
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+
+RECORDING_URL = "http://fake/recording.wav?seconds={seconds}"
+
+
+async def _measure(seconds: float, mode: str) -> dict:
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+    import httpx
+
+    from app.services.stt import STTClient
+    from benchmarks.fakes import FakeProviderTransport
+
+    transport = FakeProviderTransport()
+    stt = STTClient(provider="openai", locale="en-US")
+    async with httpx.AsyncClient(transport=transport) as http:
+        baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        async with http.stream("GET", RECORDING_URL.format(seconds=seconds)) as resp:
+            if mode == "buffered":
+                audio = await resp.aread()
+            else:
+                audio = resp.aiter_bytes()
+            await stt.transcribe_stream(audio, http_client=http)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "seconds": seconds,
+        "mode": mode,
+        "uploaded_bytes": transport.bytes_received,
+        "baseline_rss_kb": baseline,
+        "peak_rss_kb": peak,
+        "delta_rss_kb": peak - baseline,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, nargs="+", default=[60, 600, 1800])
+    parser.add_argument("--mode", choices=["streamed", "buffered", "both"], default="both")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(_measure(args.seconds[0], args.mode))))
+        return
+
+    modes = ["streamed", "buffered"] if args.mode == "both" else [args.mode]
+    print(f"{'mode':>9} {'seconds':>8} {'uploaded MB':>12} {'peak RSS MB':>12} {'delta MB':>9}")
+    for mode in modes:
+        for seconds in args.seconds:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.memory", "--child", "--mode", mode,
+                 "--seconds", str(seconds)],
+                check=True, capture_output=True, text=True,
+            )
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(
+                f"{mode:>9} {seconds:>8.0f} {r['uploaded_bytes'] / 2**20:>12.1f} "
+                f"{r['peak_rss_kb'] / 1024:>12.1f} {r['delta_rss_kb'] / 1024:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Conversation list latency as pages go deeper.
+
+    python -m benchmarks.pagination --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='voice-bench-')}/bench.db"
+)
+
+from sqlalchemy import insert
+
+from app.models.db import Conversation, Ticket, init_db, session_scope
+from app.services.conversation import list_conversations
+from app.services.pagination import encode_cursor
+
+INTENTS = ["SCHEDULE_CALLBACK", "RESOLVE_ISSUE", "OTHER", "LIVE_AGENT"]
+CHUNK = 50_000
+
+
+def seed(rows: int) -> None:
+    base = datetime(2024, 1, 1)
+    with session_scope() as session:
+        for offset in range(0, rows, CHUNK):
+            n = min(CHUNK, rows - offset)
+            conversations = [
+                {
+                    "id": i + 1,
+                    "phone": f"+1555{i % 5000:07d}",
+                    "direction": "INBOUND" if i % 3 else "OUTBOUND",
+                    "locale": "en-US",
+                    "start_ts": base + timedelta(seconds=i),
+                    "end_ts": base + timedelta(seconds=i + 60),
+                    "transcript": "please call me back",
+                    "intents": [INTENTS[i % 4]],
+                    "status": "CLOSED" if i % 10 else "OPEN",
+                }
+                for i in range(offset, offset + n)
+            ]
+            session.execute(insert(Conversation), conversations)
+            session.execute(
+                insert(Ticket),
+                [
+                    {"conversation_id": c["id"], "category": c["intents"][0], "status": "OPEN", "created_ts": c["end_ts"]}
+                    for c in conversations[::2]
+                ],
+            )
+            session.commit()
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def measure(depth: int, limit: int, status: str | None) -> tuple[float, float]:
+    with session_scope() as session:
+        base = session.query(Conversation)
+        if status:
+            base = base.filter(Conversation.status == status)
+        ordered = base.order_by(Conversation.start_ts.desc(), Conversation.id.desc())
+        cursor = None
+        if depth:
+            last = ordered.offset(depth - 1).limit(1).one_or_none()
+            if last is None:
+                return float("nan"), float("nan")
+            cursor = encode_cursor(last.start_ts, last.id)
+
+        def keyset():
+            list_conversations(session, status=status, cursor=cursor, limit=limit)
+            session.expunge_all()
+
+        def offset():
+            ordered.offset(depth).limit(limit).all()
+            session.expunge_all()
+
+        return timed(keyset), timed(offset)
+
+
+def main(rows: int, limit: int) -> None:
+    init_db()
+    with session_scope() as session:
+        existing = session.query(Conversation).count()
+    if existing < rows:
+        start = time.perf_counter()
+        seed(rows)
+        print(f"Seeded {rows} conversations in {time.perf_counter() - start:.1f}s")
+
+    depths = [d for d in (0, 1_000, 10_000, 100_000, 500_000, 900_000) if d < rows]
+    for status in (None, "CLOSED"):
+        print(f"\nfilter status={status or '*'}  page size {limit}")
+        print(f"{'depth':>10} {'keyset ms':>10} {'offset ms':>10}")
+        for depth in depths:
+            keyset_ms, offset_ms = measure(depth, limit, status)
+            print(f"{depth:>10} {keyset_ms:>10.2f} {offset_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="Conversations to seed")
+    parser.add_argument("--limit", type=int, default=50, help="Page size")
+    args = parser.parse_args()
+    main(args.rows, args.limit)
@@ -0,0 +1,120 @@
+"""Transcript search latency on a synthetic corpus.
+
+    python -m benchmarks.search --rows 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='voice-bench-')}/bench.db"
+)
+
+from sqlalchemy import insert
+
+from app.models.db import Conversation, init_db, session_scope
+from app.services.search import query_terms, transcript_search
+
+INTENTS = ["SCHEDULE_CALLBACK", "RESOLVE_ISSUE", "OTHER", "LIVE_AGENT"]
+OPENERS = ["hi", "hello", "good morning", "hey there", "yes hello"]
+TOPICS = [
+    "my internet keeps dropping every evening",
+    "i was charged twice on my last bill",
+    "i need to reschedule the technician visit",
+    "the router lights are blinking orange",
+    "please cancel the premium sports package",
+    "my refund has not arrived yet",
+    "i moved house and need to update my address",
+    "the app will not let me log in",
+    "can you call me back after five",
+    "i want to speak to a real person",
+]
+RARE = ["warranty", "fibre upgrade", "smart doorbell", "roaming charges", "loyalty discount"]
+CLOSERS = ["thanks", "thank you bye", "that is all", "ok great", "appreciate it"]
+CHUNK = 50_000
+
+
+def transcript(rng: random.Random) -> str:
+    parts = [rng.choice(OPENERS), rng.choice(TOPICS), rng.choice(TOPICS)]
+    if rng.random() < 0.01:
+        parts.append(f"also about the {rng.choice(RARE)}")
+    parts.append(rng.choice(CLOSERS))
+    return " ".join(parts)
+
+
+def seed(rows: int) -> None:
+    rng = random.Random(7)
+    base = datetime(2024, 1, 1)
+    with session_scope() as session:
+        for offset in range(0, rows, CHUNK):
+            session.execute(
+                insert(Conversation),
+                [
+                    {
+                        "phone": f"+1555{i % 5000:07d}",
+                        "direction": "INBOUND",
+                        "locale": "en-US",
+                        "start_ts": base + timedelta(seconds=30 * i),
+                        "transcript": transcript(rng),
+                        "intents": [INTENTS[i % 4]],
+                        "status": "CLOSED",
+                    }
+                    for i in range(offset, min(rows, offset + CHUNK))
+                ],
+            )
+            session.commit()
+
+
+def timed(fn, repeat: int) -> tuple[float, float, int]:
+    samples = []
+    hits = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hits = len(fn().hits)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1], hits
+
+
+def main(rows: int, repeat: int) -> None:
+    init_db()
+    with session_scope() as session:
+        existing = session.query(Conversation).count()
+    if existing < rows:
+        start = time.perf_counter()
+        seed(rows - existing)
+        print(f"Seeded {rows - existing} transcripts in {time.perf_counter() - start:.1f}s")
+
+    mid = datetime(2024, 1, 1) + timedelta(seconds=15 * rows)
+    cases = [
+        ("common term", "refund", {}),
+        ("multi-term", "charged twice bill", {}),
+        ("rare term", "warranty", {}),
+        ("rare phrase", "smart doorbell", {}),
+        ("intent filter", "technician", {"intent": "SCHEDULE_CALLBACK"}),
+        ("date range", "router orange", {"date_from": mid, "date_to": mid + timedelta(days=7)}),
+        ("offset 1000", "refund", {"offset": 1000}),
+    ]
+    with session_scope() as session:
+        backend = transcript_search.backend(session)
+        print(f"\nbackend={backend} rows={rows} repeat={repeat}")
+        print(f"{'case':>14} {'query':>20} {'p50 ms':>8} {'p95 ms':>8} {'hits':>5}")
+        for name, q, kwargs in cases:
+            p50, p95, hits = timed(lambda: transcript_search.search(session, q, limit=20, **kwargs), repeat)
+            print(f"{name:>14} {q!r:>20} {p50:>8.2f} {p95:>8.2f} {hits:>5}")
+
+        scan = lambda: transcript_search._search_scan(session, query_terms("doorbell refund"), [], 20, 0)
+        p50, _, hits = timed(scan, 3)
+        print(f"\nLIKE scan fallback for 'doorbell refund': {p50:.1f} ms ({hits} hits)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Transcripts in the corpus")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query")
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,160 @@
+"""Cold-start cost: importing the app, running its startup and becoming ready.
+
+    python -m benchmarks.startup --runs 5 --importtime 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).parent / "results"
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY = ("openai", "twilio.rest", "numpy", "opentelemetry.instrumentation.fastapi")
+
+CHILD = r"""
+import asyncio, json, sys, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+loaded_at_import = [m for m in HEAVY if m in sys.modules]
+
+async def run():
+    application = app.main.app
+    async with application.router.lifespan_context(application):
+        started = time.perf_counter()
+        warmup = application.state.warmup
+        while not warmup.done:
+            await asyncio.sleep(0.005)
+        ready = time.perf_counter()
+        return started, ready, warmup.ready, warmup.checks
+
+started, ready, ok, checks = asyncio.run(run())
+print(json.dumps({
+    "import": imported - start,
+    "startup": started - imported,
+    "ready": ready - start,
+    "ready_ok": ok,
+    "steps": {name: check["seconds"] for name, check in checks.items()},
+    "loaded_at_import": loaded_at_import,
+    "loaded_at_ready": [m for m in HEAVY if m in sys.modules],
+}))
+"""
+
+
+def child_env(db_path: str) -> dict:
+    env = dict(os.environ)
+    env.update(
+        {
+            "DATABASE_URL": f"sqlite:///{db_path}",
+            "OTEL_TRACES_EXPORTER": env.get("OTEL_TRACES_EXPORTER", "none"),
+            "READY_WARM_HTTP": "0",
+            "JOB_WORKERS": "1",
+            "STATS_ROLLUP_INTERVAL": "0",
+            "PYTHONPATH": str(ROOT),
+        }
+    )
+    for key, value in (
+        ("OPENAI_API_KEY", "bench"),
+        ("ELEVEN_API_KEY", "bench"),
+        ("TWILIO_ACCOUNT_SID", "AC" + "0" * 32),
+        ("TWILIO_AUTH_TOKEN", "bench"),
+        ("TWILIO_CALLER_ID", "+15550000000"),
+    ):
+        env.setdefault(key, value)
+    return env
+
+
+def run_once(env: dict) -> dict:
+    code = f"HEAVY = {HEAVY!r}\n" + CHILD
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def import_profile(env: dict, top: int) -> list:
+    """Return the ``top`` modules by cumulative import time (``-X importtime``)."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env,
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1e6, name.rstrip()))
+    rows.sort(reverse=True)
+    return [
+        {"module": name.strip(), "depth": (len(name) - len(name.lstrip())) // 2, "seconds": seconds}
+        for seconds, name in rows[:top]
+    ]
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(args) -> int:
+    db_path = os.path.join(tempfile.mkdtemp(prefix="voice-startup-"), "bench.db")
+    env = child_env(db_path)
+    subprocess.run(
+        [sys.executable, "scripts/manage.py", "migrate"], env=env, cwd=ROOT, capture_output=True, check=True
+    )
+    run_once(env)  # prime the bytecode cache; not counted
+    runs = [run_once(env) for _ in range(args.runs)]
+
+    print(f"{'phase':>10} {'median s':>9} {'min s':>7} {'max s':>7}")
+    summary = {}
+    for phase in ("import", "startup", "ready"):
+        values = [r[phase] for r in runs]
+        summary[phase] = {"median": statistics.median(values), "min": min(values), "max": max(values)}
+        print(f"{phase:>10} {summary[phase]['median']:>9.3f} {min(values):>7.3f} {max(values):>7.3f}")
+    steps = {name: statistics.median(r["steps"].get(name, 0) for r in runs) for name in runs[0]["steps"]}
+    print("warm-up steps: " + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in steps.items()))
+    print(f"loaded at import: {', '.join(runs[0]['loaded_at_import']) or 'none'}")
+    print(f"loaded at ready:  {', '.join(runs[0]['loaded_at_ready']) or 'none'}")
+    if not all(r["ready_ok"] for r in runs):
+        print("warning: warm-up did not reach ready in every run")
+
+    profile = import_profile(env, args.importtime) if args.importtime else []
+    for row in profile:
+        print(f"{row['seconds']:>8.3f}s {'  ' * row['depth']}{row['module']}")
+
+    commit = git_commit()
+    output = Path(args.output or RESULTS_DIR / f"startup-{commit}-{time.strftime('%Y%m%dT%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {"commit": commit, "python": sys.version.split()[0], "summary": summary, "steps": steps,
+             "runs": runs, "import_profile": profile},
+            indent=2,
+        )
+        + "\n"
+    )
+    print(f"Results written to {output}")
+    if args.max_import_seconds and summary["import"]["median"] > args.max_import_seconds:
+        print(f"FAIL: median import {summary['import']['median']:.3f}s exceeds {args.max_import_seconds}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument("--importtime", type=int, default=0, help="Show the N slowest imports")
+    parser.add_argument("--max-import-seconds", type=float, help="Fail if the median import is slower")
+    parser.add_argument("--output", help="Results file (default benchmarks/results/startup-<commit>-<time>.json)")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,73 @@
+"""Streaming TTS benchmark: one request per prompt versus sentence pipelining.
+
+    python -m benchmarks.tts_stream --sentences 6 --depth 1 2 3 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("ELEVEN_API_KEY", "bench")
+
+import httpx
+
+from app.services.tts import TTSClient
+from benchmarks.fakes import FakeTTSTransport
+
+WORDS = "your appointment account balance payment reminder schedule confirm tomorrow morning please".split()
+
+
+def make_prompt(rng: random.Random, sentences: int) -> str:
+    return " ".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+
+async def measure(chunks) -> tuple:
+    start = time.perf_counter()
+    first = None
+    audio = b""
+    async for chunk in chunks:
+        if first is None:
+            first = time.perf_counter() - start
+        audio += chunk
+    return first, time.perf_counter() - start, audio
+
+
+async def main(args) -> None:
+    rng = random.Random(1)
+    prompts = [make_prompt(rng, args.sentences) for _ in range(args.prompts)]
+    fake = FakeTTSTransport(args.latency, args.per_char)
+    async with httpx.AsyncClient(transport=fake) as http:
+        tts = TTSClient(provider="elevenlabs", locale="en-US", http_client=http)
+        print(f"{'mode':>12} {'first p50':>10} {'last p50':>10} {'peak reqs':>10} {'in order':>9}")
+        modes = [("single", None)] + [(f"depth={d}", d) for d in args.depth]
+        for label, depth in modes:
+            firsts, lasts, ordered = [], [], True
+            fake.peak = 0
+            for prompt in prompts:
+                if depth is None:
+                    chunks = tts.stream(prompt)
+                else:
+                    chunks = tts.stream_sentences(prompt, depth=depth)
+                first, last, audio = await measure(chunks)
+                firsts.append(first)
+                lasts.append(last)
+                ordered &= audio.decode().replace(" ", "") == prompt.replace(" ", "")
+            print(
+                f"{label:>12} {statistics.median(firsts) * 1000:>8.0f}ms {statistics.median(lasts) * 1000:>8.0f}ms"
+                f" {fake.peak:>10} {str(ordered):>9}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prompts", type=int, default=10, help="Prompts synthesized per mode")
+    parser.add_argument("--sentences", type=int, default=6, help="Sentences per prompt")
+    parser.add_argument("--depth", type=int, nargs="+", default=[1, 2, 3, 4], help="Pipeline depths to compare")
+    parser.add_argument("--latency", type=float, default=0.15, help="Fake base time to first byte in seconds")
+    parser.add_argument("--per-char", type=float, default=0.003, help="Fake extra latency per character")
+    asyncio.run(main(parser.parse_args()))
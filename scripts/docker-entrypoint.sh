@@ -0,0 +1,11 @@
+#!/bin/sh
+# Apply pending schema migrations, then run the container command.
+# Set MIGRATE_ON_CONTAINER_START=0 when a separate job migrates instead
+# (e.g. several replicas, or the compose `migrate` service).
+set -e
+
+if [ "${MIGRATE_ON_CONTAINER_START:-1}" != "0" ]; then
+    python scripts/manage.py migrate
+fi
+
+exec "$@"
@@ -1,34 +1,180 @@
 import argparse
+import json
 import os
 import sys
+import time
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from app.models.db import SessionLocal, Conversation, Ticket
+from app.models.db import Conversation, Ticket, session_scope
 
 
 def delete_conversation(conv_id: int) -> None:
-    session = SessionLocal()
-    conv = session.query(Conversation).filter(Conversation.id == conv_id).first()
-    if not conv:
-        print(f"Conversation {conv_id} not found")
-        return
-    session.delete(conv)
-    session.commit()
-    print(f"Deleted conversation {conv_id}")
+    from app.services.retention import delete_conversations
+
+    with session_scope() as session:
+        counts = delete_conversations(session, [conv_id])
+        if not counts["conversations"]:
+            session.rollback()
+            print(f"Conversation {conv_id} not found")
+            return
+        session.commit()
+    print(f"Deleted conversation {conv_id} ({counts['tickets']} tickets, {counts['jobs']} jobs)")
 
 
 def delete_ticket(ticket_id: int) -> None:
-    session = SessionLocal()
-    ticket = session.query(Ticket).filter(Ticket.id == ticket_id).first()
-    if not ticket:
-        print(f"Ticket {ticket_id} not found")
-        return
-    session.delete(ticket)
-    session.commit()
+    with session_scope() as session:
+        ticket = session.query(Ticket).filter(Ticket.id == ticket_id).first()
+        if not ticket:
+            print(f"Ticket {ticket_id} not found")
+            return
+        session.delete(ticket)
+        session.commit()
     print(f"Deleted ticket {ticket_id}")
 
 
+def eval_intent(path: str | None, local_only: bool) -> None:
+    from app.services.intent import EVAL_PATH, IntentClassifier, evaluate, load_examples
+
+    examples = load_examples(path or EVAL_PATH)
+    report = evaluate(IntentClassifier(), examples, allow_llm=not local_only)
+    print(json.dumps(report, indent=2))
+
+
+def reclassify(chunk_size: int, local_only: bool) -> None:
+    """Re-run intent classification over every stored transcript in chunks.
+
+    Intent counts already in the stats rollups move with each chunk.
+    """
+    from app.services.intent import IntentClassifier
+    from app.services.stats import move_intent_counts
+
+    classifier = IntentClassifier()
+    last_id = 0
+    total = 0
+    start = time.perf_counter()
+    with session_scope() as session:
+        while True:
+            rows = (
+                session.query(Conversation.id, Conversation.transcript)
+                .filter(Conversation.id > last_id, Conversation.transcript.isnot(None))
+                .order_by(Conversation.id)
+                .limit(chunk_size)
+                .all()
+            )
+            if not rows:
+                break
+            predictions = classifier.classify_many([t for _, t in rows], allow_llm=not local_only)
+            labels = {conv_id: [p.label] for (conv_id, _), p in zip(rows, predictions)}
+            move_intent_counts(session, labels)
+            session.bulk_update_mappings(
+                Conversation, [{"id": conv_id, "intents": intents} for conv_id, intents in labels.items()]
+            )
+            session.commit()
+            last_id = rows[-1][0]
+            total += len(rows)
+            elapsed = time.perf_counter() - start
+            print(f"Reclassified {total} conversations ({total / elapsed:.1f} transcripts/s)")
+    elapsed = time.perf_counter() - start
+    print(f"Done: {total} transcripts in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f} transcripts/s)")
+
+
+def invalidate_intent_cache() -> None:
+    from app.services.intent import IntentClassifier, invalidate_intent_cache as invalidate
+
+    generation = invalidate()
+    IntentClassifier().cache.invalidate()
+    print(f"Intent cache cleared (generation {generation}); running servers drop their entries within seconds")
+
+
+def _print_progress(report) -> None:
+    verb = "Matched" if report.dry_run else report.policy.action.capitalize() + "d"
+    print(
+        f"[{report.policy.name}] {verb} {report.conversations} conversations, {report.tickets} tickets, "
+        f"{report.jobs} jobs ({report.rate:.0f} conversations/s)",
+        flush=True,
+    )
+
+
+def retention(args) -> None:
+    """Apply retention policies from ``--policies``, the config file or the command line."""
+    from app.services.retention import RetentionPolicy, load_policies, run_policies
+
+    if args.older_than_days is not None or args.status or args.phone or args.direction:
+        policies = [
+            RetentionPolicy.from_dict(
+                {
+                    "name": args.name,
+                    "action": args.action,
+                    "older_than_days": args.older_than_days,
+                    "status": args.status,
+                    "direction": args.direction,
+                    "phone": args.phone,
+                }
+            )
+        ]
+    else:
+        policies = load_policies(args.policies)
+    if not policies:
+        print("No retention policies configured")
+        return
+    reports = run_policies(
+        policies,
+        batch_size=args.batch_size,
+        archive_dir=args.archive_dir,
+        archive_format=args.format,
+        dry_run=args.dry_run,
+        progress=_print_progress,
+    )
+    print(json.dumps([report.as_dict() for report in reports], indent=2))
+
+
+def erase_phone(phone: str, batch_size: int, archive_dir: str, dry_run: bool) -> None:
+    """Erase a caller from the database and the archives, and drop cached transcripts."""
+    from app.services.intent import invalidate_intent_cache
+    from app.services.retention import erase_phone as erase, scrub_archives
+
+    report = erase(phone, batch_size=batch_size, dry_run=dry_run, progress=_print_progress)
+    result = report.as_dict()
+    result["archives"] = scrub_archives(archive_dir, phone, dry_run=dry_run)
+    if not dry_run:
+        result["intent_cache_generation"] = invalidate_intent_cache()
+    print(json.dumps(result, indent=2))
+    if result["archives"]["skipped"]:
+        print("Parquet archives were not scrubbed (pyarrow is not installed)", file=sys.stderr)
+
+
+def stats_backfill(rebuild: bool, batch_size: int | None) -> None:
+    """Fold every row past the rollup watermarks into the stats tables."""
+    from app.services.stats import StatsRollup
+
+    rollup = StatsRollup(batch_size=batch_size)
+    if rebuild:
+        rollup.reset()
+        print("Cleared rollups and watermarks")
+    start = time.perf_counter()
+
+    def progress(source: str, total: int, elapsed: float) -> None:
+        print(f"[{source}] {total} rows ({total / elapsed:.0f} rows/s)", flush=True)
+
+    processed = rollup.run(progress=progress)
+    elapsed = time.perf_counter() - start
+    total = sum(processed.values())
+    print(f"Done: {total} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/s)")
+
+
+def migrate(dry_run: bool) -> None:
+    from app.models.db import engine
+    from app.models.migrations import pending_migrations, run_migrations
+
+    if dry_run:
+        pending = pending_migrations(engine)
+        print("\n".join(pending) if pending else "Schema is up to date")
+        return
+    applied = run_migrations(engine)
+    print(f"Applied {len(applied)} migration(s)" + (f": {', '.join(applied)}" if applied else ""))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Manage Voice Agent records")
     sub = parser.add_subparsers(dest="command", required=True)
@@ -39,11 +185,65 @@ def main() -> None:
     dt = sub.add_parser("delete-ticket", help="Delete a ticket by ID")
     dt.add_argument("id", type=int, help="Ticket ID")
 
+    ei = sub.add_parser("eval-intent", help="Score the intent classifier on a labelled set")
+    ei.add_argument("--file", help="JSONL file of {text, label} rows (defaults to app/data/intent_eval.jsonl)")
+    ei.add_argument("--local-only", action="store_true", help="Never escalate to the LLM")
+
+    sub.add_parser("invalidate-intent-cache", help="Drop memoized LLM intent results")
+
+    rc = sub.add_parser("reclassify", help="Re-run intent classification on stored transcripts")
+    rc.add_argument("--chunk-size", type=int, default=500, help="Conversations per batch")
+    rc.add_argument("--local-only", action="store_true", help="Never escalate to the LLM")
+
+    mg = sub.add_parser("migrate", help="Apply pending schema migrations")
+    mg.add_argument("--dry-run", action="store_true", help="List pending migrations without applying them")
+
+    rt = sub.add_parser("retention", help="Archive and delete conversations matching retention policies")
+    rt.add_argument("--policies", help="JSON file of policies (defaults to retention_policies in config.json)")
+    rt.add_argument("--name", default="adhoc", help="Policy name for a policy given on the command line")
+    rt.add_argument("--action", choices=["archive", "delete"], default="archive", help="Archive before deleting")
+    rt.add_argument("--older-than-days", type=float, help="Match conversations that started before this age")
+    rt.add_argument("--status", choices=["OPEN", "CLOSED"], help="Match conversation status")
+    rt.add_argument("--direction", choices=["INBOUND", "OUTBOUND"], help="Match call direction")
+    rt.add_argument("--phone", help="Match phone number")
+    rt.add_argument(
+        "--archive-dir", default=os.getenv("RETENTION_ARCHIVE_DIR", "archive"), help="Archive output directory"
+    )
+    rt.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl", help="Archive file format")
+    rt.add_argument("--batch-size", type=int, help="Conversations per transaction (default RETENTION_BATCH_SIZE)")
+    rt.add_argument("--dry-run", action="store_true", help="Count matching rows without deleting them")
+
+    ep = sub.add_parser("erase-phone", help="Delete every conversation, ticket and job for a phone number")
+    ep.add_argument("phone", help="Phone number exactly as stored, e.g. +15551234567")
+    ep.add_argument("--batch-size", type=int, help="Conversations per transaction (default RETENTION_BATCH_SIZE)")
+    ep.add_argument(
+        "--archive-dir", default=os.getenv("RETENTION_ARCHIVE_DIR", "archive"), help="Archive directory to scrub"
+    )
+    ep.add_argument("--dry-run", action="store_true", help="Count matching rows without deleting them")
+
+    sb = sub.add_parser("stats-backfill", help="Build the analytics rollups from existing conversations and tickets")
+    sb.add_argument("--rebuild", action="store_true", help="Discard existing rollups and start from the beginning")
+    sb.add_argument("--batch-size", type=int, help="Rows per transaction (default STATS_ROLLUP_BATCH)")
+
     args = parser.parse_args()
     if args.command == "delete-conversation":
         delete_conversation(args.id)
     elif args.command == "delete-ticket":
         delete_ticket(args.id)
+    elif args.command == "eval-intent":
+        eval_intent(args.file, args.local_only)
+    elif args.command == "invalidate-intent-cache":
+        invalidate_intent_cache()
+    elif args.command == "reclassify":
+        reclassify(args.chunk_size, args.local_only)
+    elif args.command == "retention":
+        retention(args)
+    elif args.command == "erase-phone":
+        erase_phone(args.phone, args.batch_size, args.archive_dir, args.dry_run)
+    elif args.command == "stats-backfill":
+        stats_backfill(args.rebuild, args.batch_size)
+    elif args.command == "migrate":
+        migrate(args.dry_run)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,27 @@
+import os
+import tempfile
+
+# Point the app at a throwaway database before app.models.db creates its engine.
+_DB_DIR = tempfile.mkdtemp(prefix="voice-agent-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/test.db"
+os.environ.pop("DATABASE_ASYNC_URL", None)
+
+import pytest  # noqa: E402
+from sqlalchemy import delete  # noqa: E402
+
+from app.models.db import Base, init_db, session_scope  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    init_db()
+
+
+@pytest.fixture
+def db():
+    """Yield a session on an emptied database."""
+    with session_scope() as session:
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(delete(table))
+        session.commit()
+        yield session
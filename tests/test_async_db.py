@@ -0,0 +1,43 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models import db as db_module
+from app.models.db import Conversation, Ticket, dispose_engines
+from app.routes.calls import router as calls_router
+from app.routes.jobs import router as jobs_router
+from app.services.jobs import JobQueue
+
+
+@pytest.fixture(params=["sync", "async"])
+def client(request, monkeypatch):
+    monkeypatch.setenv("DB_ASYNC", "1" if request.param == "async" else "0")
+    monkeypatch.setattr(db_module, "_async_sessionmaker", None)
+    monkeypatch.setattr(db_module, "_async_engine", None)
+    app = FastAPI()
+    app.include_router(calls_router)
+    app.include_router(jobs_router)
+    with TestClient(app) as client:
+        assert (db_module.get_async_sessionmaker() is not None) == (request.param == "async")
+        yield client
+        client.portal.call(dispose_engines)
+
+
+def test_get_conversation_loads_tickets(db, client):
+    conv = Conversation(phone="+15550001", direction="INBOUND", start_ts=datetime.utcnow(), status="CLOSED")
+    db.add(conv)
+    db.flush()
+    db.add(Ticket(conversation_id=conv.id, category="billing", status="OPEN", created_ts=datetime.utcnow()))
+    db.commit()
+
+    body = client.get(f"/conversation/{conv.id}").json()
+    assert (body["id"], body["phone"]) == (conv.id, "+15550001")
+    assert [t["category"] for t in body["tickets"]] == ["billing"]
+    assert client.get(f"/conversation/{conv.id + 1}").status_code == 404
+
+
+def test_get_job(db, client):
+    job = JobQueue().enqueue(db, "test_noop", {})
+    assert client.get(f"/jobs/{job.id}").json()["status"] == "QUEUED"
@@ -0,0 +1,131 @@
+import struct
+
+import numpy as np
+import pytest
+
+from app.services.audio import AudioSettings, ulaw_to_pcm16
+from app.services.audio_prep import (
+    decode_wav, encode_wav, mulaw_encode, prepare_for_stt, resample, split_chunks, trim_silence,
+)
+from app.services.stt import stitch_transcripts
+
+
+def _wav(data, tag=1, channels=1, rate=8000, bits=16, extensible=False, data_size=None, extra=b""):
+    block = channels * bits // 8
+    fmt = struct.pack("<HHIIHH", 0xFFFE if extensible else tag, channels, rate, rate * block, block, bits)
+    if extensible:
+        fmt += struct.pack("<HHI", 22, bits, 0) + struct.pack("<H", tag) + bytes(14)
+    size = len(data) if data_size is None else data_size
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + extra + b"data" + struct.pack("<I", size) + data
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def _tone(rate, seconds, freq=440.0, amplitude=0.5):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+def test_decode_24_bit_pcm():
+    values = [0, 2**23 - 1, -(2**23), -1]
+    raw = b"".join(struct.pack("<i", v)[:3] for v in values)
+    samples, rate = decode_wav(_wav(raw, bits=24, rate=48000))
+    assert rate == 48000 and samples.shape == (4, 1)
+    assert samples[:, 0] == pytest.approx([0, 1 - 2**-23, -1, -(2**-23)])
+
+
+def test_decode_alaw():
+    samples, _ = decode_wav(_wav(bytes([0xD5, 0x55, 0xAA, 0x2A]), tag=6, bits=8))
+    assert (samples[:, 0] * 32768).tolist() == [8, -8, 32256, -32256]
+
+
+def test_decode_extensible_stereo_after_odd_sized_chunk():
+    pcm = np.array([[1000, -1000], [2000, -2000]], "<i2").tobytes()
+    odd = b"LIST" + struct.pack("<I", 3) + b"abc\x00"  # padded to an even size
+    samples, _ = decode_wav(_wav(pcm, channels=2, extensible=True, extra=odd))
+    assert (samples * 32768).tolist() == [[1000, -1000], [2000, -2000]]
+
+
+def test_decode_streamed_wav_without_data_size():
+    pcm = np.array([1, 2, 3], "<i2").tobytes()
+    samples, _ = decode_wav(_wav(pcm, data_size=0xFFFFFFFF))
+    assert (samples[:, 0] * 32768).tolist() == [1, 2, 3]
+
+
+@pytest.mark.parametrize("data", [b"not a wav", _wav(b"\x00" * 4, tag=2, bits=4)])
+def test_decode_rejects_unsupported_input(data):
+    with pytest.raises(ValueError):
+        decode_wav(data)
+
+
+def _peak_hz(samples, rate):
+    spectrum = np.abs(np.fft.rfft(samples))
+    return np.argmax(spectrum) * rate / len(samples)
+
+
+def test_resample_keeps_pitch_and_filters_above_nyquist():
+    low = resample(_tone(44100, 1.0, freq=1000), 44100, 16000)
+    assert len(low) == 16000
+    assert _peak_hz(low, 16000) == pytest.approx(1000, abs=2)
+
+    aliased = resample(_tone(44100, 1.0, freq=12000), 44100, 16000)
+    assert np.sqrt(np.mean(aliased**2)) < 0.01, "a 12 kHz tone would alias to 4 kHz without the low-pass"
+    assert resample(_tone(8000, 0.5), 8000, 16000).shape == (8000,)
+
+
+def test_trim_silence_keeps_padding_around_speech():
+    rate = 16000
+    audio = np.concatenate([np.zeros(rate), _tone(rate, 0.5), np.zeros(rate)])
+    trimmed = trim_silence(audio, rate, threshold_dbfs=-45, padding=0.1)
+    assert len(trimmed) == pytest.approx(0.7 * rate, abs=0.02 * rate)
+    assert len(trim_silence(np.zeros(rate, np.float32), rate, -45, 0.1)) == 0
+
+
+def test_split_chunks_cut_at_quiet_frames_and_overlap():
+    rate = 1000
+    audio = np.random.default_rng(0).uniform(-0.5, 0.5, 25 * rate).astype(np.float32)
+    audio[9000:9100] = 0  # a pause near the end of the first chunk
+    chunks = split_chunks(audio, rate, chunk_seconds=10, overlap=1)
+    step_back = 1 * rate
+
+    assert len(chunks) == 3
+    assert 9000 <= len(chunks[0]) - step_back < 9100, "the first cut lands in the pause"
+    assert all(len(c) <= 10 * rate + step_back for c in chunks)
+    stitched = np.concatenate([chunks[0]] + [c[2 * step_back:] for c in chunks[1:]])
+    assert np.array_equal(stitched, audio)
+    assert len(split_chunks(audio[:500], rate, 10, 1)) == 1
+
+
+def test_stitch_transcripts_drops_words_repeated_at_the_seam():
+    texts = ["please cancel my order", "my Order, number five", "number five today"]
+    assert stitch_transcripts(texts) == "please cancel my order number five today"
+
+
+def test_prepare_silent_recording_has_no_chunks():
+    prepared = prepare_for_stt(encode_wav(np.zeros(8000, np.float32), 8000))
+    assert prepared.chunks == [] and prepared.duration == 0 and prepared.trimmed == 1.0
+
+
+def test_prepare_downmixes_and_resamples_stereo_44k():
+    rate = 44100
+    left = np.concatenate([np.zeros(rate // 2), _tone(rate, 1.0), np.zeros(rate // 2)])
+    stereo = np.stack([left, np.zeros_like(left)], axis=1)
+    pcm = np.clip(stereo * 32768, -32768, 32767).astype("<i2").tobytes()
+    prepared = prepare_for_stt(_wav(pcm, channels=2, rate=rate))
+
+    assert prepared.sample_rate == 16000 and len(prepared.chunks) == 1
+    samples, out_rate = decode_wav(prepared.chunks[0])
+    assert out_rate == 16000 and samples.shape[1] == 1
+    assert prepared.duration == pytest.approx(1.0 + 2 * AudioSettings().trim_padding, abs=0.05)
+    assert np.max(np.abs(samples)) == pytest.approx(0.9, abs=0.01)
+    assert prepared.prepared_bytes < prepared.original_bytes / 4
+
+
+def test_mulaw_round_trip():
+    samples = np.concatenate([np.linspace(-1, 1, 2001), [0.0]]).astype(np.float32)
+    encoded = mulaw_encode(samples)
+    assert len(encoded) == len(samples) and encoded[-1:] == b"\xff"
+    decoded = np.frombuffer(ulaw_to_pcm16(encoded), "<i2") / 32768
+    assert np.allclose(decoded, samples, rtol=0.07, atol=0.001)
+
+    wav_samples, rate = decode_wav(encode_wav(samples, 8000, "mulaw"))
+    assert rate == 8000 and np.array_equal(wav_samples[:, 0], decoded.astype(np.float32))
@@ -0,0 +1,133 @@
+import asyncio
+import os
+
+import pytest
+from twilio.rest import Client
+
+from app.models.db import Conversation
+from app.services.campaign import Campaign, Contact, render_prompt
+from app.services.resilience import ProviderRouter
+from app.services.telephony import TelephonyService
+from benchmarks.fakes import FakeTwilioHttpClient
+
+CONTACT = Contact(line=2, phone="+15550001", prompt=None, metadata={"name": "Ana", "due": 12.5})
+
+
+@pytest.mark.parametrize(
+    "template, expected",
+    [
+        ("Hi {name}, you owe {due}.", "Hi Ana, you owe 12.5."),
+        ("Calling {phone}", "Calling +15550001"),
+        ("Hi {missing}", "Hi {missing}"),
+        ("{{name}} is {name}", "{name} is Ana"),
+        ("{name.__class__} {due[0]} {name!r}", "{name.__class__} {due[0]} {name!r}"),
+        ("unbalanced { brace }", "unbalanced { brace }"),
+    ],
+)
+def test_render_prompt_fills_plain_names_only(template, expected):
+    assert render_prompt(template, CONTACT) == expected
+
+
+def _contacts(path, n, extra=""):
+    rows = ["phone,first_name"] + [f"+1555{i:07d},C{i}" for i in range(n)]
+    path.write_text("\n".join(rows) + "\n" + extra)
+    return path
+
+
+@pytest.fixture
+def twilio(monkeypatch):
+    monkeypatch.setenv("TWILIO_ACCOUNT_SID", "AC" + "0" * 32)
+    monkeypatch.setenv("TWILIO_AUTH_TOKEN", "test")
+    monkeypatch.setenv("TWILIO_CALLER_ID", "+15550000000")
+
+    def make(**kwargs):
+        fake = FakeTwilioHttpClient(**kwargs)
+        client = Client(os.environ["TWILIO_ACCOUNT_SID"], os.environ["TWILIO_AUTH_TOKEN"], http_client=fake)
+        return fake, TelephonyService(client=client)
+
+    return make
+
+
+def _run(campaign, telephony, during=None):
+    async def main():
+        campaign.start(telephony, ProviderRouter("telephony", ["twilio"]))
+        if during:
+            await during()
+        await campaign.wait()
+
+    asyncio.run(main())
+    return campaign.progress()
+
+
+def test_scheduler_keeps_limits_and_retries_throttled_dials(twilio, tmp_path):
+    fake, telephony = twilio(latency=0.02, throttle_rate=0.3)
+    campaign = Campaign(
+        "limits", _contacts(tmp_path / "c.csv", 60, extra=",X\n"), "csv", 61, prompt="Hi {first_name}",
+        caller_ids=["+1555900001", "+1555900002", "+1555900003", "+1555900004"],
+        cps=1000, max_concurrency=8, per_caller_concurrency=3, max_attempts=10, backoff=0.001, record=False,
+    )
+    progress = _run(campaign, telephony)
+
+    assert progress["status"] == "COMPLETED"
+    assert (progress["succeeded"], progress["failed"]) == (60, 1)
+    assert progress["retried"] == fake.statuses[429] > 0
+    assert fake.statuses[201] == 60
+    assert 3 < fake.peak <= 8
+    assert max(fake.peak_per_caller.values()) <= 3
+    assert progress["recent_errors"][0]["error"] == "missing phone"
+
+
+def test_pause_stops_new_dials_until_resumed(twilio, tmp_path):
+    fake, telephony = twilio(latency=0.01)
+    campaign = Campaign(
+        "pause", _contacts(tmp_path / "c.csv", 30), "csv", 30, prompt="Hi",
+        cps=200, max_concurrency=2, record=False,
+    )
+    started_while_paused = []
+
+    async def pause_midway():
+        while campaign.counts["succeeded"] < 5:
+            await asyncio.sleep(0.005)
+        campaign.pause()
+        await asyncio.sleep(0.05)  # calls in progress finish
+        before = len(fake.started)
+        await asyncio.sleep(0.2)
+        started_while_paused.append(len(fake.started) - before)
+        assert campaign.status == "PAUSED"
+        campaign.resume()
+
+    progress = _run(campaign, telephony, pause_midway)
+    assert started_while_paused == [0]
+    assert progress["status"] == "COMPLETED" and progress["succeeded"] == 30
+
+
+def test_unexpected_error_marks_campaign_failed(twilio, tmp_path):
+    _, telephony = twilio()
+    campaign = Campaign("broken", tmp_path / "missing.csv", "csv", 1, prompt="Hi", record=False)
+    progress = _run(campaign, telephony)
+    assert progress["status"] == "FAILED" and campaign.finished
+    assert "FileNotFoundError" in progress["recent_errors"][-1]["error"]
+
+
+def test_placed_calls_are_recorded_closed(db, twilio, tmp_path):
+    _, telephony = twilio(latency=0)
+    campaign = Campaign(
+        "record", _contacts(tmp_path / "c.csv", 3), "csv", 3, prompt="Hi", cps=1000, locale="es-ES"
+    )
+    _run(campaign, telephony)
+    rows = db.query(Conversation).all()
+    assert len(rows) == 3
+    assert all(
+        (c.direction, c.status, c.locale) == ("OUTBOUND", "CLOSED", "es-ES") and c.end_ts >= c.start_ts
+        for c in rows
+    )
+
+
+def test_failed_dials_leave_no_conversation(db, twilio, tmp_path):
+    _, telephony = twilio(latency=0, error_rate=1.0)
+    campaign = Campaign(
+        "unreachable", _contacts(tmp_path / "c.csv", 3), "csv", 3, prompt="Hi", cps=1000, max_attempts=2
+    )
+    progress = _run(campaign, telephony)
+    assert (progress["succeeded"], progress["failed"]) == (0, 3)
+    assert db.query(Conversation).count() == 0
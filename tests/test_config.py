@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+
+import pytest
+
+from app import config as config_module
+from app.config import ConfigStore, get_settings, set_scoped_settings
+from app.services import intent
+from app.services.intent import cache_generation, invalidate_intent_cache
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"default_locale": "en-US", "version": 1}))
+    return path
+
+
+@pytest.fixture
+def store(path, monkeypatch):
+    store = ConfigStore(path, check_interval=0)
+    monkeypatch.setattr(config_module, "config_store", store)
+    monkeypatch.setattr(intent, "config_store", store)
+    return store
+
+
+def _edit(path, config, mtime_ns):
+    path.write_text(json.dumps(config))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_external_edit_is_picked_up_by_stamp(path):
+    store = ConfigStore(path, check_interval=3600)
+    assert store.get("default_locale") == "en-US"
+    stat = path.stat()
+
+    # Same size, new mtime: seen on the next check, which reload() forces.
+    _edit(path, {"default_locale": "es-ES", "version": 1}, stat.st_mtime_ns + 10**9)
+    assert path.stat().st_size == stat.st_size
+    assert store.get("default_locale") == "en-US", "checks are rate-limited by check_interval"
+    store.reload()
+    assert store.get("default_locale") == "es-ES"
+
+    # Same mtime, new size: a coarse filesystem clock still sees the change.
+    store.check_interval = 0
+    _edit(path, {"default_locale": "fr-FR", "version": 1, "x": 1}, path.stat().st_mtime_ns)
+    assert store.get("default_locale") == "fr-FR"
+
+
+def test_update_writes_atomically_and_bumps_version(path, store):
+    other = ConfigStore(path, check_interval=0)
+    config = store.update(lambda c: c.update(default_locale="de-DE"))
+    assert config["version"] == 2 and other.get("default_locale") == "de-DE"
+
+    with pytest.raises(TypeError):
+        store.update(lambda c: c.update(broken=object()))
+    assert json.loads(path.read_text())["version"] == 2
+    assert store.version == 2
+    assert sorted(p.name for p in path.parent.iterdir()) == ["config.json", "config.json.lock"]
+
+
+def test_concurrent_updates_from_separate_stores_are_not_lost(path):
+    stores = [ConfigStore(path, check_interval=0) for _ in range(4)]
+
+    def bump(store):
+        for _ in range(10):
+            store.update(lambda c: c.update(counter=c.get("counter", 0) + 1))
+
+    threads = [threading.Thread(target=bump, args=(s,)) for s in stores]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert json.loads(path.read_text())["counter"] == 40
+    assert stores[0].version == 41
+
+
+def test_scoped_settings_layer_tenant_then_campaign(store):
+    store.update(lambda c: c.update(defaults={"tts_provider": "elevenlabs", "llm_model": "base"}))
+    assert set_scoped_settings("tenants", "acme", {"locale": "es-ES", "llm_model": "big", "bogus": 1}) == {
+        "locale": "es-ES", "llm_model": "big"
+    }
+    set_scoped_settings("campaigns", "spring", {"tts_provider": "openai", "voice_id": None})
+
+    assert get_settings() == {"locale": "en-US", "tts_provider": "elevenlabs", "llm_model": "base"}
+    assert get_settings("acme") == {"locale": "es-ES", "tts_provider": "elevenlabs", "llm_model": "big"}
+    assert get_settings("acme", "spring") == {"locale": "es-ES", "tts_provider": "openai", "llm_model": "big"}
+    assert get_settings("other", "spring")["locale"] == "en-US"
+
+    get_settings("acme")["locale"] = "mutated"
+    assert get_settings("acme")["locale"] == "es-ES", "callers get a copy of the cached settings"
+    assert set_scoped_settings("tenants", "acme", {"locale": None}) == {}
+    assert get_settings("acme")["locale"] == "en-US"
+    assert "acme" not in store.get("tenants")
+
+
+def test_intent_cache_generation_is_shared_through_the_file(path, store):
+    other = ConfigStore(path, check_interval=0)
+    assert cache_generation() == 0
+    assert invalidate_intent_cache() == 1
+    assert other.get(intent.CACHE_GENERATION_KEY) == 1
+    other.update(lambda c: c.update({intent.CACHE_GENERATION_KEY: 5}))
+    assert cache_generation() == 5
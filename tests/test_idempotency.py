@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.services.idempotency import DatabaseBackend, ExpiringSet, IdempotencyStore, RedisBackend
+
+
+def test_expiring_set_expires_and_bounds_size(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.services.idempotency.time.monotonic", lambda: now[0])
+    seen = ExpiringSet(ttl=10, max_entries=2)
+    assert seen.add(("ns", "a"))
+    assert not seen.add(("ns", "a"))
+    now[0] += 11
+    assert ("ns", "a") not in seen
+    assert seen.add(("ns", "a"))
+    seen.add(("ns", "b"))
+    seen.add(("ns", "c"))
+    assert len(seen) == 2 and ("ns", "a") not in seen
+
+
+def test_memory_store_claims_once_until_released():
+    store = IdempotencyStore(ttl=60, max_entries=10)
+
+    async def main():
+        first = await store.claim("twilio", "CA1")
+        again = await store.claim("twilio", "CA1")
+        other = await store.claim("vapi", "CA1")
+        await store.release("twilio", "CA1")
+        retried = await store.claim("twilio", "CA1")
+        return first, again, other, retried
+
+    assert asyncio.run(main()) == (True, False, True, True)
+
+
+def test_durable_backend_is_shared_across_stores(db):
+    first, second = IdempotencyStore(DatabaseBackend(), ttl=60), IdempotencyStore(DatabaseBackend(), ttl=60)
+    stores = (first, second, first)
+
+    async def main():
+        return await asyncio.gather(*(store.claim("twilio", "CA1") for store in stores))
+
+    claimed = asyncio.run(main())
+    assert sorted(claimed) == [False, False, True]
+    winner = stores[claimed.index(True)]
+    loser = second if winner is first else first
+    # A failed handler releases its claim so the provider's retry is processed.
+    asyncio.run(winner.release("twilio", "CA1"))
+    assert asyncio.run(loser.claim("twilio", "CA1"))
+
+
+def test_durable_backend_reclaims_expired_rows(db):
+    backend = DatabaseBackend()
+    assert backend.claim("twilio", "CA1", ttl=3600)
+    assert not backend.claim("twilio", "CA1", ttl=3600)
+    assert backend.claim("twilio", "CA1", ttl=-1)
+    assert backend.purge(ttl=-1) == 1
+
+
+class FakeRedis:
+    """The slice of ``redis.Redis`` the backend uses: ``SET NX EX`` and ``DELETE``."""
+
+    def __init__(self):
+        self.keys = {}
+
+    def set(self, name, value, nx=False, ex=None):
+        expires = self.keys.get(name)
+        if nx and expires is not None and expires > time.monotonic():
+            return None
+        self.keys[name] = time.monotonic() + ex
+        return True
+
+    def delete(self, name):
+        return int(self.keys.pop(name, None) is not None)
+
+
+def test_redis_backend_claims_with_set_nx():
+    redis = FakeRedis()
+    first, second = (IdempotencyStore(RedisBackend(client=redis), ttl=60) for _ in range(2))
+
+    async def main():
+        claimed = [await first.claim("vapi", "req-1"), await second.claim("vapi", "req-1")]
+        await first.release("vapi", "req-1")
+        return claimed + [await second.claim("vapi", "req-1")]
+
+    assert asyncio.run(main()) == [True, False, True]
+    assert list(redis.keys) == ["idempotency:vapi:req-1"]
+    assert RedisBackend(client=redis).purge(ttl=60) == 0
+
+
+def test_app_builds_one_store_in_lifespan(monkeypatch):
+    monkeypatch.setenv("IDEMPOTENCY_BACKEND", "memory")
+    app = create_app()
+    assert not hasattr(app.state, "idempotency")
+    with TestClient(app):
+        assert app.state.idempotency.backend is None
@@ -0,0 +1,53 @@
+import pytest
+
+from app.services.intent import (
+    EVAL_PATH, TRAINING_PATH, IntentClassifier, IntentPrediction, KeywordRules, _tokens, evaluate, load_examples,
+)
+from app.services.intent_cache import IntentCache
+
+
+@pytest.mark.parametrize(
+    "text, label",
+    [
+        ("I want to talk to a human", "LIVE_AGENT"),
+        ("I don't need an agent, just call me back tomorrow", "SCHEDULE_CALLBACK"),
+        ("Please don't call me back, I want a refund", "RESOLVE_ISSUE"),
+        ("Nobody fixed it and I want a manager", "LIVE_AGENT"),
+    ],
+)
+def test_rules_ignore_negated_matches(text, label):
+    assert KeywordRules().predict(text).label == label
+
+
+def test_rules_abstain_when_only_negated_matches():
+    assert KeywordRules().predict("No, I never asked for an agent") is None
+
+
+def test_negation_scope_ends_at_clause_boundary():
+    tokens = _tokens("not a refund, call back")
+    assert "not_refund" in tokens and "call" in tokens and "not_call" not in tokens
+
+
+def test_eval_set_is_held_out_and_local_tiers_score_well():
+    train = {text.lower() for text, _ in load_examples(TRAINING_PATH)}
+    held_out = load_examples(EVAL_PATH)
+    assert not train & {text.lower() for text, _ in held_out}
+    report = evaluate(IntentClassifier(), held_out, allow_llm=False)
+    assert report["accuracy"] >= 0.9
+
+
+def test_escalation_rate_counts_cache_hits_as_escalations(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    cache = IntentCache(fingerprint="test", max_entries=10, ttl=60)
+    cache.put("zorp blarg", "SCHEDULE_CALLBACK")
+    classifier = IntentClassifier(threshold=1.01, cache=cache)
+    monkeypatch.setattr(classifier, "_classify_llm", lambda text: IntentPrediction("RESOLVE_ISSUE", 1.0, "llm"))
+
+    examples = [
+        ("I want to talk to a human", "LIVE_AGENT"), ("zorp blarg", "SCHEDULE_CALLBACK"), ("quux", "RESOLVE_ISSUE")
+    ]
+    report = evaluate(classifier, examples)
+    assert {tier: t["count"] for tier, t in report["tiers"].items()} == {"rules": 1, "cache": 1, "llm": 1}
+    assert report["escalation_rate"] == pytest.approx(2 / 3)
+    assert report["llm_rate"] == report["cache_rate"] == pytest.approx(1 / 3)
+    assert report["accuracy"] == 1.0
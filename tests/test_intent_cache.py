@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+from app.services.intent import negated_terms
+from app.services.intent_cache import IntentCache
+from app.services.registry import ProviderRegistry
+
+
+def _cache(**kwargs):
+    kwargs.setdefault("polarity", negated_terms)
+    return IntentCache(fingerprint="test", max_entries=100, ttl=3600, threshold=0.6, **kwargs)
+
+
+def test_exact_hit_ignores_case_and_punctuation():
+    cache = _cache()
+    cache.put("I want to cancel my plan.", "RESOLVE_ISSUE")
+    assert cache.get("i WANT to cancel my plan") == ("RESOLVE_ISSUE", "exact")
+    assert cache.get("call me tomorrow") is None
+    assert cache.stats()["exact_hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_near_duplicate_is_an_approximate_hit():
+    cache = _cache()
+    cache.put("I would like to cancel my subscription please", "RESOLVE_ISSUE")
+    assert cache.get("I would like to cancel my subscription, please!!") == ("RESOLVE_ISSUE", "exact")
+    assert cache.get("hi, I would like to cancel my subscription please") == ("RESOLVE_ISSUE", "approximate")
+
+
+def test_negated_transcript_is_never_an_approximate_hit():
+    unguarded = _cache(polarity=None)
+    unguarded.put("I want to cancel my subscription", "RESOLVE_ISSUE")
+    assert unguarded.get("I don't want to cancel my subscription") == ("RESOLVE_ISSUE", "approximate")
+
+    cache = _cache()
+    cache.put("I want to cancel my subscription", "RESOLVE_ISSUE")
+    assert cache.get("I don't want to cancel my subscription") is None
+
+    cache.put("I don't want to cancel my subscription", "OTHER")
+    assert cache.get("I really don't want to cancel my subscription") == ("OTHER", "approximate")
+
+
+def test_generation_bump_drops_entries_and_snapshot(tmp_path):
+    generation = [0]
+    path = tmp_path / "intent.json"
+    cache = _cache(path=str(path), generation=lambda: generation[0])
+    cache.put("call me back later", "SCHEDULE_CALLBACK")
+    assert cache.dirty
+    cache.save()
+    assert not cache.dirty and json.loads(path.read_text())["generation"] == 0
+    assert _cache(path=str(path), generation=lambda: 0).get("call me back later") is not None
+
+    generation[0] = 1
+    assert cache.get("call me back later") is None
+    assert _cache(path=str(path), generation=lambda: 1).stats()["entries"] == 0
+
+
+def test_registry_saves_changed_caches_periodically(tmp_path, monkeypatch):
+    monkeypatch.setenv("INTENT_CACHE_PATH", str(tmp_path / "intent.json"))
+    monkeypatch.setenv("INTENT_CACHE_SAVE_INTERVAL", "0.05")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    registry = ProviderRegistry()
+
+    async def main():
+        await registry.start()
+        try:
+            registry.intent().cache.put("send me a technician", "RESOLVE_ISSUE")
+            await asyncio.sleep(0.2)
+            return json.loads((tmp_path / "intent.json").read_text())["entries"]
+        finally:
+            await registry.aclose()
+
+    assert [row["text"] for row in asyncio.run(main())] == ["send me a technician"]
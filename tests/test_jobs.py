@@ -0,0 +1,107 @@
+import asyncio
+import time
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.db import Conversation, Job, Ticket
+from app.routes.jobs import router as jobs_router
+from app.services.inbound import INBOUND_RECORDING_JOB, InboundCall, persist
+from app.services.jobs import SUPERSEDED, JobQueue, JobWorker, register_handler
+
+
+def _job(db, queue, kind=INBOUND_RECORDING_JOB):
+    conv = Conversation(phone="+15550001", direction="INBOUND", start_ts=datetime.utcnow(), status="OPEN")
+    db.add(conv)
+    db.commit()
+    return queue.enqueue(db, kind, {"conversation_id": conv.id}, conversation_id=conv.id)
+
+
+def _refresh(db, job_id):
+    db.expire_all()
+    return db.get(Job, job_id)
+
+
+def test_failed_attempts_back_off_then_fail(db):
+    queue = JobQueue(max_attempts=2, backoff=60, lease=300)
+    job = _job(db, queue)
+
+    ctx = queue.claim()
+    assert (ctx.job_id, ctx.attempt) == (job.id, 1)
+    assert queue.claim() is None, "a running job is leased to its worker"
+    assert queue.fail(ctx, "boom") == "QUEUED"
+    retry_at = _refresh(db, job.id).run_at
+    assert 59 <= (retry_at - datetime.utcnow()).total_seconds() <= 60
+    assert queue.claim() is None, "the retry waits for its backoff"
+
+    db.query(Job).filter(Job.id == job.id).update({"run_at": datetime.utcnow()})
+    db.commit()
+    ctx = queue.claim()
+    assert ctx.attempt == 2
+    assert queue.fail(ctx, "boom again") == "FAILED"
+    job = _refresh(db, job.id)
+    assert (job.status, job.error) == ("FAILED", "boom again")
+
+
+def test_complete_stores_result_and_timings(db):
+    queue = JobQueue()
+    job = _job(db, queue)
+    ctx = queue.claim()
+    with ctx.stage_timer("stt"):
+        pass
+    assert queue.complete(ctx, {"intent": "OTHER"})
+    job = _refresh(db, job.id)
+    assert job.status == "SUCCEEDED" and job.stage == "stt"
+    assert job.result["intent"] == "OTHER" and "stt" in job.result["timings"]
+
+
+def test_reclaimed_job_ends_with_one_ticket_and_current_outcome(db):
+    queue = JobQueue(lease=0.05)
+    job = _job(db, queue)
+    first = queue.claim()
+    time.sleep(0.1)  # the first worker stalls past its lease
+    second = queue.claim()
+    assert (second.job_id, second.attempt) == (job.id, 2)
+
+    async def run(ctx):
+        call = InboundCall(ctx)
+        call.transcript, call.intent = "my card was declined", "RESOLVE_ISSUE"
+        return await persist(call)
+
+    calls = [asyncio.run(run(ctx)) for ctx in (second, first)]
+    assert calls[0].ticket_id == calls[1].ticket_id
+    assert db.query(Ticket).filter(Ticket.conversation_id == job.conversation_id).count() == 1
+
+    assert queue.complete(second, {"ticket_id": calls[0].ticket_id})
+    assert not queue.complete(first, {"ticket_id": calls[1].ticket_id})
+    assert queue.fail(first, "late failure") == SUPERSEDED
+    assert not queue.heartbeat(first)
+    job = _refresh(db, job.id)
+    assert (job.status, job.attempts, job.error) == ("SUCCEEDED", 2, None)
+
+
+def test_heartbeat_keeps_a_long_handler_leased(db):
+    queue = JobQueue(lease=0.15)
+    job = _job(db, queue, kind="test_slow")
+
+    @register_handler("test_slow")
+    async def slow(ctx):
+        await asyncio.sleep(0.4)
+        return {"stolen": queue.claim() is not None}
+
+    worker = JobWorker(queue=queue, concurrency=1)
+    asyncio.run(worker.run_job(queue.claim()))
+    job = _refresh(db, job.id)
+    assert (job.status, job.attempts, job.result["stolen"]) == ("SUCCEEDED", 1, False)
+
+
+def test_get_job_route(db):
+    queue = JobQueue()
+    job = _job(db, queue)
+    app = FastAPI()
+    app.include_router(jobs_router)
+    with TestClient(app) as client:
+        body = client.get(f"/jobs/{job.id}").json()
+        assert (body["id"], body["status"], body["attempts"]) == (job.id, "QUEUED", 0)
+        assert client.get(f"/jobs/{job.id + 1000}").status_code == 404
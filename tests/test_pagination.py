@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.db import Conversation
+from app.services.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_page
+
+
+def _seed(db, count):
+    base = datetime(2024, 1, 1)
+    # Pairs of rows share a timestamp, so the id tie-breaker matters.
+    db.add_all(Conversation(phone=str(i), start_ts=base + timedelta(minutes=i // 2)) for i in range(count))
+    db.commit()
+
+
+def _walk(db, limit):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = keyset_page(db.query(Conversation), Conversation.start_ts, Conversation.id, cursor, limit)
+        pages.append([row.id for row in rows])
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("limit", [1, 3, 7, 25])
+def test_pages_cover_every_row_once_newest_first(db, limit):
+    _seed(db, 25)
+    pages = _walk(db, limit)
+    ids = [i for page in pages for i in page]
+    expected = [
+        c.id for c in db.query(Conversation).order_by(Conversation.start_ts.desc(), Conversation.id.desc())
+    ]
+    assert ids == expected
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_rows_inserted_mid_walk_do_not_shift_later_pages(db):
+    _seed(db, 10)
+    first, cursor = keyset_page(db.query(Conversation), Conversation.start_ts, Conversation.id, None, 4)
+    db.add(Conversation(phone="new", start_ts=datetime(2030, 1, 1)))
+    db.commit()
+    rest, _ = keyset_page(db.query(Conversation), Conversation.start_ts, Conversation.id, cursor, 100)
+    seen = [c.id for c in first + rest]
+    assert len(seen) == len(set(seen)) == 10
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    ts = datetime(2024, 5, 6, 7, 8, 9)
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+    assert decode_cursor(encode_cursor(None, 1)) == (None, 1)
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor")
@@ -0,0 +1,65 @@
+import asyncio
+import random
+
+import pytest
+
+from app.services.pipeline import Pipeline, Stage
+
+
+def _stage(name, log, busy, peak, fail_on=None):
+    async def run(item):
+        busy[name] += 1
+        peak[name] = max(peak[name], busy[name])
+        try:
+            await asyncio.sleep(random.uniform(0, 0.005))
+            if item[0] == fail_on:
+                raise RuntimeError(f"{name} failed for {item[0]}")
+            log.append((item[0], name))
+            return (item[0], item[1] + [name])
+        finally:
+            busy[name] -= 1
+
+    return run
+
+
+def test_each_call_runs_its_stages_in_order_with_full_queues():
+    log, busy, peak = [], {"a": 0, "b": 0, "c": 0}, {"a": 0, "b": 0, "c": 0}
+    limits = {"a": 3, "b": 1, "c": 2}
+    pipeline = Pipeline(
+        "test", [Stage(name, _stage(name, log, busy, peak), limits[name]) for name in "abc"], queue_size=1
+    )
+
+    async def main():
+        try:
+            return await asyncio.gather(*(pipeline.submit((i, [])) for i in range(40)))
+        finally:
+            await pipeline.aclose()
+
+    results = asyncio.run(main())
+    assert results == [(i, ["a", "b", "c"]) for i in range(40)]
+    for i in range(40):
+        assert [stage for call, stage in log if call == i] == ["a", "b", "c"]
+    assert all(peak[name] <= limits[name] for name in limits)
+    assert pipeline.capacity == 6
+
+
+def test_stage_error_reaches_only_its_caller():
+    log, busy, peak = [], {"a": 0, "b": 0}, {"a": 0, "b": 0}
+    pipeline = Pipeline(
+        "test", [Stage("a", _stage("a", log, busy, peak)), Stage("b", _stage("b", log, busy, peak, fail_on=3))]
+    )
+
+    async def main():
+        try:
+            return await asyncio.gather(*(pipeline.submit((i, [])) for i in range(6)), return_exceptions=True)
+        finally:
+            await pipeline.aclose()
+
+    results = asyncio.run(main())
+    assert isinstance(results[3], RuntimeError)
+    assert [r for i, r in enumerate(results) if i != 3] == [(i, ["a", "b"]) for i in (0, 1, 2, 4, 5)]
+
+
+def test_pipeline_needs_a_stage():
+    with pytest.raises(ValueError):
+        Pipeline("empty", [])
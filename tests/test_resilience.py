@@ -0,0 +1,149 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.resilience import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ProviderRouter, ProviderUnavailable, call_timeout,
+)
+
+
+class ProviderError(Exception):
+    pass
+
+
+def test_breaker_opens_after_threshold_and_allows_one_probe(monkeypatch):
+    breaker = CircuitBreaker("test", "a", failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    later = time.monotonic() + 11
+    monkeypatch.setattr("app.services.resilience.time.monotonic", lambda: later)
+    assert breaker.available()
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow(), "only one half-open probe at a time"
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_failed_probe_reopens_and_cancelled_probe_is_released(monkeypatch):
+    breaker = CircuitBreaker("test", "b", failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    later = time.monotonic() + 11
+    monkeypatch.setattr("app.services.resilience.time.monotonic", lambda: later)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow(), "a released trial can be claimed again"
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+
+def test_router_fails_over_and_skips_open_circuit(monkeypatch):
+    monkeypatch.setenv("BREAKER_FAILURES", "1")
+    router = ProviderRouter("test", ["a", "b"], hedge=False)
+    calls = []
+
+    async def func(name):
+        calls.append(name)
+        if name == "a":
+            raise ProviderError("down")
+        return name
+
+    assert asyncio.run(router.call(func)) == "b"
+    assert asyncio.run(router.call(func)) == "b"
+    assert calls == ["a", "b", "b"]
+    assert router.health["a"].breaker.state == OPEN
+    assert router.preferred() == "b" and router.preferred("a") == "b"
+
+
+def test_router_raises_unavailable_with_last_error_as_cause():
+    router = ProviderRouter("test", ["a", "b"], hedge=False)
+
+    async def func(name):
+        raise ProviderError(name)
+
+    with pytest.raises(ProviderUnavailable) as info:
+        asyncio.run(router.call(func))
+    assert str(info.value.__cause__) == "b"
+
+
+def test_client_errors_are_not_failed_over_or_counted():
+    router = ProviderRouter("test", ["a", "b"], hedge=False)
+    calls = []
+
+    async def func(name):
+        calls.append(name)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        asyncio.run(router.call(func))
+    assert calls == ["a"]
+    assert router.health["a"].failures == 0
+
+
+def test_prefer_moves_provider_to_front():
+    router = ProviderRouter("test", ["a", "b", "c"], hedge=False)
+    assert router.order("C") == ["c", "a", "b"]
+    assert router.order("unknown") == ["a", "b", "c"]
+
+    async def func(name):
+        return name
+
+    assert asyncio.run(router.call(func, prefer="b")) == "b"
+
+
+def test_deadline_counts_as_failure_and_caps_call_timeout():
+    router = ProviderRouter("test", ["a", "b"], hedge=False, deadlines={"a": 0.05, "b": 5})
+    seen = {}
+
+    async def func(name):
+        seen[name] = call_timeout(60)
+        if name == "a":
+            await asyncio.sleep(1)
+        return name
+
+    assert asyncio.run(router.call(func)) == "b"
+    assert seen["a"] <= 0.05 and seen["b"] <= 5
+    assert router.health["a"].timeouts == 1
+    assert call_timeout(60) == 60, "the cap only applies inside an attempt"
+
+
+def test_non_replayable_call_is_attempted_once():
+    router = ProviderRouter("test", ["a", "b"], hedge=True)
+    calls = []
+
+    async def func(name):
+        calls.append(name)
+        raise ProviderError("down")
+
+    with pytest.raises(ProviderError):
+        asyncio.run(router.call(func, replayable=False))
+    assert calls == ["a"]
+
+
+def test_hedge_returns_first_success_and_cancels_the_loser(monkeypatch):
+    monkeypatch.setenv("HEDGE_MIN_SAMPLES", "1")
+    monkeypatch.setenv("HEDGE_MIN_DELAY", "0.01")
+    router = ProviderRouter("test", ["a", "b"], hedge=True)
+    router.health["a"].latencies.append(0.01)
+    cancelled = []
+
+    async def func(name):
+        if name == "a":
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+        return name
+
+    async def main():
+        result = await router.call(func)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(main()) == "b"
+    assert cancelled == ["a"]
+    assert not router.health["a"].breaker._trial
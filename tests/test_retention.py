@@ -0,0 +1,106 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.db import Conversation, Job, Ticket
+from app.services.conversation import ConversationDeleted, record_call_outcome
+from app.services.retention import RetentionPolicy, apply_policy, erase_phone, scrub_archives
+
+NOW = datetime(2024, 6, 1)
+
+
+def _conversation(db, phone, days_old, job_status=None):
+    conv = Conversation(phone=phone, start_ts=NOW - timedelta(days=days_old), status="CLOSED")
+    db.add(conv)
+    db.flush()
+    db.add(Ticket(conversation_id=conv.id, category="BILLING", created_ts=conv.start_ts))
+    if job_status:
+        db.add(Job(kind="inbound_recording", conversation_id=conv.id, status=job_status))
+    db.commit()
+    return conv.id
+
+
+def _remaining(db):
+    db.expire_all()
+    return sorted(c.phone for c in db.query(Conversation))
+
+
+def test_policy_deletes_old_rows_in_batches_and_skips_active_jobs(db):
+    for i in range(5):
+        _conversation(db, f"old{i}", days_old=100, job_status="SUCCEEDED")
+    _conversation(db, "busy", days_old=100, job_status="RUNNING")
+    _conversation(db, "recent", days_old=1)
+
+    policy = RetentionPolicy(name="old", action="delete", older_than_days=30)
+    report = apply_policy(policy, batch_size=2, now=NOW)
+
+    assert (report.conversations, report.tickets, report.jobs, report.batches) == (5, 5, 5, 3)
+    assert _remaining(db) == ["busy", "recent"]
+    assert db.query(Ticket).count() == 2 and db.query(Job).count() == 1
+
+
+def test_dry_run_counts_without_deleting(db):
+    _conversation(db, "old", days_old=100)
+    report = apply_policy(RetentionPolicy(name="old", action="delete", older_than_days=30), dry_run=True, now=NOW)
+    assert (report.conversations, report.tickets) == (1, 1)
+    assert _remaining(db) == ["old"]
+
+
+def test_archive_writes_rows_with_tickets_before_deleting(db, tmp_path):
+    _conversation(db, "old", days_old=100)
+    report = apply_policy(
+        RetentionPolicy(name="old", action="archive", older_than_days=30), archive_dir=str(tmp_path), now=NOW
+    )
+    with gzip.open(report.files[0], "rt") as fh:
+        rows = [json.loads(line) for line in fh]
+    assert [(r["phone"], len(r["tickets"])) for r in rows] == [("old", 1)]
+    assert _remaining(db) == []
+
+
+def test_policy_without_filter_is_rejected():
+    with pytest.raises(ValueError):
+        RetentionPolicy.from_dict({"name": "everything", "action": "delete"})
+
+
+def test_erase_phone_removes_active_rows_too(db):
+    _conversation(db, "+15550001", days_old=1, job_status="RUNNING")
+    _conversation(db, "+15550001", days_old=400)
+    _conversation(db, "+15550002", days_old=1)
+    report = erase_phone("+15550001", batch_size=1)
+    assert (report.conversations, report.tickets, report.jobs) == (2, 2, 1)
+    assert _remaining(db) == ["+15550002"]
+
+
+def test_call_finishing_after_erasure_is_dropped(db):
+    conv_id = _conversation(db, "+15550001", days_old=0, job_status="RUNNING")
+    erase_phone("+15550001")
+    with pytest.raises(ConversationDeleted):
+        record_call_outcome(db, conv_id, "transcript", "BILLING")
+    db.rollback()
+    assert db.query(Ticket).count() == 0
+
+
+def _archived_phones(path):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path).column("phone").to_pylist()
+    with gzip.open(path, "rt") as fh:
+        return [json.loads(line)["phone"] for line in fh]
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "parquet"])
+def test_scrub_archives_removes_only_that_phone(db, tmp_path, fmt):
+    _conversation(db, "+15550001", days_old=100)
+    _conversation(db, "+15550002", days_old=100)
+    policy = RetentionPolicy(name="old", action="archive", older_than_days=30)
+    archived = apply_policy(policy, archive_dir=str(tmp_path), archive_format=fmt, now=NOW)
+
+    dry = scrub_archives(str(tmp_path), "+15550001", dry_run=True)
+    assert dry["rows"] == 1 and _archived_phones(archived.files[0]) == ["+15550001", "+15550002"]
+    report = scrub_archives(str(tmp_path), "+15550001")
+    assert report["rows"] == 1 and report["files"] == archived.files and not report["skipped"]
+    assert _archived_phones(report["files"][0]) == ["+15550002"]
+    assert scrub_archives(str(tmp_path), "+15550001")["rows"] == 0
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.db import Conversation
+from app.services.search import TranscriptSearch, like_pattern, query_terms
+
+NOW = datetime(2024, 6, 1)
+
+
+def _add(db, *transcripts):
+    rows = [
+        Conversation(phone=f"+1555000{i}", start_ts=NOW + timedelta(minutes=i), transcript=t, status="CLOSED")
+        for i, t in enumerate(transcripts)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return [r.id for r in rows]
+
+
+@pytest.fixture
+def scan(monkeypatch):
+    search = TranscriptSearch()
+    monkeypatch.setattr(search, "_detect", lambda bind: "scan")
+    return search
+
+
+def test_fts5_ranks_denser_matches_first(db):
+    search = TranscriptSearch()
+    ids = _add(
+        db,
+        "my card was declined at the store and I need help with my account settings today",
+        "card declined, card declined again, my card keeps getting declined",
+        "the weather is nice",
+    )
+    assert search.backend(db) == "fts5"
+    hits = search.search(db, "card declined").hits
+    assert [h.conversation_id for h in hits] == [ids[1], ids[0]]
+    assert hits[0].rank > hits[1].rank
+    assert "[card]" in hits[0].snippet and "[declined]" in hits[0].snippet
+
+
+def test_fts5_treats_query_syntax_as_text(db):
+    ids = _add(db, "cancel or refund please", "refund only")
+    hits = TranscriptSearch().search(db, 'cancel" OR refund*').hits
+    assert [h.conversation_id for h in hits] == [ids[0]]
+
+
+def test_like_fallback_matches_every_term_newest_first(db, scan):
+    ids = _add(db, "Refund for my order", "order shipped", "REFUND my ORDER please")
+    assert scan.backend(db) == "scan"
+    hits = scan.search(db, "order refund").hits
+    assert [h.conversation_id for h in hits] == [ids[2], ids[0]]
+    assert hits[0].snippet == "[REFUND] my [ORDER] please"
+
+
+def test_like_fallback_escapes_wildcards(db, scan):
+    ids = _add(db, "account a_b locked", "account axb locked", "account a\\b locked")
+    assert [h.conversation_id for h in scan.search(db, "a_b").hits] == [ids[0]]
+    assert like_pattern("50%_off\\") == "%50\\%\\_off\\\\%"
+    assert query_terms("a_b 50%") == ["a_b", "50"]
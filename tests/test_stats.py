@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from app.models.db import Conversation, StatsIntentHourly, Ticket
+from app.services.stats import StatsRollup, move_intent_counts, query_stats
+from app.services.ticket import resolve_ticket
+
+START = datetime(2024, 3, 4, 9, 0)
+WINDOW = (START - timedelta(days=1), START + timedelta(days=1))
+
+
+def _call(db, minutes, intent, locale="en-US"):
+    start = START + timedelta(minutes=minutes)
+    conv = Conversation(
+        phone="+1555", direction="INBOUND", locale=locale, start_ts=start,
+        end_ts=start + timedelta(minutes=2), intents=[intent], status="CLOSED",
+    )
+    db.add(conv)
+    db.flush()
+    ticket = Ticket(conversation_id=conv.id, category=intent, created_ts=conv.end_ts)
+    db.add(ticket)
+    db.commit()
+    return conv.id, ticket.id
+
+
+def _intent_rows(db):
+    db.expire_all()
+    return sorted(
+        (row.bucket_ts, row.locale, row.intent, row.calls) for row in db.query(StatsIntentHourly) if row.calls
+    )
+
+
+def test_rollup_counts_calls_once_across_runs(db):
+    _call(db, 5, "BILLING")
+    _call(db, 70, "SUPPORT", locale="es-ES")
+    rollup = StatsRollup(batch_size=1, lag=0)
+    assert rollup.run() == {"conversations": 2, "tickets_created": 2, "tickets_resolved": 0}
+    assert rollup.run() == {"conversations": 0, "tickets_created": 0, "tickets_resolved": 0}
+
+    stats = query_stats(db, *WINDOW, bucket="day")
+    assert stats["totals"]["calls"] == 2
+    assert stats["totals"]["avg_handle_seconds"] == 120.0
+    assert stats["totals"]["tickets_opened"] == 2
+    assert stats["totals"]["intents"] == {"BILLING": 1, "SUPPORT": 1}
+    assert query_stats(db, *WINDOW, locale="es-ES")["totals"]["calls"] == 1
+    assert stats["as_of"] is not None
+
+
+def test_reclassify_moves_folded_intents_like_a_rebuild(db):
+    first, _ = _call(db, 5, "BILLING")
+    second, _ = _call(db, 10, "BILLING")
+    rollup = StatsRollup(lag=0)
+    rollup.run()
+    third, _ = _call(db, 20, "BILLING")  # not folded yet
+
+    labels = {first: ["SUPPORT"], second: ["BILLING"], third: ["SALES"]}
+    assert move_intent_counts(db, labels) == 1
+    db.bulk_update_mappings(Conversation, [{"id": i, "intents": v} for i, v in labels.items()])
+    db.commit()
+    rollup.run()
+    incremental = _intent_rows(db)
+
+    rollup.reset()
+    rollup.run()
+    assert incremental == _intent_rows(db)
+    assert query_stats(db, *WINDOW)["totals"]["intents"] == {"BILLING": 1, "SUPPORT": 1, "SALES": 1}
+
+
+def test_resolved_tickets_are_folded_once(db):
+    _, ticket_id = _call(db, 5, "BILLING")
+    rollup = StatsRollup(lag=0)
+    rollup.run()
+
+    ticket = resolve_ticket(db, ticket_id)
+    assert ticket.status == "RESOLVED" and ticket.resolved_ts is not None
+    resolved_ts = ticket.resolved_ts
+    assert resolve_ticket(db, ticket_id).resolved_ts == resolved_ts
+    assert resolve_ticket(db, ticket_id + 1000) is None
+
+    rollup.run()
+    now = datetime.utcnow()
+    totals = query_stats(db, START - timedelta(days=1), now + timedelta(hours=1), bucket="week")["totals"]
+    assert totals["tickets_resolved"] == 1
+    assert totals["resolution_rate"] == 1.0
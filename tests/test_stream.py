@@ -0,0 +1,101 @@
+import asyncio
+import base64
+import json
+import threading
+from array import array
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.db import Conversation
+from app.routes import stream
+from app.services.audio import ulaw_to_pcm16
+from app.services.stt_stream import LocalStreamingBackend
+
+FRAME = 160  # 20 ms of 8 kHz mu-law, as Twilio sends it
+LOUD, SILENT = bytes([0x80, 0x00]) * (FRAME // 2), bytes([0xFF]) * FRAME
+
+
+def _pcm(ulaw):
+    samples = array("h")
+    samples.frombytes(ulaw_to_pcm16(ulaw))
+    return list(samples)
+
+
+def test_ulaw_decode_matches_g711():
+    assert _pcm(bytes([0xFF, 0x7F, 0x00, 0x80, 0xEF, 0x6F])) == [0, 0, -32124, 32124, 132, -132]
+    assert len(ulaw_to_pcm16(LOUD)) == 2 * FRAME
+
+
+def test_local_backend_endpoints_on_silence():
+    backend = LocalStreamingBackend(
+        recognizer=lambda pcm, rate: f"{len(pcm) / (2 * rate):.2f}s", partial_interval=0.2, endpoint_silence=0.2
+    )
+
+    async def main():
+        for frames in ([LOUD] * 25, [SILENT] * 20, [LOUD] * 5):
+            for frame in frames:
+                await backend.feed(ulaw_to_pcm16(frame))
+        await backend.finish()
+        return [event async for event in backend.events()]
+
+    events = asyncio.run(main())
+    finals = [e for e in events if e.is_final]
+    assert [e.is_final for e in events].count(False) == 2
+    assert [(round(e.start, 2), e.text) for e in finals] == [(0.0, "0.70s"), (0.9, "0.10s")]
+    assert finals[0].end == pytest.approx(0.7, abs=0.02)
+
+
+def _stream(client, params):
+    client.stored.clear()
+    with client.websocket_connect("/stream/twilio") as ws:
+        ws.send_text(json.dumps({"event": "start", "start": {"callSid": "CA1", "customParameters": params}}))
+        for frame in [LOUD] * 10 + [SILENT] * 40:
+            payload = base64.b64encode(frame).decode()
+            ws.send_text(json.dumps({"event": "media", "media": {"track": "inbound", "payload": payload}}))
+        ws.send_text(json.dumps({"event": "stop"}))
+        assert client.stored.wait(5), "leaving the session cancels the handler"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("STT_STREAM_BACKEND", "local")
+    stored, store = threading.Event(), stream._store_transcript
+
+    async def store_and_signal(*args):
+        await store(*args)
+        stored.set()
+
+    monkeypatch.setattr(stream, "_store_transcript", store_and_signal)
+    app = FastAPI()
+    app.include_router(stream.router)
+    with TestClient(app) as client:
+        client.stored = stored
+        yield client
+
+
+def test_outbound_stream_updates_its_conversation(db, client):
+    conv = Conversation(phone="+15550001", direction="OUTBOUND", start_ts=datetime.utcnow(), status="OPEN")
+    db.add(conv)
+    db.commit()
+
+    _stream(client, {"conversation_id": str(conv.id)})
+    db.expire_all()
+    rows = db.query(Conversation).all()
+    assert [(c.id, c.direction, c.phone, c.status) for c in rows] == [(conv.id, "OUTBOUND", "+15550001", "CLOSED")]
+    assert rows[0].transcript == "[speech 0.8s]" and rows[0].end_ts is not None
+
+
+def test_inbound_stream_inserts_a_conversation(db, client):
+    _stream(client, {"From": "+15550002", "locale": "es-ES"})
+    rows = db.query(Conversation).all()
+    assert [(c.direction, c.phone, c.locale, c.status) for c in rows] == [
+        ("INBOUND", "+15550002", "es-ES", "CLOSED")
+    ]
+
+
+def test_stream_for_a_deleted_conversation_inserts_nothing(db, client):
+    _stream(client, {"conversation_id": "999999"})
+    assert db.query(Conversation).count() == 0
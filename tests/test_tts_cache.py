@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from app.services.tts_cache import TTSCache
+
+
+def test_concurrent_misses_render_once():
+    cache = TTSCache(max_bytes=1024)
+    renders = []
+
+    async def render():
+        renders.append(1)
+        await asyncio.sleep(0.01)
+        return b"audio"
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_render("k", render) for _ in range(5)))
+
+    assert asyncio.run(main()) == [b"audio"] * 5
+    assert len(renders) == 1
+    assert cache.misses == 1 and cache.coalesced == 4
+    assert cache._inflight == {}
+    assert cache.get("k") == b"audio"
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    cache = TTSCache(max_bytes=1024)
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def render():
+            await gate.wait()
+            return b"audio"
+
+        leader = asyncio.ensure_future(cache.get_or_render("k", render))
+        follower = asyncio.ensure_future(cache.get_or_render("k", render))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        return leader, await follower
+
+    leader, audio = asyncio.run(main())
+    assert leader.cancelled()
+    assert audio == b"audio"
+    assert cache.get("k") == b"audio"
+
+
+def test_render_error_reaches_every_waiter_and_is_not_cached():
+    cache = TTSCache(max_bytes=1024)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_render("k", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache._inflight == {} and cache.get("k") is None
+
+    async def ok():
+        return b"audio"
+
+    assert asyncio.run(cache.get_or_render("k", ok)) == b"audio"
+
+
+def test_lru_evicts_oldest_past_max_bytes():
+    cache = TTSCache(max_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    cache.get("a")
+    cache.put("c", b"12345")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"12345" and cache.get("c") == b"12345"
+    cache.put("big", b"x" * 11)
+    assert cache.get("big") is None
+
+
+@pytest.mark.parametrize("hit", [False, True])
+def test_disk_tier_survives_a_new_process(tmp_path, hit):
+    first = TTSCache(max_bytes=1024, disk_dir=str(tmp_path))
+
+    async def render():
+        return b"audio"
+
+    asyncio.run(first.get_or_render("k", render))
+    second = TTSCache(max_bytes=1024, disk_dir=str(tmp_path if hit else tmp_path / "empty"))
+    asyncio.run(second.get_or_render("k", render))
+    assert (second.disk_hits, second.misses) == ((1, 0) if hit else (0, 1))
+
+
+def test_render_is_cached_under_the_provider_that_served_it():
+    cache = TTSCache(max_bytes=1024)
+    renders = []
+
+    async def failover():
+        renders.append(1)
+        return "backup-key", b"backup voice"
+
+    assert asyncio.run(cache.get_or_render_as("primary-key", failover)) == b"backup voice"
+    assert cache.get("primary-key") is None and cache.get("backup-key") == b"backup voice"
+    asyncio.run(cache.get_or_render_as("primary-key", failover))
+    assert len(renders) == 2, "the preferred voice is tried again next time"